@@ -17,7 +17,8 @@ NAME_VERSION_FILE = "version.txt"
 DATABASE_MODE = DataManager.DATABASE_TYPE_SQLITE
 
 
-def handle_search_request(logger_console, input_cmd_str, path_data_folder, theme, last_column_size, is_tldr_search=False):
+def handle_search_request(logger_console, input_cmd_str, path_data_folder, theme, last_column_size, is_tldr_search=False,
+						  database_settings=None, sort_by_frecency=False):
 	"""
 	take input and show the filtered list of command to select
 
@@ -30,14 +31,17 @@ def handle_search_request(logger_console, input_cmd_str, path_data_folder, theme
 	else:
 		logging.debug("search parameters: '%s'" % str(input_cmd_str))
 		# create data manger obj
-		data_manager = DataManager(path_data_folder, NAME_DATABASE_FILE, DATABASE_MODE)
+		data_manager = DataManager(path_data_folder, NAME_DATABASE_FILE, DATABASE_MODE, database_settings,
+								   sort_by_frecency=sort_by_frecency)
 
 		# open picker to select from history
 		picker = Picker(data_manager,
 						theme=theme,
 						last_column_size=last_column_size,
 						search_text=input_cmd_str,
-						is_tldr_search=is_tldr_search)
+						is_tldr_search=is_tldr_search,
+						tldr_cache_folder=path_data_folder,
+						man_cache_folder=path_data_folder)
 		selected_option = picker.start()
 
 		if selected_option[0]:
@@ -52,7 +56,7 @@ def handle_search_request(logger_console, input_cmd_str, path_data_folder, theme
 				logger_console.log_on_console_error(res[1])
 
 
-def handle_add_request(logger_console, input_cmd_str, path_data_folder, error_feedback=False):
+def handle_add_request(logger_console, input_cmd_str, path_data_folder, error_feedback=False, database_settings=None):
 	"""
 	take input and add store it
 
@@ -81,7 +85,7 @@ def handle_add_request(logger_console, input_cmd_str, path_data_folder, error_fe
 		description = parser_res.get_description_str()
 		tags = parser_res.get_tags(strict=True)
 
-		data_manager = DataManager(path_data_folder, NAME_DATABASE_FILE, DATABASE_MODE)
+		data_manager = DataManager(path_data_folder, NAME_DATABASE_FILE, DATABASE_MODE, database_settings)
 		stored = data_manager.add_new_element(cmd, description, tags)
 		if stored:
 			logging.debug("command added")
@@ -102,14 +106,16 @@ def handle_add_request(logger_console, input_cmd_str, path_data_folder, error_fe
 											   os.path.abspath(path_data_folder + NAME_LOG_FILE))
 
 
-def handle_import_db(logger_console, db_abs_path, path_data_folder):
+def handle_import_db(logger_console, db_abs_path, path_data_folder, database_settings=None):
 	"""
 	import data from external database
 	"""
 	logging.info("database path: %s" % str(db_abs_path))
 	logger_console.log_on_console_info("import database: %s" % str(db_abs_path))
-	data_manager = DataManager(path_data_folder, NAME_DATABASE_FILE, DATABASE_MODE)
-	imported_items = data_manager.import_data_to_db(db_abs_path)
+	data_manager = DataManager(path_data_folder, NAME_DATABASE_FILE, DATABASE_MODE, database_settings)
+	imported_items = data_manager.import_data_to_db(
+		db_abs_path,
+		progress_callback=lambda rows: logger_console.log_on_console_info("%s rows read.." % str(rows)))
 	if imported_items >= 0:
 		logging.info("%s elements imported" % str(imported_items))
 		logger_console.log_on_console_info("%s elements imported" % str(imported_items))
@@ -131,7 +137,7 @@ def handle_export_db(logger_console, output_path, path_data_folder):
 	export all database
 	"""
 	try:
-		from shutil import copyfile
+		import sqlite3
 		from datetime import date
 
 		if output_path is None:
@@ -151,7 +157,15 @@ def handle_export_db(logger_console, output_path, path_data_folder):
 		if not os.path.isfile(path_data_folder + NAME_DATABASE_FILE):
 			logger_console.log_on_console_info("nothing to export")
 			return
-		copyfile(path_data_folder + NAME_DATABASE_FILE, output_path)
+		# note: the online backup is used instead of a file copy because with the WAL journal the last changes
+		# can be still stored in a separate file ("-wal")
+		source_conn = sqlite3.connect(path_data_folder + NAME_DATABASE_FILE)
+		output_conn = sqlite3.connect(output_path)
+		source_conn.backup(output_conn)
+		# the exported file must be a single self-contained file
+		output_conn.execute("PRAGMA journal_mode = DELETE")
+		output_conn.close()
+		source_conn.close()
 		logging.info("export output exported")
 		logger_console.log_on_console_info("database file exported")
 	except Exception as ex:
@@ -266,24 +280,30 @@ def handle_arguments(logger_console, config_reader, path_data_folder, path_code_
 			level=config_reader.get_log_level())
 	logging.debug("bash input: %s" % str(sys.argv))
 	logger_console.set_theme(config_reader.get_theme())
+	database_settings = config_reader.get_database_settings()
+	sort_by_frecency = config_reader.get_sort_by() == ConfigReader.SORT_BY_FRECENCY
 	args_len = len(sys.argv)
 	# check number of parameters
 	if args_len == 1:
 		input_cmd = retrieve_parameters_from_bash_hook()
 		handle_search_request(logger_console, input_cmd, path_data_folder, config_reader.get_theme(),
-							  config_reader.get_last_column_size())
+							  config_reader.get_last_column_size(), database_settings=database_settings,
+							  sort_by_frecency=sort_by_frecency)
 	elif args_len >= 2:
 		arg1 = str(sys.argv[1])
 		if arg1 == "-a" or arg1 == "--add":
 			input_cmd = retrieve_parameters_from_bash_hook(arg1=arg1)
-			handle_add_request(logger_console, input_cmd, path_data_folder, error_feedback=True)
+			handle_add_request(logger_console, input_cmd, path_data_folder, error_feedback=True,
+							   database_settings=database_settings)
 		elif arg1 == "--add-explicit" and args_len == 3:
 			input_cmd = str(sys.argv[2]).strip()
-			handle_add_request(logger_console, input_cmd, path_data_folder, error_feedback=False)
+			handle_add_request(logger_console, input_cmd, path_data_folder, error_feedback=False,
+							   database_settings=database_settings)
 		elif arg1 == "-f" or arg1 == "-d" or arg1 == "--discover":
 			input_cmd = retrieve_parameters_from_bash_hook(arg1=arg1)
 			handle_search_request(logger_console, input_cmd, path_data_folder, config_reader.get_theme(),
-								  config_reader.get_last_column_size(), is_tldr_search=True)
+								  config_reader.get_last_column_size(), is_tldr_search=True,
+								  database_settings=database_settings, sort_by_frecency=sort_by_frecency)
 		elif arg1 == "--config" and args_len == 2:
 			handle_config_file(logger_console, path_data_folder)
 		elif arg1 == "--log" and args_len == 2:
@@ -292,7 +312,7 @@ def handle_arguments(logger_console, config_reader, path_data_folder, path_code_
 			handle_setup(logger_console, path_data_folder, path_code_folder, config_reader, force=True)
 		elif arg1 == "--import" and args_len == 3:
 			import_file = sys.argv[2]
-			handle_import_db(logger_console, import_file, path_data_folder)
+			handle_import_db(logger_console, import_file, path_data_folder, database_settings=database_settings)
 		elif arg1 == "--export" and args_len == 3:
 			output_path = sys.argv[2]
 			handle_export_db(logger_console, output_path, path_data_folder)
@@ -307,7 +327,8 @@ def handle_arguments(logger_console, config_reader, path_data_folder, path_code_
 		else:
 			input_cmd = retrieve_parameters_from_bash_hook()
 			handle_search_request(logger_console, input_cmd, path_data_folder, config_reader.get_theme(),
-								config_reader.get_last_column_size())
+								config_reader.get_last_column_size(), database_settings=database_settings,
+								sort_by_frecency=sort_by_frecency)
 	else:
 		logger_console.log_on_console_error("wrong number of args")
 
@@ -12,6 +12,13 @@ class ConfigReader:
     _MAIN_LOG_LEVEL = "LOG_LEVEL"
     _MAIN_THEME = "THEME"
     _MAIN_TAGS_COLUMN_SIZE = "TAGS_COLUMN_SIZE"
+    _MAIN_SORT_BY = "SORT_BY"
+    _DATABASE = "DATABASE"
+    _DATABASE_JOURNAL_MODE = "JOURNAL_MODE"
+    _DATABASE_SYNCHRONOUS = "SYNCHRONOUS"
+    _DATABASE_BUSY_TIMEOUT = "BUSY_TIMEOUT"
+    _DATABASE_CACHE_SIZE = "CACHE_SIZE"
+    _DATABASE_MMAP_SIZE = "MMAP_SIZE"
     _BASH_VAR_VERSION = "_fast_history_version"
     _BASH_VAR_PATH_CODE_FOLDER = "_fast_history_path_code_folder"
 
@@ -26,9 +33,15 @@ class ConfigReader:
     THEME_AZURE = "AZURE"
     THEME_GREEN = "GREEN"
 
+    SORT_BY_LAST_USED = "LAST_USED"
+    SORT_BY_FRECENCY = "FRECENCY"
+
     # NOTSET may be used by old configutation files ( <= 2.1.5) and it must be considered equal to NONE
     _ALLOWED_LOG_LEVELS = ['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET', 'NONE']
     _ALLOWED_THEME = [THEME_AZURE, THEME_GREEN]
+    _ALLOWED_SORT_BY = [SORT_BY_LAST_USED, SORT_BY_FRECENCY]
+    _ALLOWED_JOURNAL_MODES = ['WAL', 'DELETE', 'TRUNCATE', 'PERSIST']
+    _ALLOWED_SYNCHRONOUS = ['OFF', 'NORMAL', 'FULL', 'EXTRA']
 
     _config = None
     _checkError = [False, ""]
@@ -108,6 +121,16 @@ class ConfigReader:
                                 (self._MAIN_TAGS_COLUMN_SIZE,
                                  self._config[self._MAIN][self._MAIN_TAGS_COLUMN_SIZE],
                                  general_advice)]
+                    # note: this value is optional (not available in old configuration files)
+                    elif self._MAIN_SORT_BY in self._config[self._MAIN] and \
+                            self._config[self._MAIN][self._MAIN_SORT_BY] not in self._ALLOWED_SORT_BY:
+                        self._checkError = [None, "%s must be chosen between: %s, current value: '%s'. %s" % \
+                                (self._MAIN_SORT_BY,
+                                 str(self._ALLOWED_SORT_BY),
+                                 self._config[self._MAIN][self._MAIN_SORT_BY],
+                                 general_advice)]
+                    elif self._check_database_section() is not None:
+                        self._checkError = [None, "%s. %s" % (self._check_database_section(), general_advice)]
                     else:
                          return True
                 except KeyError as err:
@@ -116,6 +139,25 @@ class ConfigReader:
                     self._checkError = [None, "generic error with config file. " + general_advice]
         return False
 
+    def _check_database_section(self):
+        """
+        the database section is optional (not available in old configuration files)
+        and each missing value is replaced by the default one
+
+        :return:    error message if a value is not valid, None otherwise
+        """
+        if self._DATABASE not in self._config:
+            return None
+        database = self._config[self._DATABASE]
+        for key, allowed_values in [(self._DATABASE_JOURNAL_MODE, self._ALLOWED_JOURNAL_MODES),
+                                    (self._DATABASE_SYNCHRONOUS, self._ALLOWED_SYNCHRONOUS)]:
+            if key in database and database[key] not in allowed_values:
+                return "%s must be chosen between: %s, current value: '%s'" % (key, str(allowed_values), database[key])
+        for key in [self._DATABASE_BUSY_TIMEOUT, self._DATABASE_CACHE_SIZE, self._DATABASE_MMAP_SIZE]:
+            if key in database and not database[key].lstrip("-").isdigit():
+                return "%s must be a number, current value: '%s'" % (key, database[key])
+        return None
+
     def _get_content_version_file(self, path):
         try:
             f = open(path, "r")
@@ -144,6 +186,32 @@ class ConfigReader:
         except ValueError or Exception:
             return 0
 
+    def get_sort_by(self):
+        """
+        get the order of the commands in the search (last used command first by default)
+
+        :return:    SORT_BY_LAST_USED or SORT_BY_FRECENCY
+        """
+        return self._config[self._MAIN].get(self._MAIN_SORT_BY, self.SORT_BY_LAST_USED)
+
+    def get_database_settings(self):
+        """
+        get the settings of the local database defined in the configuration file
+
+        :return:    dictionary with the configured values only (e.g. {"journal_mode": "WAL", "busy_timeout": 5000})
+        """
+        settings = {}
+        if self._DATABASE not in self._config:
+            return settings
+        database = self._config[self._DATABASE]
+        for key in [self._DATABASE_JOURNAL_MODE, self._DATABASE_SYNCHRONOUS]:
+            if key in database:
+                settings[key.lower()] = database[key]
+        for key in [self._DATABASE_BUSY_TIMEOUT, self._DATABASE_CACHE_SIZE, self._DATABASE_MMAP_SIZE]:
+            if key in database:
+                settings[key.lower()] = int(database[key])
+        return settings
+
     def get_config_database(self):
         return self._config[self._DB]
 
@@ -14,6 +14,8 @@ class DataManager(object):
 		INDEX_CMD = 0
 		INDEX_DESC = 1
 		INDEX_TAGS = 2
+		# opaque value used to request the next page of a search
+		INDEX_ID = 3
 
 	DATABASE_TYPE_SQLITE = 0
 	DATABASE_TYPE_MYSQL = 1
@@ -26,12 +28,21 @@ class DataManager(object):
 
 	DUMMY_INPUT_DATA = InputData(False, "", [])
 
-	def __init__(self, path_data_folder, name_db_file, mode=DATABASE_TYPE_SQLITE):
+	def __init__(self, path_data_folder, name_db_file, mode=DATABASE_TYPE_SQLITE, database_settings=None,
+				 sort_by_frecency=False):
+		"""
+		:param database_settings:	(optional) connection settings of the database (e.g. {"journal_mode": "WAL"})
+		:param sort_by_frecency:	if True the filtered commands are sorted by frecency (number of uses and recency),
+									otherwise the last used command is the first one
+		"""
 		self.last_search = None
+		self.sort_by_frecency = sort_by_frecency
 		self.filtered_data = None
+		self._init_parameters = [path_data_folder, name_db_file, mode, database_settings]
 		if mode == self.DATABASE_TYPE_SQLITE:
 			from fastHistory.database.databaseSQLite import DatabaseSQLite
-			self.database = DatabaseSQLite(path_data_folder, name_db_file, DataManager._OLD_DB_RELATIVE_PATHS)
+			self.database = DatabaseSQLite(path_data_folder, name_db_file, DataManager._OLD_DB_RELATIVE_PATHS,
+										   connection_settings=database_settings)
 		else:
 			logging.error("database type not supported")
 		# set dummy as default
@@ -54,12 +65,50 @@ class DataManager(object):
 		"""
 		return self.forbidden_chars
 
-	def filter(self, search, n=100):
+	def copy(self):
 		"""
-		get filtered commands array
-		:param n: 		max number of returned rows
+		create a new data manager with the same settings and a new connection to the database
+		note: a database connection can be used only by the thread which created it
+
+		:return:	new data manager
+		"""
+		return DataManager(*self._init_parameters, sort_by_frecency=self.sort_by_frecency)
+
+	def close(self):
+		"""
+		close the connection to the database
+		"""
+		self.database.close()
+
+	def interrupt(self):
+		"""
+		abort any running search of this data manager, the interrupted search raises an exception
+		note: this can be called from a different thread
+		"""
+		self.database.interrupt()
+
+	def update_search_filters(self, search):
+		"""
+		parse the search text and update the search filters (see "get_search_filters") without any search
+		this is used when the search is done by a different data manager (e.g. in a background thread)
+
 		:param search:	filter text
-		:return:		array with [cmd, description, tags array, bool advanced]
+		:return:
+		"""
+		input_data = InputParser.parse_input(search.lower(), is_search_mode=True)
+		if input_data:
+			self.search_filters = input_data
+		else:
+			self.search_filters = self.DUMMY_INPUT_DATA
+
+	def filter(self, search, n=100, after_id=None):
+		"""
+		get filtered commands array
+		:param n: 			max number of returned rows
+		:param search:		filter text
+		:param after_id:	(optional) id (OPTION.INDEX_ID) of the last option already retrieved with the same search,
+							only the next options are returned
+		:return:			array with [cmd, description, tags array, id]
 		"""
 		# put all to lower case
 		search = search.lower()
@@ -73,13 +122,17 @@ class DataManager(object):
 			if not input_data.is_advanced():
 				filtered_data = self.database.get_last_n_filtered_elements(
 								generic_filters=input_data.get_main_words(),
-								n=n)
+								n=n,
+								after_id=after_id,
+								sort_by_frecency=self.sort_by_frecency)
 			else:
 				filtered_data = self.database.get_last_n_filtered_elements(
 								generic_filters=input_data.get_main_words(),
 								description_filters=input_data.get_description_words(strict=True),
 								tags_filters=input_data.get_tags(strict=True),
-								n=n)
+								n=n,
+								after_id=after_id,
+								sort_by_frecency=self.sort_by_frecency)
 			if filtered_data:
 				return filtered_data
 			else:
@@ -150,11 +203,12 @@ class DataManager(object):
 		"""
 		return self.database.get_all_data()
 
-	def import_data_to_db(self, db_abs_path):
+	def import_data_to_db(self, db_abs_path, progress_callback=None):
 		"""
 		import data from old or backed up database file
-		:param db_abs_path:	database absolute path
+		:param db_abs_path:			database absolute path
+		:param progress_callback:	(optional) function called with the number of rows read so far
 		:return:
 		"""
-		return self.database.import_external_database(db_abs_path)
+		return self.database.import_external_database(db_abs_path, progress_callback)
 
@@ -1,10 +1,11 @@
+import itertools
 import sqlite3
 import logging
+import math
 import os
+import re
 import time
 
-from fastHistory.database.databaseCommon import DatabaseCommon
-
 
 class DatabaseSQLite(object):
 
@@ -23,12 +24,10 @@ class DatabaseSQLite(object):
     CHAR_TAG = "#"
     CHAR_DESCRIPTION = "@"
     EMPTY_STRING = ""
-    EMPTY_STRING_TUPLE = ('', )
 
     CHAR_DIVIDER = "ǁ"
 
-    MAX_NUMBER_OF_WORDS_TO_COMBINE = 4
-
+    _DATABASE_VERSION = 4
     _DATABASE_TABLE_NAME = "history"
     _DATABASE_STRUCTURE = """
     command  TEXT,
@@ -39,14 +38,133 @@ class DatabaseSQLite(object):
     synced TINYINT
     """
 
-    def __init__(self, path_data_folder, name_db_file, old_db_relative_paths=None, delete_all_data_from_db=False):
+    # full-text search index (FTS5) which mirrors the searchable columns of the "history" table
+    # the trigram tokenizer allows to find any substring of at least 3 chars with an index lookup
+    _SEARCH_INDEX_TABLE_NAME = "history_fts"
+    _SEARCH_INDEX_STRUCTURE = """
+    command,
+    description,
+    tags,
+    content='history',
+    tokenize='trigram'
+    """
+    _SEARCH_INDEX_TRIGGERS = [
+        """
+        CREATE TRIGGER history_fts_insert AFTER INSERT ON history BEGIN
+            INSERT INTO history_fts(rowid, command, description, tags)
+            VALUES (new.rowid, new.command, new.description, new.tags);
+        END
+        """,
+        """
+        CREATE TRIGGER history_fts_delete AFTER DELETE ON history BEGIN
+            INSERT INTO history_fts(history_fts, rowid, command, description, tags)
+            VALUES ('delete', old.rowid, old.command, old.description, old.tags);
+        END
+        """,
+        """
+        CREATE TRIGGER history_fts_update AFTER UPDATE OF command, description, tags ON history BEGIN
+            INSERT INTO history_fts(history_fts, rowid, command, description, tags)
+            VALUES ('delete', old.rowid, old.command, old.description, old.tags);
+            INSERT INTO history_fts(rowid, command, description, tags)
+            VALUES (new.rowid, new.command, new.description, new.tags);
+        END
+        """
+    ]
+    _SEARCH_INDEX_MIN_WORD_LENGTH = 3
+    # chars used as wildcards by the LIKE conditions, the search index would match them literally
+    _LIKE_WILDCARDS = "%_"
+
+    # normalized copy of the "tags" column (added with the database version 3): one row for each tag (lower case)
+    # of each command. It allows to filter the tags with an index lookup instead of a scan of the "tags" strings
+    # note: the rows are inserted by the functions which change the tags, the trigger deletes the rows of a
+    #       deleted command
+    _TAGS_TABLE_NAME = "history_tags"
+    _TAGS_TABLE_STRUCTURE = """
+    command_id INTEGER NOT NULL,
+    tag TEXT NOT NULL
+    """
+    _TAGS_TABLE_INDEXES = [
+        "CREATE UNIQUE INDEX IF NOT EXISTS history_tags_tag ON history_tags (tag, command_id)",
+        "CREATE INDEX IF NOT EXISTS history_tags_command_id ON history_tags (command_id)"
+    ]
+    _TAGS_TABLE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS history_tags_delete AFTER DELETE ON history BEGIN
+        DELETE FROM history_tags WHERE command_id = old.rowid;
+    END
+    """
+    # highest unicode char, used as upper bound to find all tags with a given prefix
+    _TAG_PREFIX_UPPER_BOUND = chr(0x10FFFF)
+    # max number of tags strings with cached split result (see "_cast_return_type")
+    _TAGS_CACHE_SIZE = 10000
+
+    # the "last_used" column (added with the database version 2) is a sequence value which defines the order of use,
+    # the highest value is the last used command
+    _NEXT_LAST_USED = "(SELECT ifnull(max(last_used), 0) + 1 FROM history)"
+
+    # the "frecency" column (added with the database version 4) combines the number of uses and their recency
+    # each use has a weight which halves every _FRECENCY_HALF_LIFE seconds, the score of a command at the time 'now' is:
+    #       score = sum( 2 ^ (-(now - use_time) / half_life) ) = 2 ^ (frecency - now / half_life)
+    # the stored value (log2 of the sum of 2 ^ (use_time / half_life)) does not depend on the current time,
+    # therefore the commands can be sorted with an index and only the used command must be updated
+    _FRECENCY_HALF_LIFE = 7 * 24 * 3600
+
+    _INSERT_ELEMENT_QUERY = "INSERT INTO history " \
+                            "(command, description, tags, counter, date, synced, last_used, frecency) " \
+                            "VALUES (?, ?, ?, ?, ?, ?, " + _NEXT_LAST_USED + ", ?) "
+
+    # "INSERT .. ON CONFLICT DO UPDATE" (upsert) is supported only from SQLite 3.24.0
+    _UPSERT_SUPPORTED = sqlite3.sqlite_version_info >= (3, 24, 0)
+    # insert a new command or merge it with the stored one (same logic of the "_merge_elements" function)
+    _UPSERT_ELEMENT_CONFLICT = """
+    ON CONFLICT(command) DO UPDATE SET
+        description = CASE
+            WHEN excluded.description = '' OR excluded.description = history.description THEN history.description
+            WHEN history.description = '' THEN excluded.description
+            ELSE history.description || '. ' || excluded.description
+        END,
+        tags = fh_merge_tags(history.tags, excluded.tags),
+        date = max(history.date, excluded.date)
+    """
+    _UPSERT_ELEMENT_QUERY = _INSERT_ELEMENT_QUERY + _UPSERT_ELEMENT_CONFLICT
+    # with this the merged command becomes the last used command
+    _UPSERT_ELEMENT_UPDATE_LAST_USED = """,
+        last_used = excluded.last_used,
+        frecency = fh_frecency_add_use(history.frecency, excluded.date)
+    """
+
+    # the rows of an imported database are read in blocks and stored in this temporary table
+    _IMPORT_TABLE_NAME = "history_import"
+    _IMPORT_BATCH_SIZE = 5000
+
+    # pragmas applied to each new connection, they can be overwritten with the "connection_settings" parameter
+    # the WAL journal allows to read (search) while another process (e.g. a different terminal) is writing and
+    # with it the "NORMAL" synchronous mode is still safe against corruption
+    DEFAULT_CONNECTION_SETTINGS = {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -8000,
+        "mmap_size": 67108864
+    }
+    _CONNECTION_SETTING_VALUE_REGEX = re.compile(r"^-?\w+$")
+
+    def __init__(self, path_data_folder, name_db_file, old_db_relative_paths=None, delete_all_data_from_db=False,
+                 connection_settings=None):
         """
         check if database file exit, connect to it and initialize it
 
         :param delete_all_data_from_db:   if true the db file is delete (ONLY for test purposes)
+        :param connection_settings:       (optional) dictionary of pragmas (e.g. {"journal_mode": "DELETE"}) which
+                                          overwrite the default ones
         """
         self.path_data_folder = path_data_folder
         self.name_db_file = name_db_file
+        self.search_index_enabled = False
+        self.upgrade_error = None
+        self._tags_cache = {}
+        self.connection_settings = dict(self.DEFAULT_CONNECTION_SETTINGS)
+        if connection_settings is not None:
+            self.connection_settings.update(connection_settings)
         if delete_all_data_from_db:
             self.reset_entire_db()
         self._connect_db(old_db_relative_paths)
@@ -61,9 +179,21 @@ class DatabaseSQLite(object):
 
         self.conn = sqlite3.connect(self.path_data_folder + self.name_db_file)
         self.cursor = self.conn.cursor()
+        self._setup_connection()
+        self.conn.create_function("fh_merge_tags", 2, self._merge_tags_strings)
+        self.conn.create_function("fh_frecency", 2, self._get_frecency)
+        self.conn.create_function("fh_frecency_add_use", 2, self._add_frecency_use)
         if init:
             self._create_db()
             self.save_changes()
+        if not self._upgrade_db():
+            # the queries need the current structure, any of them would fail with a less clear error
+            self.conn.close()
+            raise sqlite3.DatabaseError("database cannot be upgraded to version %d: %s (%s)" %
+                                        (self._DATABASE_VERSION, self.path_data_folder + self.name_db_file,
+                                         self.upgrade_error))
+        self.search_index_enabled = self._init_search_index()
+        if init:
             migrated = False
             if old_db_relative_paths is not None:
                 # this will loop from the newest to the oldest db
@@ -77,21 +207,177 @@ class DatabaseSQLite(object):
             if not migrated:
                 logging.info("no data to migrate")
 
-    def _automatic_db_import(self, old_db_path):
+    def _setup_connection(self):
+        """
+        apply the connection settings (pragmas) to the current connection
+        note: the busy timeout is applied first, so that the other pragmas wait for any concurrent process
+              instead of failing with a "database is locked" error
+
+        :return:
+        """
+        settings = sorted(self.connection_settings.items(), key=lambda item: item[0] != "busy_timeout")
+        for name, value in settings:
+            if value is None:
+                continue
+            if not self._CONNECTION_SETTING_VALUE_REGEX.match(str(name)) or \
+                    not self._CONNECTION_SETTING_VALUE_REGEX.match(str(value)):
+                logging.error("invalid database setting: %s = %s" % (str(name), str(value)))
+                continue
+            try:
+                self.cursor.execute("PRAGMA %s = %s" % (name, value))
+            except sqlite3.Error as e:
+                logging.warning("database setting '%s' not applied: %s" % (name, str(e)))
+        logging.debug("database journal mode: %s" % self.cursor.execute("PRAGMA journal_mode").fetchone()[0])
+
+    def _upgrade_db(self):
+        """
+        update the structure of the database to the current version
+        the version is stored in the "user_version" field of the database (0 for databases created before this check)
+
+        version 1:  unique index on the "command" column
+        version 2:  "last_used" column (with index) instead of the implicit "rowid" order
+        version 3:  "history_tags" table with the tags of each command
+        version 4:  "frecency" column (with index) to sort the commands by number of uses and recency
+
+        :return:    True if the database is up to date, False otherwise (the error is stored in "upgrade_error")
+        """
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self._DATABASE_VERSION:
+            return True
+        try:
+            # the write lock is taken immediately and the version is read again, another process could have
+            # upgraded the database in the meantime
+            self.cursor.execute("BEGIN IMMEDIATE")
+            version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+            if version >= self._DATABASE_VERSION:
+                self.conn.rollback()
+                return True
+            logging.info("upgrade database from version %d to %d" % (version, self._DATABASE_VERSION))
+            columns = [column[1] for column in self.cursor.execute("PRAGMA table_info('history')").fetchall()]
+            if version < 1:
+                # commands are expected to be unique, any duplicate is merged into the last used one
+                self._merge_duplicated_commands()
+                self.cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS history_command ON history (command)")
+            if version < 2:
+                # the search index must not be updated when only the order of use changes
+                self.cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name='history_fts_update'")
+                if self.cursor.fetchone() is not None:
+                    self.cursor.execute("DROP TRIGGER history_fts_update")
+                    self.cursor.execute(self._SEARCH_INDEX_TRIGGERS[2])
+                # before this version a selected command was deleted and inserted again to get the highest rowid
+                if "last_used" not in columns:
+                    self.cursor.execute("ALTER TABLE history ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+                    self.cursor.execute("UPDATE history SET last_used = rowid")
+                self.cursor.execute("CREATE INDEX IF NOT EXISTS history_last_used ON history (last_used)")
+            if version < 3:
+                self.cursor.execute("CREATE TABLE IF NOT EXISTS %s ( %s )" %
+                                    (self._TAGS_TABLE_NAME, self._TAGS_TABLE_STRUCTURE))
+                for index in self._TAGS_TABLE_INDEXES:
+                    self.cursor.execute(index)
+                self.cursor.execute(self._TAGS_TABLE_TRIGGER)
+                self.cursor.execute("SELECT rowid, tags FROM history WHERE tags <> ''")
+                self._update_tags_table(self.cursor.fetchall())
+            if version < 4:
+                # the use times are not known, the counter and the last change date are used as approximation
+                if "frecency" not in columns:
+                    self.cursor.execute("ALTER TABLE history ADD COLUMN frecency REAL NOT NULL DEFAULT 0")
+                    self.cursor.execute("UPDATE history SET frecency = fh_frecency(counter, date)")
+                self.cursor.execute("CREATE INDEX IF NOT EXISTS history_frecency ON history (frecency, last_used)")
+            self.cursor.execute("PRAGMA user_version = %d" % self._DATABASE_VERSION)
+            self.save_changes()
+            return True
+        except sqlite3.Error as e:
+            logging.error("database upgrade failed: %s" % str(e))
+            self.upgrade_error = str(e)
+            self.conn.rollback()
+            return False
+
+    def _merge_duplicated_commands(self):
+        """
+        merge the rows with the same command (databases created before the unique index) into the last used one
+        (highest rowid): the descriptions are concatenated and the tags are merged in order of use (as with
+        '_merge_elements'), the counters are summed and the most recent date is kept
+        note: the changes are not saved, the caller must save or rollback them
+
+        :return:
+        """
+        self.cursor.execute("SELECT rowid, command, description, tags, counter, date FROM history "
+                            "WHERE command IN (SELECT command FROM history GROUP BY command HAVING count(*) > 1) "
+                            "ORDER BY command, rowid")
+        duplicated_rows = self.cursor.fetchall()
+        removed_rows = 0
+        for cmd, rows in itertools.groupby(duplicated_rows, key=lambda row: row[1]):
+            rows = list(rows)
+            description = rows[0][2] if rows[0][2] is not None else ""
+            tags_str = rows[0][3] if rows[0][3] is not None else ""
+            for row in rows[1:]:
+                if row[2] is not None and row[2] != "" and row[2] != description:
+                    description = row[2] if description == "" else description + ". " + row[2]
+                tags_str = self._merge_tags(tags_str, self._tags_string_to_array(row[3]))
+            counter = sum(int(row[4]) for row in rows if row[4] is not None)
+            dates = [int(row[5]) for row in rows if row[5] is not None]
+            date = max(dates) if len(dates) > 0 else self._get_time_now()
+            self.cursor.execute("DELETE FROM history WHERE command=? AND rowid<>?", (cmd, rows[-1][0]))
+            removed_rows += self.cursor.rowcount
+            self.cursor.execute("UPDATE history SET description=?, tags=?, counter=?, date=? WHERE rowid=?",
+                                (description, tags_str, counter, date, rows[-1][0]))
+        if removed_rows > 0:
+            logging.warning("merged %d duplicated commands" % removed_rows)
+
+    def _init_search_index(self):
+        """
+        create the full-text search table (and the triggers which keep it in sync with the "history" table)
+        if it does not exist yet. Any already stored command is indexed during the creation
+        note: if the SQLite library does not support FTS5 (or its trigram tokenizer, SQLite < 3.34)
+              the search falls back to the slower LIKE query
+
+        :return:    True if the search index can be used, False otherwise
+        """
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                            (self._SEARCH_INDEX_TABLE_NAME,))
+        if self.cursor.fetchone() is not None:
+            return True
+        try:
+            # check again with the write lock, another process could have created the index in the meantime
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                                (self._SEARCH_INDEX_TABLE_NAME,))
+            if self.cursor.fetchone() is not None:
+                self.conn.rollback()
+                return True
+            self.cursor.execute("CREATE VIRTUAL TABLE %s USING fts5( %s )" %
+                                (self._SEARCH_INDEX_TABLE_NAME, self._SEARCH_INDEX_STRUCTURE))
+            for trigger in self._SEARCH_INDEX_TRIGGERS:
+                self.cursor.execute(trigger)
+            # index all commands already stored
+            self.cursor.execute("INSERT INTO %s(%s) VALUES('rebuild')" %
+                                (self._SEARCH_INDEX_TABLE_NAME, self._SEARCH_INDEX_TABLE_NAME))
+            self.save_changes()
+            logging.info("search index created")
+            return True
+        except sqlite3.Error as e:
+            logging.warning("search index not supported, fallback to LIKE search: %s" % str(e))
+            self.conn.rollback()
+            return False
+
+    def _automatic_db_import(self, old_db_path, progress_callback=None):
         """
         check if database file exists and move data from this database to the local one
         the function automatically detects the correct version of the database and
         based on that it makes a different type of import
 
-        :param old_db_path: absolute path of the old/external database file
-        :return:            if database is imported correctly return the number of item imported, -1 otherwise
+        :param old_db_path:         absolute path of the old/external database file
+        :param progress_callback:   (optional) function called with the number of rows read so far
+        :return:                    if database is imported correctly return the number of item imported, -1 otherwise
         """
 
         old_tables_structs = [
             # database table structure type 0
             [(0, 'command', 'TEXT', 0, None, 0), (1, 'counter', 'BIGINT', 0, None, 0), (2, 'description', 'TEXT', 0, None, 0), (3, 'tags', 'TEXT', 0, None, 0)],
             # database table structure type 1  ( > v0.1.0-beta)
-            [(0, 'command', 'TEXT', 0, None, 0), (1, 'description', 'TEXT', 0, None, 0), (2, 'tags', 'TEXT', 0, None, 0), (3, 'counter', 'INTEGER', 0, None, 0), (4, 'date', 'INTEGER', 0, None, 0), (5, 'synced', 'TINYINT', 0, None, 0)]
+            [(0, 'command', 'TEXT', 0, None, 0), (1, 'description', 'TEXT', 0, None, 0), (2, 'tags', 'TEXT', 0, None, 0), (3, 'counter', 'INTEGER', 0, None, 0), (4, 'date', 'INTEGER', 0, None, 0), (5, 'synced', 'TINYINT', 0, None, 0)],
+            # database table structure type 2  ( > v2.4.2)
+            [(0, 'command', 'TEXT', 0, None, 0), (1, 'description', 'TEXT', 0, None, 0), (2, 'tags', 'TEXT', 0, None, 0), (3, 'counter', 'INTEGER', 0, None, 0), (4, 'date', 'INTEGER', 0, None, 0), (5, 'synced', 'TINYINT', 0, None, 0), (6, 'last_used', 'INTEGER', 1, '0', 0)]
         ]
         error = -1
 
@@ -105,8 +391,6 @@ class DatabaseSQLite(object):
                 tmp_struct_old = tmp_cursor_old.execute("PRAGMA table_info('%s')" % self.TABLE_NAME).fetchall()
                 logging.debug("database import structure: %s" % str(tmp_struct_old))
 
-                number_of_imported_items = 0
-
                 if tmp_struct_old == old_tables_structs[0]:
                     """
                     db structure type 0
@@ -119,31 +403,9 @@ class DatabaseSQLite(object):
                         tags TEXT
                     )
                     """
-                    # get all value from old db
                     logging.debug("import database type: 0")
-                    tmp_cursor_old.execute("SELECT command, counter, description, tags FROM history")
-                    old_db_data = tmp_cursor_old.fetchall()
-                    for item in old_db_data:
-                        old_cmd = item[0]
-                        old_counter = item[1]
-                        old_desc = item[2]
-                        old_tags = self._tags_string_to_array(item[3])
-                        old_date = 0  # the date was not available therefore we select the oldest date possible
-
-                        if not self.add_element(old_cmd,
-                                                description=old_desc,
-                                                tags=old_tags,
-                                                counter=old_counter,
-                                                date=old_date,
-                                                imported=True):
-                            self.rollback_changes()
-                            return error
-                        else:
-                            number_of_imported_items += 1
-
-                    tmp_conn_old.close()
-                    self.save_changes()
-                    return number_of_imported_items
+                    # the date was not available therefore we select the oldest date possible
+                    tmp_cursor_old.execute("SELECT command, description, tags, counter, 0, 0 FROM history")
                 elif tmp_struct_old == old_tables_structs[1]:
                     """
                     db structure type 1
@@ -160,32 +422,40 @@ class DatabaseSQLite(object):
                     """
                     logging.debug("import database type: 1")
                     tmp_cursor_old.execute("SELECT command, description, tags, counter, date, synced FROM history")
-                    old_db_data = tmp_cursor_old.fetchall()
-                    for item in old_db_data:
-                        old_cmd = item[0]
-                        old_desc = item[1]
-                        old_tags = self._tags_string_to_array(item[2])
-                        old_counter = item[3]
-                        old_date = item[4]
-                        old_sync = item[5]
-                        if not self.add_element(old_cmd,
-                                                description=old_desc,
-                                                tags=old_tags,
-                                                counter=old_counter,
-                                                date=old_date,
-                                                synced=old_sync,
-                                                imported=True):
-                            self.rollback_changes()
-                            return error
-                        else:
-                            number_of_imported_items += 1
+                elif tmp_struct_old[:len(old_tables_structs[2])] == old_tables_structs[2]:
+                    """
+                    db structure type 2
 
-                    tmp_conn_old.close()
-                    self.save_changes()
-                    return number_of_imported_items
+                    TABLE history
+                    (
+                        command  TEXT,
+                        description TEXT,
+                        tags TEXT,
+                        counter INTEGER,
+                        date INTEGER,
+                        synced TINYINT,
+                        last_used INTEGER,
+                        ...
+                    )
+                    note: the next columns (e.g. frecency) are calculated again
+                    """
+                    logging.debug("import database type: 2")
+                    # the rows are imported in the same order of use
+                    tmp_cursor_old.execute("SELECT command, description, tags, counter, date, synced "
+                                           "FROM history ORDER BY last_used")
                 else:
                     logging.error("unknown database type: %s" % str(old_db_path))
+                    tmp_conn_old.close()
                     return error
+
+                number_of_imported_items = self._import_rows(tmp_cursor_old, progress_callback)
+                tmp_conn_old.close()
+                if number_of_imported_items < 0:
+                    self.rollback_changes()
+                    return error
+                else:
+                    self.save_changes()
+                    return number_of_imported_items
             else:
                 logging.debug("database file not found: %s" % str(old_db_path))
                 return error
@@ -194,6 +464,81 @@ class DatabaseSQLite(object):
             self.rollback_changes()
             return error
 
+    def _import_rows(self, cursor_old, progress_callback=None):
+        """
+        import all rows of the given cursor with a single transaction
+        the rows are read in blocks, validated and stored into a temporary table. Then all of them are
+        inserted (or merged with the existing commands) with a single query
+        note: the changes are not saved, the caller must save or rollback them
+
+        :param cursor_old:          cursor of the executed query with columns: command, description, tags (string),
+                                    counter, date, synced
+        :param progress_callback:   (optional) function called with the number of rows read after each block
+        :return:                    number of rows imported, -1 in case of invalid rows
+        """
+        self.cursor.execute("CREATE TEMP TABLE IF NOT EXISTS %s ( %s )" %
+                            (self._IMPORT_TABLE_NAME, self._DATABASE_STRUCTURE))
+        self.cursor.execute("DELETE FROM temp.%s" % self._IMPORT_TABLE_NAME)
+        number_of_rows = 0
+        while True:
+            rows = cursor_old.fetchmany(self._IMPORT_BATCH_SIZE)
+            if len(rows) == 0:
+                break
+            staged_rows = []
+            for row in rows:
+                cmd = row[0].strip()
+                description = row[1]
+                tags = self._tags_string_to_array(row[2])
+                date = row[4]
+                if tags is None:
+                    tags = []
+                if description is None:
+                    description = ""
+                elif self.CHAR_TAG in description or self.CHAR_DESCRIPTION in description:
+                    logging.error("description contains illegal char %s: %s" % (self.CHAR_DESCRIPTION, description))
+                    return -1
+                for tag in tags:
+                    if self.CHAR_TAG in tag or self.CHAR_DESCRIPTION in tag:
+                        logging.error("tags contains illegal char %s: %s" % (self.CHAR_DESCRIPTION, tag))
+                        return -1
+                if date is None:
+                    date = self._get_time_now()
+                staged_rows.append((cmd, description, self._tag_array_to_string(tags), row[3], date, row[5]))
+            self.cursor.executemany("INSERT INTO temp.%s VALUES (?, ?, ?, ?, ?, ?)" % self._IMPORT_TABLE_NAME,
+                                    staged_rows)
+            number_of_rows += len(rows)
+            logging.debug("rows read: %d" % number_of_rows)
+            if progress_callback is not None:
+                progress_callback(number_of_rows)
+
+        if self._UPSERT_SUPPORTED:
+            # rows are inserted in the read order, a command found more than once is merged as with 'add_element'
+            # note: "WHERE true" is needed to avoid the parsing ambiguity between the SELECT and the ON CONFLICT clauses
+            # the new commands get the next "last_used" values in the same order
+            last_used = self.cursor.execute("SELECT ifnull(max(last_used), 0) FROM history").fetchone()[0]
+            self.cursor.execute("INSERT INTO history "
+                                "(command, description, tags, counter, date, synced, last_used, frecency) "
+                                "SELECT command, description, tags, counter, date, synced, ? + rowid, "
+                                "fh_frecency(counter, date) "
+                                "FROM temp.%s WHERE true ORDER BY rowid %s" %
+                                (self._IMPORT_TABLE_NAME, self._UPSERT_ELEMENT_CONFLICT), (last_used, ))
+            self.cursor.execute("SELECT rowid, tags FROM history WHERE command IN (SELECT command FROM temp.%s)" %
+                                self._IMPORT_TABLE_NAME)
+            self._update_tags_table(self.cursor.fetchall())
+        else:
+            self.cursor.execute("SELECT * FROM temp.%s ORDER BY rowid" % self._IMPORT_TABLE_NAME)
+            for row in self.cursor.fetchall():
+                if not self._insert_or_merge_element(cmd=row[0],
+                                                     description=row[1],
+                                                     tags=self._tags_string_to_array(row[2]),
+                                                     counter=row[3],
+                                                     date=row[4],
+                                                     synced=row[5],
+                                                     imported=True):
+                    return -1
+        self.cursor.execute("DELETE FROM temp.%s" % self._IMPORT_TABLE_NAME)
+        return number_of_rows
+
     def save_changes(self):
         """
         after each change to the db a save must be done
@@ -216,8 +561,10 @@ class DatabaseSQLite(object):
 
         :return:
         """
-        if os.path.exists(self.path_data_folder + self.name_db_file):
-            os.remove(self.path_data_folder + self.name_db_file)
+        # note: the WAL journal uses two additional files which must be deleted with the database
+        for suffix in ["", "-wal", "-shm"]:
+            if os.path.exists(self.path_data_folder + self.name_db_file + suffix):
+                os.remove(self.path_data_folder + self.name_db_file + suffix)
 
     def close(self):
         """
@@ -227,6 +574,15 @@ class DatabaseSQLite(object):
         """
         self.conn.close()
 
+    def interrupt(self):
+        """
+        abort any query running on the connection (sqlite3.OperationalError is raised by the aborted query)
+        note: this is the only function which can be called from a different thread
+
+        :return:
+        """
+        self.conn.interrupt()
+
     def _create_db(self):
         """
         create table to store commands
@@ -245,17 +601,19 @@ class DatabaseSQLite(object):
         :return:
         """
         logging.info("create database")
-        self.cursor.execute("CREATE TABLE %s ( %s )" % (self._DATABASE_TABLE_NAME, self._DATABASE_STRUCTURE))
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS %s ( %s )" % (self._DATABASE_TABLE_NAME, self._DATABASE_STRUCTURE))
+        # note: the following columns and indexes are added by the "_upgrade_db" function
 
         # note: sqlite automatically adds a column called "rowID"
         # the "rowID" value is a 64-bit signed integers
         # REAL is used because it has the longest time range
 
     def get_all_data(self):
-        self.cursor.execute("SELECT * FROM history ")
+        self.cursor.execute("SELECT command, description, tags, counter, date, synced FROM history ORDER BY last_used")
         return self.cursor.fetchall()
 
-    def get_last_n_filtered_elements(self, generic_filters=None, description_filters=None, tags_filters=None, n=50):
+    def get_last_n_filtered_elements(self, generic_filters=None, description_filters=None, tags_filters=None, n=50,
+                                     after_id=None, sort_by_frecency=False):
         """
         get filtered data from db
 
@@ -263,65 +621,88 @@ class DatabaseSQLite(object):
         :param description_filters:    array of words used to filter descriptions
         :param tags_filters:           array of words used to filter tags
         :param n:                      max number of rows returned
-        :return:                       filtered data (array of array [command, description, tags])
+        :param after_id:               (optional) id of the last row of the previous page, only the next rows
+                                       are returned (keyset pagination)
+        :param sort_by_frecency:       if True the rows are sorted by frecency (number of uses and recency),
+                                       otherwise by last use
+        :return:                       filtered data (array of array [command, description, tags, id])
+                                       the id is the last_used value or the (frecency, last_used) tuple
         """
 
-        if generic_filters is not None and len(generic_filters) > self.MAX_NUMBER_OF_WORDS_TO_COMBINE:
-            # TODO show feedback to user when this kind of search is done
-            combinations_generic_filters = [tuple(generic_filters)]
-        else:
-            combinations_generic_filters = DatabaseCommon.get_all_unique_combinations(generic_filters)
-
-        if description_filters is not None and len(description_filters) > self.MAX_NUMBER_OF_WORDS_TO_COMBINE:
-            combinations_description_filters = [tuple(description_filters)]
-        else:
-            combinations_description_filters = DatabaseCommon.get_all_unique_combinations(description_filters)
-
         parameters = ()
         where_needed = True
 
-        query = "SELECT command, description, tags " \
-                "FROM history "
-
-        if combinations_generic_filters is not None and len(combinations_generic_filters) > 0:
+        if sort_by_frecency:
+            query = "SELECT command, description, tags, frecency, last_used " \
+                    "FROM history "
+        else:
+            query = "SELECT command, description, tags, last_used " \
+                    "FROM history "
+
+        if after_id is not None:
+            # the rows are sorted with an index, the next page starts directly from the given one with a lookup
+            if sort_by_frecency:
+                query += " WHERE (frecency, last_used) < (?, ?) "
+                parameters += tuple(after_id)
+            else:
+                query += " WHERE last_used < ? "
+                parameters += (after_id, )
+            where_needed = False
+
+        search_index_query = self._get_search_index_query(generic_filters, description_filters, tags_filters)
+        if search_index_query is not None:
+            # the search index returns a superset of the wanted rows with an index lookup
+            # the LIKE conditions below are then evaluated only on these rows
+            query += " WHERE " if where_needed else " AND "
+            query += "rowid IN (SELECT rowid FROM %s WHERE %s MATCH ?) " % \
+                     (self._SEARCH_INDEX_TABLE_NAME, self._SEARCH_INDEX_TABLE_NAME)
+            parameters += (search_index_query, )
+            where_needed = False
+
+        if generic_filters is not None and len(generic_filters) > 0:
             if where_needed:
                 query += " WHERE ("
                 where_needed = False
+            else:
+                query += " AND ("
 
-            or_needed = False
-            for combination in combinations_generic_filters:
-                if or_needed:
-                    query += " OR "
+            # each word must be found (in any order) in the command, description or tags
+            # note: a condition for each word makes the cost grow linearly with the number of words
+            and_needed = False
+            for generic_filter in generic_filters:
+                if and_needed:
+                    query += "AND "
                 else:
-                    or_needed = True
+                    and_needed = True
 
-                pattern = '%' + '%'.join(combination) + '%'
+                pattern = "%" + generic_filter + "%"
                 # a divider is used to avoid the corner case where a word matches only
                 # because of the concatenation of different columns
                 query += "(command || ? || description || ? || tags LIKE ? ) "
                 parameters += (self.CHAR_DIVIDER, self.CHAR_DIVIDER, pattern, )
             query += ") "
 
-        if combinations_description_filters is not None and len(combinations_description_filters) > 0:
+        if description_filters is not None and len(description_filters) > 0:
             if where_needed:
                 query += " WHERE ("
                 where_needed = False
             else:
                 query += " AND ("
 
-            or_needed = False
-            for desc_combination in combinations_description_filters:
-                if or_needed:
-                    query += " OR "
+            and_needed = False
+            for description_filter in description_filters:
+                if and_needed:
+                    query += "AND "
                 else:
-                    or_needed = True
-                if desc_combination == DatabaseSQLite.EMPTY_STRING_TUPLE:
+                    and_needed = True
+
+                if description_filter == DatabaseSQLite.EMPTY_STRING:
                     query += "description <> '' "
                     parameters += ()
                 else:
-                    desc_pattern = '%' + '%'.join(desc_combination) + '%'
+                    pattern = "%" + description_filter + "%"
                     query += "description LIKE ? "
-                    parameters += (desc_pattern, )
+                    parameters += (pattern, )
             query += ") "
 
         if tags_filters is not None and len(tags_filters) > 0:
@@ -341,12 +722,17 @@ class DatabaseSQLite(object):
                     query += "tags <> '' "
                     parameters += ()
                 else:
-                    pattern = "%" + tag_filter + "%"
-                    query += "tags LIKE ? "
-                    parameters += (pattern, )
+                    # each tag filter matches the tags which start with it (index range lookup)
+                    tag_filter = tag_filter.lower()
+                    query += "rowid IN (SELECT command_id FROM %s WHERE tag >= ? AND tag < ?) " % \
+                             self._TAGS_TABLE_NAME
+                    parameters += (tag_filter, tag_filter + self._TAG_PREFIX_UPPER_BOUND, )
             query += ") "
 
-        query += "ORDER BY rowid DESC LIMIT ?"
+        if sort_by_frecency:
+            query += "ORDER BY frecency DESC, last_used DESC LIMIT ?"
+        else:
+            query += "ORDER BY last_used DESC LIMIT ?"
         parameters += (n,)
 
         # execute query
@@ -357,6 +743,41 @@ class DatabaseSQLite(object):
 
         return self._cast_return_type(self.cursor.fetchall())
 
+    def _get_search_index_query(self, generic_filters, description_filters, tags_filters):
+        """
+        create the FTS5 query which selects all rows containing each filter word in the right column
+        words shorter than 3 chars cannot be searched with the trigram index and they are ignored
+        words with a LIKE wildcard ("%" or "_") are ignored too, the LIKE conditions would return more rows
+        note: the tags filters are not used, they are already searched with the "history_tags" index
+
+        example     generic_filters = ["git", "co"], description_filters = ["work"]
+                    result: "git" AND description : "work"
+
+        :param generic_filters:        array of words used to filter cmd, descriptions and tags
+        :param description_filters:    array of words used to filter descriptions
+        :param tags_filters:           array of words used to filter tags
+        :return:                       FTS5 query string or None if the search index cannot be used
+        """
+        if not self.search_index_enabled:
+            return None
+        terms = []
+        for column, filters in [(None, generic_filters),
+                                ("description", description_filters)]:
+            if filters is None:
+                continue
+            for word in filters:
+                if len(word) < self._SEARCH_INDEX_MIN_WORD_LENGTH or \
+                        any(wildcard in word for wildcard in self._LIKE_WILDCARDS):
+                    continue
+                # each word is searched as a string (quoted) to avoid any FTS5 syntax
+                term = '"' + word.replace('"', '""') + '"'
+                if column is not None:
+                    term = column + " : " + term
+                terms.append(term)
+        if len(terms) == 0:
+            return None
+        return " AND ".join(terms)
+
     def add_element(self, cmd, description=None, tags=None, counter=0, date=None, synced=0, imported=False):
         """
         insert a new element in the database,
@@ -395,57 +816,82 @@ class DatabaseSQLite(object):
             logging.debug("counter: %s" % str(counter))
             logging.debug("synced: %s" % str(synced))
 
-            self.cursor.execute("SELECT rowid, description, tags, counter, date FROM history WHERE command=?", (cmd,))
-            matches = self.cursor.fetchall()
-            matches_number = len(matches)
-            if matches_number == 0:
-                if date is None:
-                    date = self._get_time_now()
-
-                if description is None:
-                    description = ""
-                if tags is None:
-                    tags_str = ""
-                else:
-                    tags_str = self._tag_array_to_string(tags)
-                if self.cursor.execute("INSERT INTO history values (?, ?, ?, ?, ?, ?)", (
-                                     cmd,
-                                     description,
-                                     tags_str,
-                                     counter,
-                                     date,
-                                     synced
-                                     )).rowcount != 1:
-                    self.rollback_changes()
-                    return False
-                else:
-                    self.save_changes()
-                    logging.debug("added new element")
-                    return True
-            elif matches_number == 1:
-                # note: in this case the given 'date' and 'sync' values are ignored
-                if not self._merge_elements(old_element=matches[0],
-                                            new_cmd=cmd,
-                                            new_description=description,
-                                            new_tags=tags,
-                                            new_counter=None,
-                                            new_date=date,
-                                            update_id=(not imported)):
-                    self.rollback_changes()
-                    return False
-                else:
-                    self.save_changes()
-                    logging.debug("added new element (merged)")
-                    return True
+            if self._insert_or_merge_element(cmd, description, tags, counter, date, synced, imported):
+                self.save_changes()
+                logging.debug("added new element")
+                return True
             else:
-                logging.error("command entry is not unique: %s" % cmd)
+                self.rollback_changes()
                 return False
         except Exception as e:
             logging.error("error: %s" % str(e))
             self.rollback_changes()
             return False
 
-    def _merge_elements(self, old_element, new_cmd, new_description, new_tags, new_counter=None, new_date=None, update_id=False):
+    def _insert_or_merge_element(self, cmd, description, tags, counter, date, synced, imported):
+        """
+        insert a new element or merge it with the stored one (if the command already exists)
+        note: the changes are not saved, the caller must save or rollback them
+
+        :param cmd:             bash command (already validated)
+        :param description:     description
+        :param tags:            array of tag
+        :param counter:         usage counter
+        :param date:            date of last change (UTC time in Epoch timestamp)
+        :param synced:          boolean for future usage
+        :param imported:        true if value was imported from another database
+        :return:                true if the command has been stored successfully
+        """
+        if date is None:
+            date = self._get_time_now()
+        if description is None:
+            description = ""
+        if tags is None:
+            tags_str = ""
+        else:
+            tags_str = self._tag_array_to_string(tags)
+
+        if self._UPSERT_SUPPORTED:
+            # note: in case of merge the given 'counter' and 'sync' values are ignored
+            query = self._UPSERT_ELEMENT_QUERY
+            if not imported:
+                query += self._UPSERT_ELEMENT_UPDATE_LAST_USED
+            if self.cursor.execute(query, (cmd, description, tags_str, counter, date, synced,
+                                           self._get_frecency(counter, date))).rowcount != 1:
+                return False
+            return self._update_command_tags(cmd)
+
+        # old SQLite versions: search the command and then insert or merge it
+        self.cursor.execute("SELECT rowid, description, tags, counter, date FROM history WHERE command=?", (cmd,))
+        matches = self.cursor.fetchall()
+        matches_number = len(matches)
+        if matches_number == 0:
+            if self.cursor.execute(self._INSERT_ELEMENT_QUERY, (
+                                   cmd,
+                                   description,
+                                   tags_str,
+                                   counter,
+                                   date,
+                                   synced,
+                                   self._get_frecency(counter, date)
+                                   )).rowcount != 1:
+                return False
+            return self._update_command_tags(cmd)
+        elif matches_number == 1:
+            # note: in this case the given 'counter' and 'sync' values are ignored
+            return self._merge_elements(old_element=matches[0],
+                                        new_cmd=cmd,
+                                        new_description=description,
+                                        new_tags=tags,
+                                        new_counter=None,
+                                        new_date=date,
+                                        update_last_used=(not imported))
+        else:
+            logging.error("command entry is not unique: %s" % cmd)
+            return False
+
+    def _merge_elements(self, old_element, new_cmd, new_description, new_tags, new_counter=None, new_date=None,
+                        update_last_used=False):
         """
         given an old element and a new set of attributes, the old element is updated with the new values
          merged with the old values
@@ -455,7 +901,7 @@ class DatabaseSQLite(object):
         :param new_description:     new description string
         :param new_tags:            new tags list
         :param new_counter:         new counter int
-        :param update_id:           if true, the row id of the old element is updated
+        :param update_last_used:    if true, the element becomes the last used one
         :return:
         """
         # get old values
@@ -476,20 +922,7 @@ class DatabaseSQLite(object):
             description = old_description
 
         # set new tags list
-        if new_tags is not None and type(new_tags) == list and len(new_tags) > 0:
-            update_tags = False
-            match_tags = self._tags_string_to_array(old_tags_str)
-            for tag in new_tags:
-                if tag not in match_tags and tag != "":
-                    # new tag
-                    match_tags.append(tag)
-                    update_tags = True
-            if update_tags:
-                tags_str = self._tag_array_to_string(match_tags)
-            else:
-                tags_str = old_tags_str
-        else:
-            tags_str = old_tags_str
+        tags_str = self._merge_tags(old_tags_str, new_tags)
 
         if new_date is None:
             date = self._get_time_now()
@@ -504,38 +937,114 @@ class DatabaseSQLite(object):
         else:
             counter = new_counter
 
-        # future usage
-        synced = 0
-
-        # update = delete + create
-        if update_id:
-            # delete old row
-            self.cursor.execute("DELETE FROM history WHERE rowid=?", (old_id,))
-            # create new row which will have the highest rowID (last used command)
-            if self.cursor.execute("INSERT INTO history values (?, ?, ?, ?, ?, ?)",
-                                (new_cmd,
-                                 description,
-                                 tags_str,
-                                 counter,
-                                 date,
-                                 synced
-                                 )).rowcount != 1:
-                logging.error("insert failed")
-                return False
-        else:
-            if self.cursor.execute("UPDATE history SET command=?, description=?, tags=?, counter=?, date=? WHERE rowid=?", (
-                    new_cmd,
-                    description,
-                    tags_str,
-                    counter,
-                    date,
-                    old_id)).rowcount != 1:
-                logging.error("update failed")
-                return False
+        query = "UPDATE history SET command=?, description=?, tags=?, counter=?, date=?"
+        parameters = (new_cmd, description, tags_str, counter, date)
+        if update_last_used:
+            # same as the upsert query: the new date is considered the time of use
+            query += ", last_used=" + self._NEXT_LAST_USED + ", frecency=fh_frecency_add_use(frecency, ?)"
+            parameters += (date if new_date is None else new_date, )
+        if self.cursor.execute(query + " WHERE rowid=?", parameters + (old_id, )).rowcount != 1:
+            logging.error("update failed")
+            return False
+        if tags_str != old_tags_str:
+            self._update_tags_table([(old_id, tags_str)])
 
         logging.debug("command updated: %s" % new_cmd)
         return True
 
+    def _merge_tags(self, old_tags_str, new_tags):
+        """
+        add the new tags (if not already present) to the old tags string
+
+        :param old_tags_str:    old tags string
+        :param new_tags:        new tags list
+        :return:                merged tags string
+        """
+        if new_tags is not None and type(new_tags) == list and len(new_tags) > 0:
+            update_tags = False
+            match_tags = self._tags_string_to_array(old_tags_str)
+            for tag in new_tags:
+                if tag not in match_tags and tag != "":
+                    # new tag
+                    match_tags.append(tag)
+                    update_tags = True
+            if update_tags:
+                return self._tag_array_to_string(match_tags)
+        return old_tags_str
+
+    def _merge_tags_strings(self, old_tags_str, new_tags_str):
+        """
+        SQL function (fh_merge_tags) used to merge the tags in a query
+
+        :param old_tags_str:    old tags string
+        :param new_tags_str:    new tags string
+        :return:                merged tags string
+        """
+        return self._merge_tags(old_tags_str, self._tags_string_to_array(new_tags_str))
+
+    def _update_command_tags(self, cmd):
+        """
+        copy the current tags of the given command into the "history_tags" table
+        note: the changes are not saved, the caller must save or rollback them
+
+        :param cmd:     command
+        :return:        True if the command exists, False otherwise
+        """
+        self.cursor.execute("SELECT rowid, tags FROM history WHERE command=?", (cmd,))
+        rows = self.cursor.fetchall()
+        if len(rows) != 1:
+            logging.error("fail because of no matched command")
+            return False
+        self._update_tags_table(rows)
+        return True
+
+    def _update_tags_table(self, rows):
+        """
+        replace the rows of the "history_tags" table of the given commands with their current tags
+        note: the changes are not saved, the caller must save or rollback them
+
+        :param rows:    array of [command rowid, tags string]
+        :return:
+        """
+        tags_rows = []
+        for command_id, tags_str in rows:
+            tags = self._tags_string_to_array(tags_str)
+            if tags is None:
+                continue
+            for tag in set(tag.lower() for tag in tags if tag != ""):
+                tags_rows.append((command_id, tag))
+        self.cursor.executemany("DELETE FROM %s WHERE command_id=?" % self._TAGS_TABLE_NAME,
+                                [(row[0], ) for row in rows])
+        self.cursor.executemany("INSERT OR IGNORE INTO %s VALUES (?, ?)" % self._TAGS_TABLE_NAME, tags_rows)
+
+    def _get_frecency(self, counter, date):
+        """
+        get the frecency value of a command used (counter + 1) times at the given date
+        this is also used as SQL function (fh_frecency)
+
+        :param counter:     usage counter
+        :param date:        date of use (UTC time in Epoch timestamp)
+        :return:            frecency value
+        """
+        return math.log2(max(int(counter or 0), 0) + 1) + int(date or 0) / self._FRECENCY_HALF_LIFE
+
+    def _add_frecency_use(self, frecency, date):
+        """
+        add a new use to the given frecency value: log2(2 ^ frecency + 2 ^ (date / half_life))
+        this is also used as SQL function (fh_frecency_add_use)
+
+        :param frecency:    current frecency value
+        :param date:        date of the new use (UTC time in Epoch timestamp)
+        :return:            new frecency value
+        """
+        use = int(date or 0) / self._FRECENCY_HALF_LIFE
+        if frecency is None:
+            return use
+        high = max(frecency, use)
+        low = min(frecency, use)
+        # note: this form avoids the overflow of 2 ^ (date / half_life)
+        return high + math.log2(1 + 2 ** (low - high))
+
     def update_command_field(self, old_cmd, new_cmd):
         """
         update item command
@@ -580,6 +1089,8 @@ class DatabaseSQLite(object):
                 elif new_matches_number == 1:
                     new_match = new_matches[0]
                     new_row_id = new_match[0]
+                    # delete the item with the new command first, the command column must be unique
+                    self.cursor.execute("DELETE FROM history WHERE rowid=?", (new_row_id,))
                     # merge value in old cmd
                     if not self._merge_elements(old_element=old_match,
                                                 new_cmd=new_cmd,
@@ -590,8 +1101,6 @@ class DatabaseSQLite(object):
                         self.rollback_changes()
                         return False
                     else:
-                        # delete old command
-                        self.cursor.execute("DELETE FROM history WHERE rowid=?", (new_row_id,))
                         self.save_changes()
                         return True
                 else:
@@ -641,6 +1150,7 @@ class DatabaseSQLite(object):
                         new_tags_str,
                         new_date,
                         item_row_id))
+                    self._update_tags_table([(item_row_id, new_tags_str)])
                     self.save_changes()
                     return True
                 else:
@@ -703,37 +1213,24 @@ class DatabaseSQLite(object):
         """
         when a command is selected two changes are made:
             - counter increased (+1)
-            - the row id is update with a new one. this is done to move the selected cmd on the top (or botton,
-              it depends on the point of view) and to have a faster search the next time
+            - the "last_used" value is updated with the next one. this is done to move the selected cmd on the top
+              (or bottom, it depends on the point of view)
 
         :param cmd:     command to update
         :return:        True is the database was successfully changed, False otherwise
         """
         try:
             logging.debug("input: %s" % str(cmd))
-            self.cursor.execute("SELECT  rowid, description, tags, counter, date, synced FROM history WHERE command=?", (cmd,))
-            matches = self.cursor.fetchall()
-            matches_number = len(matches)
-            if matches_number == 1:
-                match = matches[0]
-                matched_id = match[0]
-                # delete old row
-                self.cursor.execute("DELETE FROM history WHERE rowid=?", (matched_id,))
-                # create new row which will have the highest rowID (last used command)
-                if self.cursor.execute("INSERT INTO history values (?, ?, ?, ?, ?, ?)", (
-                    cmd,
-                    match[1],
-                    match[2],
-                    int(match[3]) + 1,
-                    match[4],
-                    match[5])).rowcount != 1:
-                    self.rollback_changes()
-                    return False
-                else:
-                    self.save_changes()
-                    return True
+            # a single query is used, a different process could select (or delete) the same command in the meantime
+            self.cursor.execute("UPDATE history SET counter = counter + 1, last_used = " + self._NEXT_LAST_USED +
+                                ", frecency = fh_frecency_add_use(frecency, ?) WHERE command=?",
+                                (self._get_time_now(), cmd))
+            if self.cursor.rowcount == 1:
+                self.save_changes()
+                return True
             else:
                 logging.error("fail because of no matched command")
+                self.rollback_changes()
                 return False
         except Exception as e:
             logging.error("error: %s" % str(e))
@@ -768,13 +1265,14 @@ class DatabaseSQLite(object):
             self.rollback_changes()
             return False
 
-    def import_external_database(self, database_path):
+    def import_external_database(self, database_path, progress_callback=None):
         """
         import a database file
-        :param database_path:   absolute path of the database file
-        :return:                number of items imported
+        :param database_path:       absolute path of the database file
+        :param progress_callback:   (optional) function called with the number of rows read so far
+        :return:                    number of items imported
         """
-        num_items = self._automatic_db_import(database_path)
+        num_items = self._automatic_db_import(database_path, progress_callback)
         return num_items
 
     def get_column_field(self, cmd, column_name):
@@ -804,14 +1302,26 @@ class DatabaseSQLite(object):
     def _cast_return_type(self, data):
         """
         change the tags return type from string to array
-        :param data:
+        the result of the split is cached, the same tags string is split only once for all the search queries
+        note: the same tags array can be returned for different rows and it must not be changed
+
+        :param data:    array of rows [command, description, tags string, id] or
+                        [command, description, tags string, frecency, last_used]
         :return:
         """
         new_data = []
         for i in range(len(data)):
             tags_str = data[i][2]
-            tags = self._tags_string_to_array(tags_str)
-            new_data.append([data[i][0], data[i][1], tags])
+            tags = self._tags_cache.get(tags_str)
+            if tags is None:
+                tags = self._tags_string_to_array(tags_str)
+                if len(self._tags_cache) >= self._TAGS_CACHE_SIZE:
+                    self._tags_cache.clear()
+                self._tags_cache[tags_str] = tags
+            if len(data[i]) == 4:
+                new_data.append([data[i][0], data[i][1], tags, data[i][3]])
+            else:
+                new_data.append([data[i][0], data[i][1], tags, data[i][3:]])
         return new_data
 
     def _tags_string_to_array(self, tags_string):
@@ -0,0 +1,123 @@
+import logging
+import sqlite3
+from threading import Thread, Condition
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastHistory.database.dataManager import DataManager
+
+
+class SearchThread(Thread):
+    """
+    Thread used to search the stored commands in background (the user input is not blocked by a slow search)
+
+    only the last requested search is executed: the requests received while a search is running replace each
+    other and the running search is interrupted, its result would be discarded anyway
+    note: the thread uses its own copy of the data manager because a database connection can be used only
+          by the thread which created it
+    """
+
+    # message of the error raised by a query aborted with "interrupt"
+    _INTERRUPTED_ERROR = "interrupted"
+
+    def __init__(self, data_manager: "DataManager"):
+        Thread.__init__(self, daemon=True)
+        self.data_manager = data_manager
+        self.search_data_manager = None
+        self.condition = Condition()
+        self.last_request_id = 0
+        self.request = None
+        self.running_request_id = None
+        self.result = None
+        self.stopped = False
+
+    def run(self):
+        self.search_data_manager = self.data_manager.copy()
+        while True:
+            with self.condition:
+                while self.request is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    break
+                request = self.request
+                self.request = None
+                self.running_request_id = request[0]
+
+            try:
+                options = self.search_data_manager.filter(request[1], request[2], after_id=request[3])
+            except sqlite3.OperationalError as e:
+                if str(e) == self._INTERRUPTED_ERROR:
+                    # expected, the search has been replaced by a new request and its result is discarded
+                    logging.debug("search interrupted: %s" % request[1])
+                else:
+                    logging.error("search failed: %s" % str(e))
+                options = False
+            except Exception as e:
+                logging.error("search failed: %s" % str(e))
+                options = False
+
+            with self.condition:
+                self.running_request_id = None
+                if request[0] == self.last_request_id:
+                    self.result = options
+                    self.condition.notify_all()
+        self.search_data_manager.close()
+
+    def search(self, search, n, after_id=None):
+        """
+        request a new search, the previous requests are discarded
+
+        :param search:      filter text
+        :param n:           max number of returned rows
+        :param after_id:    (optional) id of the last option already retrieved with the same search
+        :return:
+        """
+        with self.condition:
+            self.last_request_id += 1
+            self.request = [self.last_request_id, search, n, after_id]
+            self.result = None
+            if self.running_request_id is not None:
+                self.search_data_manager.interrupt()
+            self.condition.notify_all()
+
+    def cancel(self):
+        """
+        discard any requested search and its result
+
+        :return:
+        """
+        with self.condition:
+            self.last_request_id += 1
+            self.request = None
+            self.result = None
+            if self.running_request_id is not None:
+                self.search_data_manager.interrupt()
+
+    def get_result(self, timeout=0):
+        """
+        get the result of the last requested search
+
+        :param timeout:     max time (seconds) to wait for the result
+        :return:            filtered options, None if the result is not available yet or False if the search
+                            has failed
+        """
+        with self.condition:
+            if self.result is None and timeout > 0:
+                self.condition.wait_for(lambda: self.result is not None, timeout)
+            result = self.result
+            self.result = None
+            return result
+
+    def stop(self):
+        """
+        stop the thread, any requested search is discarded
+
+        :return:
+        """
+        with self.condition:
+            self.stopped = True
+            self.request = None
+            if self.running_request_id is not None:
+                self.search_data_manager.interrupt()
+            self.condition.notify_all()
@@ -1,5 +1,6 @@
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from fastHistory.parser.manParser import ManParser
 
@@ -25,6 +26,9 @@ class BashParser(object):
 
     WORD_TO_IGNORE = ["sudo", "true", "false"]
 
+    # max number of man pages loaded at the same time
+    MAN_PAGES_MAX_WORKERS = 4
+
     def __init__(self):
         pass
 
@@ -120,11 +124,19 @@ class BashParser(object):
         return flags
 
     @staticmethod
-    def load_data_for_info_from_man_page(cmd_text):
+    def load_data_for_info_from_man_page(cmd_text, cache_folder=None, publish_partial_result=None,
+                                         man_pages_cache=None):
         """
         retrieve info about the currently selected cmd from the man page
-
-        :param cmd_text:    the bash cmd string
+        the man pages of the commands are loaded concurrently (see MAN_PAGES_MAX_WORKERS)
+
+        :param cmd_text:                the bash cmd string
+        :param cache_folder:            (optional) folder where the parsed man pages are stored for the next sessions
+        :param publish_partial_result:  (optional) function called each time the man page of a command is loaded,
+                                        it receives [True, structured list with info of the loaded cmds] (same
+                                        order of the bash cmd string)
+        :param man_pages_cache:         (optional) parsed man pages of the session (see
+                                        ManParser.load_man_pages_cache), loaded from the cache folder if not given
         :return:            [True, structured list with info for each cmd and flags]
                             [False, error string]
         """
@@ -143,43 +155,90 @@ class BashParser(object):
             return [False, "bashlex cannot read this command"]
         # find all flags for each commands
         parser.get_flags_from_bash_node(cmd_parsed, flags_for_info_cmd)
+        if len(flags_for_info_cmd) == 0:
+            return [True, flags_for_info_cmd]
         # for each cmd and flag find the meaning from the man page
-        man_parsed = ManParser()
-        for item in flags_for_info_cmd:
-            cmd_main = item[BashParser.INDEX_CMD]
-            cmd_flags = item[BashParser.INDEX_FLAGS]
-            if man_parsed.load_man_page(cmd_main[BashParser.INDEX_VALUE]):
-                # save cmd meaning
-                cmd_main[BashParser.INDEX_MEANING] = man_parsed.get_cmd_meaning()
-                # cmd meaning found in the man page
-                if cmd_main[BashParser.INDEX_MEANING]:
-                    cmd_flags_updated = list()
-                    for flag_i in range(len(cmd_flags)):
-                        flag = cmd_flags[flag_i]
-                        flag[BashParser.INDEX_MEANING] = man_parsed.get_flag_meaning(flag[BashParser.INDEX_VALUE])
-                        # if flag found in the man page
-                        if flag[BashParser.INDEX_MEANING]:
-                            cmd_flags_updated.append(flag)
-                        else:
-                            # try to check if flag is concatenated
-                            conc_flags = BashParser.decompose_possible_concatenated_flags(flag[BashParser.INDEX_VALUE])
-                            for conc_flag in conc_flags:
-                                conc_flag_meaning = man_parsed.get_flag_meaning(conc_flag)
-                                cmd_flags_updated.append([conc_flag, conc_flag_meaning])
-                    # set the updated flags as new list of flags, the old list is deleted
-                    item[BashParser.INDEX_FLAGS] = cmd_flags_updated
+        man_parsed = ManParser(cache_folder, man_pages_cache)
+        loaded = [False] * len(flags_for_info_cmd)
+        with ThreadPoolExecutor(max_workers=min(BashParser.MAN_PAGES_MAX_WORKERS, len(flags_for_info_cmd))) as executor:
+            # each thread needs its own parser, the parsed man pages are shared
+            futures = {executor.submit(BashParser._load_cmd_info_from_man_page, item,
+                                       man_parsed.create_thread_parser()): i
+                       for i, item in enumerate(flags_for_info_cmd)}
+            for future in as_completed(futures):
+                future.result()
+                loaded[futures[future]] = True
+                if publish_partial_result is not None:
+                    publish_partial_result([True, [item for item, is_loaded in zip(flags_for_info_cmd, loaded)
+                                                   if is_loaded]])
+        man_parsed.store_cache()
         return [True, flags_for_info_cmd]
 
+    @staticmethod
+    def _load_cmd_info_from_man_page(item, man_parsed):
+        """
+        find the meaning of the cmd and of its flags from the man page
+
+        :param item:        [cmd, flags] (see get_flags_from_bash_node), it is updated with the meanings
+        :param man_parsed:  parser used only by the current thread
+        :return:
+        """
+        cmd_main = item[BashParser.INDEX_CMD]
+        cmd_flags = item[BashParser.INDEX_FLAGS]
+        if man_parsed.load_man_page(cmd_main[BashParser.INDEX_VALUE]):
+            # save cmd meaning
+            cmd_main[BashParser.INDEX_MEANING] = man_parsed.get_cmd_meaning()
+            # cmd meaning found in the man page
+            if cmd_main[BashParser.INDEX_MEANING]:
+                cmd_flags_updated = list()
+                for flag_i in range(len(cmd_flags)):
+                    flag = cmd_flags[flag_i]
+                    flag[BashParser.INDEX_MEANING] = man_parsed.get_flag_meaning(flag[BashParser.INDEX_VALUE])
+                    # if flag found in the man page
+                    if flag[BashParser.INDEX_MEANING]:
+                        cmd_flags_updated.append(flag)
+                    else:
+                        # try to check if flag is concatenated
+                        conc_flags = BashParser.decompose_possible_concatenated_flags(flag[BashParser.INDEX_VALUE])
+                        for conc_flag in conc_flags:
+                            conc_flag_meaning = man_parsed.get_flag_meaning(conc_flag)
+                            cmd_flags_updated.append([conc_flag, conc_flag_meaning])
+                # set the updated flags as new list of flags, the old list is deleted
+                item[BashParser.INDEX_FLAGS] = cmd_flags_updated
+
 
 class BashParserThread(threading.Thread):
 
-    def __init__(self, cmd_text):
+    def __init__(self, cmd_text, cache_folder=None, result=None, man_pages_cache=None):
+        """
+        :param cmd_text:        the bash cmd string
+        :param cache_folder:    (optional) folder where the parsed man pages are stored for the next sessions
+        :param result:          (optional) info already loaded (see BashParserPrefetchThread), in this case the
+                                thread must not be started
+        :param man_pages_cache: (optional) parsed man pages of the session (see ManParser.load_man_pages_cache)
+        """
         threading.Thread.__init__(self)
         self.cmd_text = cmd_text
-        self.result = [False, "Loading.."]
+        self.cache_folder = cache_folder
+        self.man_pages_cache = man_pages_cache
+        self.result = [False, "Loading.."] if result is None else result
 
     def run(self):
-        self.result = BashParser.load_data_for_info_from_man_page(self.cmd_text)
+        self.result = BashParser.load_data_for_info_from_man_page(self.cmd_text, self.cache_folder,
+                                                                  publish_partial_result=self.set_partial_result,
+                                                                  man_pages_cache=self.man_pages_cache)
+
+    def set_partial_result(self, partial_result):
+        """
+        called each time the man page of a command is loaded
+
+        :param partial_result:  [True, structured list with info of the loaded cmds]
+        :return:
+        """
+        self.result = partial_result
 
     def get_result(self):
+        """
+        :return:    info of the cmds loaded so far (the thread is still alive) or of all the cmds
+        """
         return self.result
@@ -0,0 +1,110 @@
+import logging
+import time
+from collections import OrderedDict
+from threading import Thread, Condition
+
+from fastHistory.parser.bashParser import BashParser
+
+
+class BashParserPrefetchThread(Thread):
+    """
+    Thread used to load in background the man page info of the highlighted command, so the info page can show them
+    as soon as it is opened
+
+    only one command is loaded at a time (the man pages of its commands are loaded by a bounded pool, see
+    BashParser.MAN_PAGES_MAX_WORKERS): the requests received while the user is scrolling replace each other and a
+    command is loaded only when it has been highlighted for PREFETCH_DELAY seconds
+    the loaded info are kept in a bounded LRU cache, the key is the command text
+    """
+
+    # idle time (seconds) before loading the highlighted command
+    PREFETCH_DELAY = 0.3
+    # max number of cached commands
+    CACHE_SIZE = 32
+
+    def __init__(self, cache_folder=None, man_pages_cache=None):
+        """
+        :param cache_folder:    (optional) folder where the parsed man pages are stored for the next sessions
+        :param man_pages_cache: (optional) parsed man pages of the session (see ManParser.load_man_pages_cache)
+        """
+        Thread.__init__(self, daemon=True)
+        self.cache_folder = cache_folder
+        self.man_pages_cache = man_pages_cache
+        self.condition = Condition()
+        # [command text, request time]
+        self.request = None
+        self.running_cmd_text = None
+        self.results = OrderedDict()
+        self.stopped = False
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.stopped and \
+                        (self.request is None or time.time() < self.request[1] + self.PREFETCH_DELAY):
+                    if self.request is None:
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(self.request[1] + self.PREFETCH_DELAY - time.time())
+                if self.stopped:
+                    break
+                cmd_text = self.request[0]
+                self.request = None
+                self.running_cmd_text = cmd_text
+
+            start_time = time.time()
+            result = BashParser.load_data_for_info_from_man_page(cmd_text, self.cache_folder,
+                                                                 man_pages_cache=self.man_pages_cache)
+            logging.debug("info prefetched in %.3f seconds: %s" % (time.time() - start_time, cmd_text))
+
+            with self.condition:
+                self.running_cmd_text = None
+                self._put_result(cmd_text, result)
+                self.condition.notify_all()
+
+    def prefetch(self, cmd_text):
+        """
+        request to load the info of the command when it has been highlighted for PREFETCH_DELAY seconds, the
+        previous request is discarded (the running one is completed)
+
+        :param cmd_text:    the bash cmd string
+        :return:
+        """
+        with self.condition:
+            if cmd_text in self.results or cmd_text == self.running_cmd_text or \
+                    (self.request is not None and self.request[0] == cmd_text):
+                return
+            self.request = [cmd_text, time.time()]
+            self.condition.notify_all()
+
+    def get_result(self, cmd_text, timeout=0):
+        """
+        :param cmd_text:    the bash cmd string
+        :param timeout:     max time (seconds) to wait if the command is loading
+        :return:            info of the command (see BashParser.load_data_for_info_from_man_page) or None if not
+                            loaded yet
+        """
+        with self.condition:
+            if cmd_text not in self.results and cmd_text == self.running_cmd_text and timeout > 0:
+                self.condition.wait_for(lambda: self.running_cmd_text != cmd_text, timeout)
+            result = self.results.get(cmd_text)
+            if result is not None:
+                self.results.move_to_end(cmd_text)
+            return result
+
+    def _put_result(self, cmd_text, result):
+        self.results[cmd_text] = result
+        self.results.move_to_end(cmd_text)
+        if len(self.results) > self.CACHE_SIZE:
+            self.results.popitem(last=False)
+
+    def stop(self):
+        """
+        stop the thread, the requested command is discarded
+
+        :return:
+        """
+        with self.condition:
+            self.stopped = True
+            self.request = None
+            self.condition.notify_all()
@@ -0,0 +1,119 @@
+from typing import Optional
+
+
+class ManPageIndex(object):
+    """
+    Index of the flags described in a man page, built walking the man page only once
+
+    the index finds the same block of lines of ManParser._regexp_flag (the first match in the page):
+        - the flag line is indented by 3-7 spaces more than the line before (a title, a new line, ..) which is
+          indented by at most 7 spaces
+        - the flag line can follow another flag line (e.g. "-q\n--quiet")
+        - the flag is at the beginning of the line or after another flag and a separator ("-a, --all")
+        - the flag is followed by the end of the line, a space or a separator ("-a=PATTERN", "-a[=WHEN]")
+        - the description is made by the following indented lines and it must be followed by an empty line
+    only the flags which start with "-" are indexed
+    """
+
+    MAX_TITLE_INDENTATION = 7
+    MIN_FLAG_INDENTATION_DELTA = 3
+    MAX_FLAG_INDENTATION_DELTA = 7
+
+    FLAG_CHAR = "-"
+    SEPARATORS = ",;"
+    VALUE_SEPARATORS = ",;="
+    OPTIONAL_VALUE_CHAR = "["
+
+    def __init__(self, man_page: str):
+        """
+        :param man_page:    rendered man page
+        """
+        self.lines = man_page.split("\n")
+        # flag -> [first line, flag line, last line] of the first block which describes the flag
+        self.flags = {}
+        lines_count = len(self.lines)
+        indentations = [len(line) - len(line.lstrip(" ")) for line in self.lines]
+        # last line of the description which starts after each line (-1 if the description is not followed by an
+        # empty line)
+        description_end = [-1] * lines_count
+        for i in range(lines_count - 1, -1, -1):
+            if i + 1 < lines_count and self.lines[i + 1].startswith(" "):
+                description_end[i] = description_end[i + 1]
+            else:
+                description_end[i] = i if i + 1 < lines_count and self.lines[i + 1] == "" else -1
+
+        for i in range(lines_count):
+            indentation = indentations[i]
+            line = self.lines[i]
+            if indentation > self.MAX_TITLE_INDENTATION or \
+                    (indentation < len(line) and line[indentation].isspace()):
+                continue
+            # flag line after another flag line (preferred by the regex) or flag line after the title
+            if self._is_flag_line(i + 1, indentation, indentations) and \
+                    self._is_flag_line(i + 2, indentation, indentations):
+                self._add_flags(i + 1, i + 2, description_end[i + 2], indentations)
+            if self._is_flag_line(i + 1, indentation, indentations):
+                self._add_flags(i + 1, i + 1, description_end[i + 1], indentations)
+
+    def _is_flag_line(self, i: int, title_indentation: int, indentations: list) -> bool:
+        if i >= len(self.lines) - 1:
+            # the last line is not followed by a new line char
+            return False
+        indentation_delta = indentations[i] - title_indentation
+        return self.MIN_FLAG_INDENTATION_DELTA <= indentation_delta <= self.MAX_FLAG_INDENTATION_DELTA and \
+            self.lines[i][indentations[i]:indentations[i] + 1] == self.FLAG_CHAR and \
+            len(self.lines[i]) > indentations[i] + 1
+
+    def _add_flags(self, first_line: int, flag_line: int, last_line: int, indentations: list) -> None:
+        """
+        add the flags of the line, if not already found
+
+        :param first_line:  first line of the block
+        :param flag_line:   line with the flags
+        :param last_line:   last line of the description (-1 if not valid)
+        :param indentations: indentation of each line
+        :return:
+        """
+        if last_line == -1:
+            return
+        block = [first_line, flag_line, last_line]
+        text = self.lines[flag_line][indentations[flag_line]:]
+        text_len = len(text)
+        for start in range(text_len):
+            # a flag can be at the beginning or after another flag and a separator (e.g. "-a, --all")
+            if text[start] != self.FLAG_CHAR or \
+                    (start > 0 and (start < 4 or text[start - 1] != " " or text[start - 2] not in self.SEPARATORS)):
+                continue
+            for end in range(start + 1, text_len + 1):
+                if end == text_len or text[end] == " ":
+                    self.flags.setdefault(text[start:end], block)
+                    break
+                if (text[end] in self.VALUE_SEPARATORS and end + 1 < text_len) or \
+                        (text[end] == self.OPTIONAL_VALUE_CHAR and end + 2 < text_len and
+                         text[end + 1] in self.VALUE_SEPARATORS):
+                    self.flags.setdefault(text[start:end], block)
+
+    def get_flag_meaning(self, flag: str) -> Optional[list]:
+        """
+        example of return [(True, 'this is the first line'), (False, 'this is the second line')]
+        the first rows (True) are the rows with the flags
+
+        :param flag:    flag to search (e.g. "-a")
+        :return:        array of tuples or None if the flag is not in the man page
+        """
+        block = self.flags.get(flag)
+        if block is None:
+            return None
+        final_result = []
+        first = True
+        for i in range(block[0], block[2] + 1):
+            row = self.lines[i].strip()
+            if len(row) > 0:
+                if first:
+                    # this check if done to handle the case of flags on multi lines ( es "-a\n--all")
+                    if flag in row:
+                        first = False
+                    final_result.append((True, row))
+                else:
+                    final_result.append((False, row))
+        return final_result
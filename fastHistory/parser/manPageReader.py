@@ -0,0 +1,467 @@
+import bz2
+import gzip
+import logging
+import lzma
+import os
+import re
+from threading import Lock
+from typing import Optional
+
+
+class ManPageReader(object):
+    """
+    Reader of the man page sources (e.g. "/usr/share/man/man1/ls.1.gz"), used to avoid to execute "man" (and the
+    formatter) for each command
+
+    the source is found in the man path (MANPATH or the default folders), decompressed and rendered in-process
+    with a lightweight reader of the man(7) macros which produces the same layout of the rendered man page
+    (see ManParser._regex_name and ManPageIndex):
+        - the titles are not indented, the subtitles are indented by 3 spaces
+        - the paragraphs are indented by 7 spaces, the tagged paragraphs (e.g. the flags) by 7 more spaces
+        - the paragraphs are separated by an empty line
+    the pages which cannot be read (e.g. mdoc(7) pages) must be rendered by the "man" command
+    """
+
+    # sections of the man pages of the commands, in the same order of "man"
+    SECTIONS = ["1", "8", "6"]
+    DEFAULT_MAN_PATH = ["/usr/local/share/man", "/usr/share/man", "/usr/local/man", "/usr/man",
+                        "/opt/local/share/man", "/opt/homebrew/share/man"]
+    COMPRESSED_FILE_OPENERS = {
+        ".gz": gzip.open,
+        ".bz2": bz2.open,
+        ".xz": lzma.open,
+        ".lzma": lzma.open
+    }
+    # max number of ".so" (include) requests to follow
+    MAX_SO_DEPTH = 3
+    # the mdoc(7) pages are not supported
+    MDOC_MACROS = ["Dd", "Dt", "Sh"]
+
+    def __init__(self, man_path: Optional[str] = None, path: Optional[str] = None):
+        """
+        :param man_path:    (optional) value of MANPATH, the environment variable is used if not specified
+        :param path:        (optional) value of PATH, the environment variable is used if not specified
+        """
+        self.man_path_folders = self._get_man_path_folders(os.environ.get("MANPATH") if man_path is None else man_path,
+                                                           os.environ.get("PATH", "") if path is None else path)
+        # command -> source path of its man page, built on the first search
+        self.sources = None
+        self.lock = Lock()
+
+    @staticmethod
+    def _get_man_path_folders(man_path: Optional[str], path: str) -> list:
+        """
+        get the man path folders in the same order of "man"
+        if MANPATH is not defined, the default folders are used with the "man" folders next to the PATH folders
+        (e.g. "/opt/tool/bin" -> "/opt/tool/share/man"), an empty item of MANPATH is replaced with the default folders
+
+        :param man_path:    value of MANPATH (None if not defined)
+        :param path:        value of PATH
+        :return:            existing man path folders
+        """
+        default_folders = []
+        for folder in path.split(":"):
+            if len(folder) > 0:
+                parent_folder = os.path.dirname(folder.rstrip("/"))
+                default_folders.append(os.path.join(parent_folder, "share", "man"))
+                default_folders.append(os.path.join(parent_folder, "man"))
+        default_folders += ManPageReader.DEFAULT_MAN_PATH
+
+        if man_path is None or len(man_path) == 0:
+            folders = default_folders
+        else:
+            folders = []
+            for folder in man_path.split(":"):
+                if len(folder) == 0:
+                    folders += default_folders
+                else:
+                    folders.append(folder)
+
+        man_path_folders = []
+        for folder in folders:
+            folder = os.path.realpath(folder)
+            if folder not in man_path_folders and os.path.isdir(folder):
+                man_path_folders.append(folder)
+        return man_path_folders
+
+    def _get_sources(self) -> dict:
+        """
+        list the man pages of the commands only once, so each search costs only a dictionary lookup
+
+        :return:    command -> source path of its man page
+        """
+        with self.lock:
+            if self.sources is None:
+                sources = {}
+                for section in self.SECTIONS:
+                    for folder in self.man_path_folders:
+                        section_folder = os.path.join(folder, "man" + section)
+                        try:
+                            file_names = sorted(os.listdir(section_folder))
+                        except OSError:
+                            continue
+                        for file_name in file_names:
+                            name, extension = os.path.splitext(file_name)
+                            if extension in self.COMPRESSED_FILE_OPENERS:
+                                name, extension = os.path.splitext(name)
+                            # e.g. "ls.1", "openssl.1ssl", "ls.1.gz"
+                            if extension[1:].startswith(section):
+                                sources.setdefault(name, os.path.join(section_folder, file_name))
+                self.sources = sources
+            return self.sources
+
+    def find_man_page_source(self, cmd: str) -> Optional[str]:
+        """
+        :param cmd: command string
+        :return:    path of the man page source or None if not found
+        """
+        return self._get_sources().get(cmd)
+
+    def read_man_page(self, source_path: str) -> Optional[str]:
+        """
+        read and render the man page source
+
+        :param source_path: path of the man page source
+        :return:            rendered man page or None if the page cannot be read
+        """
+        for _ in range(self.MAX_SO_DEPTH + 1):
+            source = self._read_source(source_path)
+            if source is None:
+                return None
+            # pages which only include another page (e.g. ".so man1/gzip.1")
+            so_request = re.match(r"^\.so\s+(\S+)\s*$", source.strip())
+            if so_request is None:
+                break
+            # the path is relative to the man path folder
+            source_path = os.path.join(os.path.dirname(os.path.dirname(source_path)), so_request.group(1))
+            if not os.path.exists(source_path):
+                for extension in self.COMPRESSED_FILE_OPENERS:
+                    if os.path.exists(source_path + extension):
+                        source_path += extension
+                        break
+        else:
+            logging.debug("too many includes: %s" % source_path)
+            return None
+
+        if re.search(r"^\.(?:%s)\b" % "|".join(self.MDOC_MACROS), source, re.MULTILINE):
+            logging.debug("mdoc man page not supported: %s" % source_path)
+            return None
+        man_page = ManPageRenderer().render(source)
+        if not man_page.startswith("NAME\n") and "\nNAME\n" not in man_page:
+            logging.debug("NAME section not found: %s" % source_path)
+            return None
+        return man_page
+
+    def _read_source(self, source_path: str) -> Optional[str]:
+        """
+        :param source_path: path of the man page source (compressed or not)
+        :return:            content of the man page source or None if it cannot be read
+        """
+        open_function = self.COMPRESSED_FILE_OPENERS.get(os.path.splitext(source_path)[1], open)
+        try:
+            with open_function(source_path, "rb") as f:
+                return f.read().decode("utf-8", errors="replace")
+        except (OSError, EOFError, lzma.LZMAError) as e:
+            logging.debug("man page source cannot be read %s: %s" % (source_path, str(e)))
+            return None
+
+
+class ManPageRenderer(object):
+    """
+    Lightweight reader of the man(7) macros, only the layout needed to find the meaning of the command and of its
+    flags is rendered (titles, paragraphs, tagged paragraphs and indentation)
+
+    the unknown requests are ignored, as the conditional requests and the macro definitions
+    """
+
+    LINE_WIDTH = 80
+    MIN_LINE_WIDTH = 20
+    TITLE_INDENTATION = 0
+    SUBTITLE_INDENTATION = 3
+    SECTION_INDENTATION = 7
+    PARAGRAPH_INDENTATION = 7
+
+    # used to keep the words together while the lines are wrapped
+    NON_BREAKING_SPACE = "\x00"
+
+    ESCAPE_REGEX = re.compile(r"\\(?:"
+                              r"(?P<comment>[\"#].*)"
+                              r"|\*(?:\[(?P<named_string>[^\]]*)\]|\((?P<string>..)|(?P<char_string>.))"
+                              r"|[fFn](?:\[[^\]]*\]|\(..|[-+]?.)"
+                              r"|s(?:[-+]?\d|\(\d\d|\[[^\]]*\])"
+                              r"|[hvwlLNoDbxXZSHRCAk]'[^']*'"
+                              r"|\((?P<char>..)"
+                              r"|\[(?P<named_char>[^\]]*)\]"
+                              r"|(?P<escape>.)"
+                              r")")
+    ARGUMENTS_REGEX = re.compile(r"\"((?:[^\"]|\"\")*)\"?|((?:\\.|\S)+)")
+
+    SPECIAL_CHARS = {
+        "hy": "-", "en": "-", "em": "—", "mi": "-", "aq": "'", "dq": "\"", "lq": "\"", "rq": "\"", "oq": "'",
+        "cq": "'", "bu": "•", "rs": "\\", "ti": "~", "ha": "^", "ga": "`", "co": "©", "rg": "®", "tm": "™",
+        "mu": "×", "<=": "≤", ">=": "≥", "->": "→", "<-": "←", "sl": "/", "ba": "|", "lB": "[", "rB": "]",
+        "lC": "{", "rC": "}", "la": "<", "ra": ">"
+    }
+    # predefined strings (e.g. "\*(lq") and the ones defined by pod2man
+    STRINGS = {
+        "lq": "\"", "rq": "\"", "R": "(R)", "Tm": "(TM)", "Aq": "'", "C`": "\"", "C'": "\"", "PI": "pi"
+    }
+    SINGLE_CHAR_ESCAPES = {
+        "-": "-", "e": "\\", "\\": "\\", ".": ".", "'": "'", "`": "`", "t": " ",
+        " ": NON_BREAKING_SPACE, "~": NON_BREAKING_SPACE, "0": NON_BREAKING_SPACE
+    }
+
+    # macros which join their arguments with spaces or alternating the fonts (without spaces)
+    FONT_MACROS = ["B", "I", "SM", "SB"]
+    ALTERNATING_FONT_MACROS = ["BR", "BI", "IB", "IR", "RB", "RI"]
+    # macros often defined by the page generators (pod2man, rst2man)
+    MACRO_ALIASES = {
+        "Sp": "sp", "Vb": "nf", "Ve": "fi", "EX": "nf", "EE": "fi", "INDENT": "RS", "UNINDENT": "RE",
+        "LP": "PP", "P": "PP", "HP": "PP"
+    }
+    CONTINUATION_REGEX = re.compile(r"(?<!\\)((?:\\\\)*)\\\n")
+    REQUEST_NAME_REGEX = re.compile(r"[^\s\\]*")
+    MACRO_DEFINITION_END_REGEX = re.compile(r"^[.'] *\.")
+
+    def __init__(self):
+        self.lines = []
+        self.title_line = None
+        self.base_indentation = self.SECTION_INDENTATION
+        self.base_indentation_stack = []
+        self.paragraph_indentation = self.SECTION_INDENTATION
+        self.prevailing_indentation = self.PARAGRAPH_INDENTATION
+        self.is_paragraph_distance = True
+        self.words = []
+        self.tag = None
+        self.is_tag_next = False
+        self.is_title_next = None
+        self.fill = True
+
+    def render(self, source: str) -> str:
+        """
+        :param source:  man page source
+        :return:        rendered man page
+        """
+        # lines which end with "\" continue in the next line
+        source = self.CONTINUATION_REGEX.sub(r"\1", source)
+        is_macro_definition = False
+        # nesting level of the skipped conditional blocks ("\{ .. \}")
+        skipped_blocks = 0
+        for line in source.split("\n"):
+            if is_macro_definition:
+                is_macro_definition = self.MACRO_DEFINITION_END_REGEX.match(line) is None
+                continue
+            if skipped_blocks > 0:
+                skipped_blocks += line.count("\\{") - line.count("\\}")
+                continue
+            if len(line) > 0 and line[0] in ".'":
+                request = line[1:].lstrip(" \t")
+                name = self.REQUEST_NAME_REGEX.match(request).group(0)
+                if name in ["de", "de1", "am", "ig"]:
+                    # macro definition or ignored block
+                    is_macro_definition = True
+                elif name in ["if", "ie", "el"]:
+                    skipped_blocks = line.count("\\{") - line.count("\\}")
+                else:
+                    self._request(self.MACRO_ALIASES.get(name, name), request[len(name):])
+            else:
+                self._text(line)
+        self._flush()
+        # the last paragraph is followed by an empty line, as the paragraphs before
+        self.lines.append("")
+        while len(self.lines) > 1 and self.lines[-2] == "":
+            self.lines.pop()
+        return "\n".join(self.lines) + "\n"
+
+    def _request(self, name: str, arguments_text: str) -> None:
+        arguments = [m.group(1).replace("\"\"", "\"") if m.group(1) is not None else m.group(2)
+                     for m in self.ARGUMENTS_REGEX.finditer(arguments_text)]
+        if name in ["SH", "SS"]:
+            self._flush()
+            self._empty_line()
+            self.base_indentation = self.SECTION_INDENTATION
+            self.base_indentation_stack = []
+            self.paragraph_indentation = self.base_indentation
+            self.prevailing_indentation = self.PARAGRAPH_INDENTATION
+            indentation = self.TITLE_INDENTATION if name == "SH" else self.SUBTITLE_INDENTATION
+            if len(arguments) > 0:
+                self._add_title(indentation, self._escape(" ".join(arguments)))
+            else:
+                # the title is in the next line
+                self.is_title_next = indentation
+        elif name == "PP":
+            self.prevailing_indentation = self.PARAGRAPH_INDENTATION
+            self._new_paragraph(self.base_indentation)
+        elif name in ["TP", "TQ"]:
+            if name == "TP":
+                self._set_prevailing_indentation(arguments, 0)
+                self._new_paragraph(self.base_indentation + self.prevailing_indentation)
+            else:
+                self._flush()
+            self.is_tag_next = True
+        elif name == "IP":
+            self._set_prevailing_indentation(arguments, 1)
+            self._new_paragraph(self.base_indentation + self.prevailing_indentation)
+            if len(arguments) > 0 and len(arguments[0]) > 0:
+                self.tag = self._escape(arguments[0])
+        elif name == "RS":
+            self._flush()
+            self.base_indentation_stack.append(self.base_indentation)
+            self._set_prevailing_indentation(arguments, 0)
+            self.base_indentation += self.prevailing_indentation
+            self.paragraph_indentation = self.base_indentation
+            self.prevailing_indentation = self.PARAGRAPH_INDENTATION
+        elif name == "RE":
+            self._flush()
+            if len(self.base_indentation_stack) > 0:
+                self.base_indentation = self.base_indentation_stack.pop()
+            self.paragraph_indentation = self.base_indentation
+            self.prevailing_indentation = self.PARAGRAPH_INDENTATION
+        elif name == "PD":
+            # ".PD 0" removes the empty line between the paragraphs (e.g. "-q\n--quiet")
+            self.is_paragraph_distance = len(arguments) == 0 or self._get_indentation(arguments[0]) != 0
+        elif name == "br":
+            self._flush()
+        elif name == "sp":
+            self._flush()
+            self._empty_line()
+        elif name == "nf":
+            self._flush()
+            self.fill = False
+        elif name == "fi":
+            self._flush()
+            self.fill = True
+        elif name in self.FONT_MACROS:
+            if len(arguments) > 0:
+                self._text(" ".join(arguments))
+        elif name in self.ALTERNATING_FONT_MACROS:
+            if len(arguments) > 0:
+                self._text("".join(arguments))
+        # other requests (e.g. "TH", "ft", "ds") do not change the layout
+
+    def _set_prevailing_indentation(self, arguments: list, index: int) -> None:
+        """
+        :param arguments:   arguments of the request
+        :param index:       position of the (optional) indentation argument
+        :return:
+        """
+        if len(arguments) > index:
+            indentation = self._get_indentation(arguments[index])
+            if indentation is not None:
+                self.prevailing_indentation = indentation
+
+    @staticmethod
+    def _get_indentation(argument: str) -> Optional[int]:
+        """
+        :param argument:    indentation argument (e.g. "4", "4n", "0.5i")
+        :return:            number of chars or None if the unit is not supported
+        """
+        match = re.match(r"^(\d+(?:\.\d*)?)([nmi]?)$", argument)
+        if match is None:
+            return None
+        # one inch is 10 chars in a terminal
+        return int(round(float(match.group(1)) * (10 if match.group(2) == "i" else 1)))
+
+    def _text(self, text: str) -> None:
+        text = self._escape(text)
+        if self.is_title_next is not None:
+            self._add_title(self.is_title_next, text)
+            self.is_title_next = None
+        elif self.is_tag_next:
+            if self.tag is not None:
+                # more tags (".TQ")
+                self._add_line(self.base_indentation, self.tag)
+            self.tag = text.strip()
+            self.is_tag_next = False
+        elif not self.fill:
+            self._flush()
+            self._add_line(self.paragraph_indentation, text.replace(self.NON_BREAKING_SPACE, " ").rstrip())
+        elif len(text.strip()) == 0:
+            # an empty line is an empty line in the output too
+            self._flush()
+            self._empty_line()
+        else:
+            if text[0].isspace():
+                # a line which starts with a space starts a new line in the output too
+                self._flush()
+            self.words += text.split()
+
+    def _new_paragraph(self, paragraph_indentation: int) -> None:
+        self._flush()
+        if self.is_paragraph_distance:
+            self._empty_line()
+        self.paragraph_indentation = paragraph_indentation
+
+    def _flush(self) -> None:
+        """
+        write the words of the current paragraph (and its tag) wrapped in the available space
+        """
+        tag = self.tag
+        self.tag = None
+        rows = self._wrap(self.words, max(self.LINE_WIDTH - self.paragraph_indentation, self.MIN_LINE_WIDTH))
+        self.words = []
+        if tag is not None:
+            tag_indentation = min(self.base_indentation, self.paragraph_indentation)
+            if len(rows) > 0 and tag_indentation + len(tag) < self.paragraph_indentation:
+                # a short tag is on the same line of the text (e.g. "-a     show all")
+                rows[0] = tag.ljust(self.paragraph_indentation - tag_indentation) + rows[0]
+                self._add_line(tag_indentation, rows.pop(0))
+            else:
+                self._add_line(tag_indentation, tag)
+        for row in rows:
+            self._add_line(self.paragraph_indentation, row)
+
+    @staticmethod
+    def _wrap(words: list, width: int) -> list:
+        """
+        :param words:   words of the paragraph
+        :param width:   max length of a row (longer words are not split)
+        :return:        rows of the paragraph
+        """
+        rows = []
+        row_start = 0
+        row_length = -1
+        for i in range(len(words)):
+            if row_length + 1 + len(words[i]) > width and i > row_start:
+                rows.append(" ".join(words[row_start:i]))
+                row_start = i
+                row_length = -1
+            row_length += 1 + len(words[i])
+        if row_start < len(words):
+            rows.append(" ".join(words[row_start:]))
+        return rows
+
+    def _add_line(self, indentation: int, text: str) -> None:
+        self.lines.append(" " * indentation + text.replace(self.NON_BREAKING_SPACE, " "))
+
+    def _add_title(self, indentation: int, text: str) -> None:
+        self._add_line(indentation, text.strip())
+        self.title_line = len(self.lines) - 1
+
+    def _empty_line(self) -> None:
+        # the first paragraph is next to its title
+        if len(self.lines) > 0 and self.lines[-1] != "" and len(self.lines) - 1 != self.title_line:
+            self.lines.append("")
+
+    def _escape(self, text: str) -> str:
+        """
+        :param text:    text with escape sequences (e.g. "\\fB\\-a\\fR")
+        :return:        text to show (e.g. "-a")
+        """
+        if "\\" not in text:
+            return text
+        return self.ESCAPE_REGEX.sub(self._replace_escape, text)
+
+    def _replace_escape(self, match) -> str:
+        for group in ["string", "named_string", "char_string"]:
+            if match.group(group) is not None:
+                return self.STRINGS.get(match.group(group), "")
+        if match.group("char") is not None:
+            return self.SPECIAL_CHARS.get(match.group("char"), "")
+        if match.group("named_char") is not None:
+            return self.SPECIAL_CHARS.get(match.group("named_char"), "")
+        escape = match.group("escape")
+        if escape is not None:
+            # e.g. "\&", "\,", "\/" and "\c" are not printed
+            return self.SINGLE_CHAR_ESCAPES.get(escape, "")
+        return ""
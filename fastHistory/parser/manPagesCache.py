@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import threading
+from threading import Lock
+from typing import Optional
+
+
+class ManPagesCache(object):
+    """
+    Meaning of the commands and of their flags parsed from the man pages, stored in the data folder so the man
+    page of a command is rendered and parsed only the first time
+
+    each command is valid only for the man page source (path and modification time) used to parse it, so the
+    cache is invalidated when a package update changes the page
+    the flags are added when they are requested for the first time (the meaning is None if the flag is not in the
+    man page)
+    note: the cache can be shared by the threads which load the man pages of different commands
+    """
+
+    CACHE_FILE_NAME = "man_pages_cache.json"
+    CACHE_VERSION = 1
+    # max number of stored commands, the oldest are removed first
+    CACHE_MAX_PAGES = 500
+
+    INDEX_PAGE_SOURCE_PATH = 0
+    INDEX_PAGE_SOURCE_MTIME = 1
+    INDEX_PAGE_MEANING = 2
+    INDEX_PAGE_FLAGS = 3
+
+    def __init__(self, pages: Optional[dict] = None):
+        """
+        :param pages:   (optional) parsed commands, command -> [source path, source modification time, meaning,
+                        flag -> meaning]
+        """
+        self.pages = {} if pages is None else pages
+        self.changed = False
+        self.lock = Lock()
+
+    @staticmethod
+    def load(file_path: str) -> Optional["ManPagesCache"]:
+        """
+        read the cache from a file
+
+        :param file_path:   cache file
+        :return:            cache or None if the file does not exist or it is not valid
+        """
+        if not os.path.isfile(file_path):
+            return None
+        try:
+            with open(file_path, "r") as f:
+                data = json.load(f)
+            if data["version"] != ManPagesCache.CACHE_VERSION:
+                logging.info("man pages cache version not supported: %s" % data["version"])
+                return None
+            return ManPagesCache(data["pages"])
+        except (ValueError, KeyError, OSError) as e:
+            logging.error("man pages cache cannot be loaded: %s" % e)
+            return None
+
+    def save(self, file_path: str) -> bool:
+        """
+        write the cache to a file, the file is replaced atomically because it can be read by other sessions
+
+        :param file_path:   cache file
+        :return:            True if the cache has been stored
+        """
+        # the cache can be stored by more threads (e.g. the info page and the prefetch of the next command)
+        file_path_tmp = "%s.%d.%d.tmp" % (file_path, os.getpid(), threading.get_ident())
+        try:
+            with self.lock, open(file_path_tmp, "w") as f:
+                json.dump({
+                    "version": self.CACHE_VERSION,
+                    "pages": self.pages
+                }, f, separators=(",", ":"))
+                self.changed = False
+            os.replace(file_path_tmp, file_path)
+            return True
+        except OSError as e:
+            logging.error("man pages cache cannot be stored: %s" % e)
+            if os.path.exists(file_path_tmp):
+                os.remove(file_path_tmp)
+            return False
+
+    def get_page(self, cmd: str, source_path: str, source_mtime: float) -> Optional[list]:
+        """
+        :param cmd:             command name (e.g. "ls")
+        :param source_path:     path of the man page source
+        :param source_mtime:    modification time of the man page source
+        :return:                [source path, source modification time, meaning, flag -> meaning] or None if the
+                                command has not been parsed yet or its man page has changed
+        """
+        page = self.pages.get(cmd)
+        if page is None or page[self.INDEX_PAGE_SOURCE_PATH] != source_path or \
+                page[self.INDEX_PAGE_SOURCE_MTIME] != source_mtime:
+            return None
+        return page
+
+    def set_page(self, cmd: str, source_path: str, source_mtime: float, meaning: Optional[list]) -> list:
+        """
+        :param cmd:             command name (e.g. "ls")
+        :param source_path:     path of the man page source
+        :param source_mtime:    modification time of the man page source
+        :param meaning:         meaning of the command (see ManParser.get_cmd_meaning)
+        :return:                [source path, source modification time, meaning, flag -> meaning]
+        """
+        page = [source_path, source_mtime, meaning, {}]
+        with self.lock:
+            self.pages.pop(cmd, None)
+            self.pages[cmd] = page
+            while len(self.pages) > self.CACHE_MAX_PAGES:
+                del self.pages[next(iter(self.pages))]
+            self.changed = True
+        return page
+
+    def set_flag_meaning(self, page: list, flag: str, meaning: Optional[list]) -> None:
+        """
+        :param page:    parsed command (see "get_page")
+        :param flag:    flag of the command (e.g. "-a")
+        :param meaning: meaning of the flag (see ManParser.get_flag_meaning)
+        :return:
+        """
+        with self.lock:
+            page[self.INDEX_PAGE_FLAGS][flag] = meaning
+            self.changed = True
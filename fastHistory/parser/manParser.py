@@ -1,9 +1,14 @@
 import logging
+import os
 import sre_constants
 import subprocess
 import re
 import sys
 
+from fastHistory.parser.manPageIndex import ManPageIndex
+from fastHistory.parser.manPageReader import ManPageReader
+from fastHistory.parser.manPagesCache import ManPagesCache
+
 
 class ManParser(object):
     """
@@ -44,27 +49,171 @@ class ManParser(object):
     #       "\n      -a, --all\n        do not ignore entries starting with ."
     #       "\n      -q\n--quiet     Turn off Wget's output."
     # Final note:
-    #                       this may be improved in the future using an external parser of the man page
+    #                       the flags are searched with ManPageIndex, which finds the same match of this regex
+    #                       walking the man page only once (the regex can backtrack badly on large pages)
     _regexp_flag = r"^( {0,7})(?:\S.*)?((\n\1 {3,7}-.+)?\n\1 {3,7}(-.+[,;] )*%s(?:(?:\[)?[,;=].+(\])?)?(?: .*)?\n(?: +.*\n)*)$"
 
     INDEX_IS_FIRST_LINE = 0
     INDEX_MEANING_VALUE = 1
 
-    def __init__(self):
+    # reader of the man page sources, shared by all the parsers (see _get_man_page_reader)
+    _man_page_reader = None
+    # commands without man page found in this session, they are not searched again (see load_man_page)
+    _man_pages_not_found = set()
+
+    def __init__(self, cache_folder=None, man_pages_cache=None):
+        """
+        :param cache_folder:    (optional) folder where the parsed man pages are stored for the next sessions
+        :param man_pages_cache: (optional) parsed man pages already loaded from the cache folder
+        """
         self.cmd = None
+        self.man_page_source = None
         self.man_page = None
+        self.man_page_index = None
+        self.cache_folder = cache_folder
+        self.man_pages_cache = man_pages_cache
+        # parsed man page of the current command (see ManPagesCache)
+        self.cached_page = None
 
     def load_man_page(self, cmd):
         """
-        execute "man cmd"
-        More info: https://stackoverflow.com/a/4760517/6815066
-        Note: if the command takes more than 1 second it is terminated (TimeoutExpired)
-              This avoids to block the UI if the man command does not respond
+        load the man page of the command
+        if the cache folder is defined and the command has already been parsed with the same man page source, the
+        man page is rendered only if a flag not parsed yet is requested
+        if the source cannot be found without rendering the page, the man page is rendered by the man command and
+        it is not cached
+        a command without man page is remembered for the whole session, so it does not cost a new search
 
         :param cmd: command string
         :return:    True if man page is found, False otherwise
         """
         self.cmd = cmd
+        self.man_page_source = None
+        self.man_page = None
+        self.man_page_index = None
+        self.cached_page = None
+        if cmd in self._man_pages_not_found:
+            return False
+        source = self._find_man_page_source(cmd)
+        if source is None:
+            logging.info("man page not found for: %s" % str(cmd))
+            self._man_pages_not_found.add(cmd)
+            return False
+        if source[0] is None:
+            # the page cannot be cached without its source, the man command may still find it
+            if self._render_man_page(cmd):
+                return True
+            self._man_pages_not_found.add(cmd)
+            return False
+        self.man_page_source = source[0]
+        if self.cache_folder is not None:
+            man_pages_cache = self._get_man_pages_cache()
+            self.cached_page = man_pages_cache.get_page(cmd, source[0], source[1])
+            if self.cached_page is not None:
+                logging.debug("man page loaded from cache: %s" % cmd)
+                return True
+            if not self._render_man_page(cmd, self.man_page_source):
+                return False
+            self.cached_page = man_pages_cache.set_page(cmd, source[0], source[1], self._parse_cmd_meaning())
+            return True
+        return self._render_man_page(cmd, self.man_page_source)
+
+    @staticmethod
+    def _get_man_page_reader():
+        """
+        :return: reader of the man page sources (created only once, it lists the man path on the first search)
+        """
+        if ManParser._man_page_reader is None:
+            ManParser._man_page_reader = ManPageReader()
+        return ManParser._man_page_reader
+
+    @staticmethod
+    def load_man_pages_cache(cache_folder) -> ManPagesCache:
+        """
+        the same cache should be shared by all the parsers of a session (see "man_pages_cache" parameter), so it
+        is loaded only once and it is stored without losing the pages parsed by the other parsers
+
+        :param cache_folder:    folder where the parsed man pages are stored
+        :return:                parsed man pages stored in the cache folder (empty if not stored yet)
+        """
+        man_pages_cache = ManPagesCache.load(cache_folder + ManPagesCache.CACHE_FILE_NAME)
+        if man_pages_cache is None:
+            man_pages_cache = ManPagesCache()
+        return man_pages_cache
+
+    def _get_man_pages_cache(self) -> ManPagesCache:
+        """
+        :return: parsed man pages stored in the cache folder (loaded only once)
+        """
+        if self.man_pages_cache is None:
+            self.man_pages_cache = self.load_man_pages_cache(self.cache_folder)
+        return self.man_pages_cache
+
+    def create_thread_parser(self):
+        """
+        each thread must use its own parser because the parser keeps the loaded man page, the parsed man pages
+        are shared with the new parser (the cache is loaded by the calling thread)
+
+        :return:    new parser which uses the same cache of this parser
+        """
+        if self.cache_folder is None:
+            return ManParser()
+        return ManParser(self.cache_folder, self._get_man_pages_cache())
+
+    def store_cache(self):
+        """
+        store the parsed man pages in the cache folder (only if something has changed)
+
+        :return:    True if the cache is up to date
+        """
+        if self.man_pages_cache is None or not self.man_pages_cache.changed:
+            return True
+        return self.man_pages_cache.save(self.cache_folder + ManPagesCache.CACHE_FILE_NAME)
+
+    @staticmethod
+    def _find_man_page_source(cmd):
+        """
+        find the source of the man page in the man path, if not found execute "man -w cmd" (the page is not
+        rendered)
+
+        :param cmd: command string
+        :return:    [path, modification time] of the man page source, [None, None] if the source cannot be found
+                    without rendering the page ("man -w" is not available, it fails or it does not respond) or None
+                    if the command has no man page
+        """
+        path = ManParser._get_man_page_reader().find_man_page_source(cmd)
+        try:
+            if path is None:
+                path = subprocess.check_output(
+                    ["man", "-w", cmd],
+                    stderr=subprocess.DEVNULL,
+                    timeout=5).decode('utf-8').strip().split("\n")[0]
+            if len(path) == 0:
+                return None
+            return [path, os.stat(path).st_mtime]
+        except subprocess.CalledProcessError:
+            # "man -w" has not found the page
+            return None
+        except (subprocess.SubprocessError, OSError, UnicodeDecodeError) as e:
+            logging.debug("man page source not available for %s: %s" % (cmd, str(e)))
+            return [None, None]
+
+    def _render_man_page(self, cmd, source_path=None):
+        """
+        read the man page source (see ManPageReader), if the source cannot be read execute "man cmd"
+        More info: https://stackoverflow.com/a/4760517/6815066
+        Note: if the command takes more than 1 second it is terminated (TimeoutExpired)
+              This avoids to block the UI if the man command does not respond
+
+        :param cmd:         command string
+        :param source_path: (optional) path of the man page source
+        :return:            True if man page is found, False otherwise
+        """
+        if source_path is not None:
+            self.man_page = self._get_man_page_reader().read_man_page(source_path)
+            if self.man_page is not None:
+                return True
+            logging.debug("man page source not supported, the man command is used: %s" % source_path)
         try:
             self.man_page = subprocess.check_output(
                 ["man", cmd],
@@ -115,36 +264,28 @@ class ManParser(object):
         :param flag:
         :return:        array of tuples
         """
-        final_result = []
+        if self.cached_page is not None:
+            flags = self.cached_page[ManPagesCache.INDEX_PAGE_FLAGS]
+            if flag in flags:
+                return self._get_meaning_rows(flags[flag])
+            if self.man_page is None and not self._render_man_page(self.cmd, self.man_page_source):
+                return None
+            meaning = self._parse_flag_meaning(flag)
+            self.man_pages_cache.set_flag_meaning(self.cached_page, flag, meaning)
+            return meaning
+        return self._parse_flag_meaning(flag)
+
+    def _parse_flag_meaning(self, flag):
         if self.man_page is None:
             logging.debug("man_page is None")
             return None
-        else:
-            try:
-                result = re.search(self._regexp_flag % flag, self.man_page, re.MULTILINE)
-                if result is not None:
-                    result = result.group(2)
-                else:
-                    logging.debug("regex does not match: '%s'" % flag)
-                    return None
-            except Exception:
-                logging.debug("regex does not match with error: %s" % flag)
-                return None
-
-        rows = result.split("\n")
-        first = True
-        for i in range(len(rows)):
-            # remove starting and ending spaces
-            row = rows[i].strip()
-            if len(row) > 0:
-                if first:
-                    # this check if done to handle the case of flags on multi lines ( es "-a\n--all")
-                    if flag in row:
-                        first = False
-                    final_result.append((True, row))
-                else:
-                    final_result.append((False, row))
-        return final_result
+        # the man page is parsed only once for all the flags
+        if self.man_page_index is None:
+            self.man_page_index = ManPageIndex(self.man_page)
+        result = self.man_page_index.get_flag_meaning(flag)
+        if result is None:
+            logging.debug("flag not found: '%s'" % flag)
+        return result
 
     def get_cmd_meaning(self):
         """
@@ -153,6 +294,21 @@ class ManParser(object):
 
         :return:        array of tuples
         """
+        if self.cached_page is not None:
+            return self._get_meaning_rows(self.cached_page[ManPagesCache.INDEX_PAGE_MEANING])
+        return self._parse_cmd_meaning()
+
+    @staticmethod
+    def _get_meaning_rows(meaning):
+        """
+        :param meaning: meaning read from the cache (the tuples are stored as lists)
+        :return:        array of tuples
+        """
+        if meaning is None:
+            return None
+        return [tuple(row) for row in meaning]
+
+    def _parse_cmd_meaning(self):
         if self.man_page is None:
             logging.error("man_page is empty")
             return None
@@ -182,4 +338,6 @@ class ManParser(object):
         return final_result
 
     def get_man_page(self):
+        if self.man_page is None and self.cached_page is not None:
+            self._render_man_page(self.cmd, self.man_page_source)
         return self.man_page
@@ -38,16 +38,19 @@ class LoopEdit(object):
         input_error_msg = None
 
         while True:
+            # read before the result, so the page is drawn again if the last commands are loaded meanwhile
+            is_loading = bash_parser_thread.is_alive()
             if page_command.has_minimum_size():
                 page_command.clean_page()
                 page_command.draw_page_edit(command_text=command_t.get_text_to_print(),
                                             command_cursor_index=command_t.get_cursor_index_to_print(),
                                             input_error_msg=input_error_msg,
-                                            data_from_man_page=bash_parser_thread.get_result())
+                                            data_from_man_page=bash_parser_thread.get_result(),
+                                            is_loading=is_loading)
                 page_command.refresh_page()
 
             # wait for char
-            c = self.drawer.wait_next_char(multi_threading_mode=bash_parser_thread.is_alive())
+            c = self.drawer.wait_next_char(multi_threading_mode=is_loading)
 
             if c == Keys.KEY_TIMEOUT:
                 continue
@@ -130,16 +133,19 @@ class LoopEdit(object):
         input_error_msg = None
 
         while True:
+            # read before the result, so the page is drawn again if the last commands are loaded meanwhile
+            is_loading = bash_parser_thread.is_alive()
             if page_desc.has_minimum_size():
                 page_desc.clean_page()
                 page_desc.draw_page_edit(description_text=description_t.get_text_to_print(),
                                          description_cursor_index=description_t.get_cursor_index_to_print(),
                                          input_error_msg=input_error_msg,
-                                         data_from_man_page = bash_parser_thread.get_result())
+                                         data_from_man_page=bash_parser_thread.get_result(),
+                                         is_loading=is_loading)
                 page_desc.refresh_page()
 
             # wait for char
-            c = self.drawer.wait_next_char(multi_threading_mode=bash_parser_thread.is_alive())
+            c = self.drawer.wait_next_char(multi_threading_mode=is_loading)
 
             if c == Keys.KEY_TIMEOUT:
                 continue
@@ -232,16 +238,19 @@ class LoopEdit(object):
         input_error_msg = None
 
         while True:
+            # read before the result, so the page is drawn again if the last commands are loaded meanwhile
+            is_loading = bash_parser_thread.is_alive()
             if page_tags.has_minimum_size():
                 page_tags.clean_page()
                 page_tags.draw_page_edit(tags_text=new_tags_t.get_text_to_print(),
                                          tags_cursor_index=new_tags_t.get_cursor_index_to_print(),
                                          input_error_msg=input_error_msg,
-                                         data_from_man_page=bash_parser_thread.get_result())
+                                         data_from_man_page=bash_parser_thread.get_result(),
+                                         is_loading=is_loading)
                 page_tags.refresh_page()
 
             # wait for char
-            c = self.drawer.wait_next_char(multi_threading_mode=bash_parser_thread.is_alive())
+            c = self.drawer.wait_next_char(multi_threading_mode=is_loading)
 
             if c == Keys.KEY_TIMEOUT:
                 continue
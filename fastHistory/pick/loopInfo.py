@@ -8,7 +8,11 @@ from fastHistory.pick.loopEdit import LoopEdit
 
 class LoopInfo(object):
 
-    def __init__(self, current_selected_option, drawer, data_manager, search_t, last_column_size, context_shift, multi_select=False):
+    # max time (seconds) to wait for the info of the selected command if they are being prefetched
+    PREFETCH_RESULT_MAX_WAIT = 0.2
+
+    def __init__(self, current_selected_option, drawer, data_manager, search_t, last_column_size, context_shift, multi_select=False,
+                 man_cache_folder=None, bash_parser_prefetch_thread=None, man_pages_cache=None):
 
         self.drawer = drawer
         self.data_manager = data_manager
@@ -17,6 +21,9 @@ class LoopInfo(object):
         self.last_column_size = last_column_size
         self.context_shift = context_shift
         self.current_selected_option = current_selected_option
+        self.man_cache_folder = man_cache_folder
+        self.man_pages_cache = man_pages_cache
+        self.bash_parser_prefetch_thread = bash_parser_prefetch_thread
 
     def run_loop_info(self):
         """
@@ -27,8 +34,18 @@ class LoopInfo(object):
         # import this locally to improve performance when the program is loaded
         from fastHistory.pick.pageInfo import PageInfo
 
-        bash_parser_thread = BashParserThread(cmd_text=self.current_selected_option[DataManager.OPTION.INDEX_CMD])
-        bash_parser_thread.start()
+        cmd_text = self.current_selected_option[DataManager.OPTION.INDEX_CMD]
+        # the info may have been loaded while the command was highlighted in the select page
+        data_from_man_page = None
+        if self.bash_parser_prefetch_thread is not None:
+            data_from_man_page = self.bash_parser_prefetch_thread.get_result(cmd_text,
+                                                                             timeout=self.PREFETCH_RESULT_MAX_WAIT)
+        bash_parser_thread = BashParserThread(cmd_text=cmd_text,
+                                              cache_folder=self.man_cache_folder,
+                                              result=data_from_man_page,
+                                              man_pages_cache=self.man_pages_cache)
+        if data_from_man_page is None:
+            bash_parser_thread.start()
         page_info = PageInfo(self.drawer,
                              option=self.current_selected_option,
                              search_filters=self.data_manager.get_search_filters(),
@@ -39,13 +56,15 @@ class LoopInfo(object):
                              context_shift=self.context_shift)
 
         while True:
+            # read before the result, so the page is drawn again if the last commands are loaded meanwhile
+            is_loading = bash_parser_thread.is_alive()
             if page_info.has_minimum_size():
                 page_info.clean_page()
-                page_info.draw_page(data_from_man_page=bash_parser_thread.get_result())
+                page_info.draw_page(data_from_man_page=bash_parser_thread.get_result(), is_loading=is_loading)
                 page_info.refresh_page()
 
             # wait for char
-            c = self.drawer.wait_next_char(multi_threading_mode=bash_parser_thread.is_alive())
+            c = self.drawer.wait_next_char(multi_threading_mode=is_loading)
             logging.debug("pressed key: %s" % repr(c))
 
             if c == Keys.KEY_TIMEOUT:
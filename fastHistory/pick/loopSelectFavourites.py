@@ -1,6 +1,8 @@
 import logging
 
 from fastHistory import DataManager, ConsoleUtils
+from fastHistory.database.searchThread import SearchThread
+from fastHistory.parser.bashParserPrefetchThread import BashParserPrefetchThread
 from fastHistory.pick.keys import Keys
 from fastHistory.pick.loopInfo import LoopInfo
 from fastHistory.pick.pageSelectFavourites import PageSelectFavourites
@@ -9,13 +11,20 @@ from fastHistory.pick.textManager import ContextShifter
 
 class LoopSelectFavourites(object):
 
-    def __init__(self, drawer, data_manager, search_t, last_column_size, multi_select=False):
+    # max time (seconds) to wait for the result of the background search before checking the user input again
+    SEARCH_RESULT_MAX_WAIT = 0.05
+
+    def __init__(self, drawer, data_manager, search_t, last_column_size, multi_select=False, man_cache_folder=None,
+                 man_pages_cache=None):
 
         self.drawer = drawer
         self.data_manager = data_manager
         self.search_t = search_t
         self.multi_select = multi_select
         self.last_column_size = last_column_size
+        self.man_cache_folder = man_cache_folder
+        # parsed man pages shared by the info page and the prefetch thread
+        self.man_pages_cache = man_pages_cache
 
         self.all_selected = []
         self.context_shift = ContextShifter()
@@ -23,20 +32,44 @@ class LoopSelectFavourites(object):
         self.current_line_index = 0  # TODO rename with options_to_draw_index
         self.options = None
         self.option_to_draw = None
+        # True when the last page retrieved from the database was not full (no more options to load)
+        self.all_options_loaded = False
+        # True when a search has been requested to the search thread and the result is not received yet
+        self.options_waiting = False
+        # True when the requested search is the next page of the loaded options (see "load_next_options_page")
+        self.options_waiting_next_page = False
+        self.options_requested = 0
+        self.search_thread = SearchThread(data_manager)
+        # the info of the highlighted command are loaded in background before the info page is opened
+        self.bash_parser_prefetch_thread = BashParserPrefetchThread(cache_folder=man_cache_folder,
+                                                                    man_pages_cache=man_pages_cache)
 
         self.page_selector = PageSelectFavourites(self.drawer)
 
     def run_loop_select(self):
         """
         Loop to capture user input keys to interact with the select page
+        the searches requested while typing are done by a background thread which is stopped when the loop ends,
+        as the thread which prefetches the info of the highlighted command
 
         """
+        self.search_thread.start()
+        self.bash_parser_prefetch_thread.start()
+        try:
+            return self._run_loop_select()
+        finally:
+            self.search_thread.stop()
+            self.bash_parser_prefetch_thread.stop()
+
+    def _run_loop_select(self):
         # get filtered starting options
         msg_to_show = None
-        self.options = self.data_manager.filter(self.search_t.get_text_lower(), self.get_number_options_to_draw())
+        self.load_options(self.get_number_options_to_draw())
         self.initialize_options_to_draw()
 
         while True:
+            if self.options_waiting:
+                self.receive_options()
             if self.page_selector.has_minimum_size():
                 self.page_selector.draw_page(
                     search_filters=self.data_manager.get_search_filters(),
@@ -47,9 +80,10 @@ class LoopSelectFavourites(object):
                     msg_to_show=msg_to_show)
             if msg_to_show:
                 msg_to_show = None
+            self.prefetch_current_selected_option()
 
             # wait for char
-            c = self.drawer.wait_next_char()
+            c = self.drawer.wait_next_char(multi_threading_mode=self.options_waiting)
             logging.debug("pressed key: %s" % repr(c))
 
             if c == Keys.KEY_TIMEOUT:
@@ -58,11 +92,12 @@ class LoopSelectFavourites(object):
                 self.move_up()
             elif c == Keys.KEY_DOWN:
                 self.move_down()
-                # retrieve more data from db when user want to view more
-                if self.index % (self.get_number_options_to_draw() - 1) == 0:
-                    self.options = self.data_manager.filter(
-                        self.search_t.get_text_lower(),
-                        self.index + self.get_number_options_to_draw())
+                # retrieve the next page when the user enters the last loaded one
+                # in this way the next options are already available when the bottom is reached
+                # note: the options of an old search are not extended, they are going to be replaced
+                if not self.options_waiting and \
+                        self.index + self.get_number_options_to_draw() >= len(self.options):
+                    self.load_next_options_page()
             elif c in Keys.KEYS_ENTER:
                 selected_cmd = self.get_selected_and_update_db()
                 if selected_cmd:
@@ -85,7 +120,10 @@ class LoopSelectFavourites(object):
                                          self.search_t,
                                          self.last_column_size,
                                          self.context_shift,
-                                         self.multi_select)
+                                         self.multi_select,
+                                         man_cache_folder=self.man_cache_folder,
+                                         bash_parser_prefetch_thread=self.bash_parser_prefetch_thread,
+                                         man_pages_cache=self.man_pages_cache)
                     res = loop_info.run_loop_info()
                     if res[0]:
                         if res[1] == "select":
@@ -136,7 +174,7 @@ class LoopSelectFavourites(object):
             # delete a char of the search
             elif c in Keys.KEYS_DELETE:
                 if self.search_t.delete_char():
-                    self.loop_select_options_reload(True)
+                    self.search_options()
             # delete current selected option
             elif c == Keys.KEY_CANC:
                 current_selected_option = self.get_current_selected_option()
@@ -147,7 +185,9 @@ class LoopSelectFavourites(object):
                 self.drawer.reset()
                 self.search_t.set_max_x(self.drawer.get_max_x(), with_margin_x=True)
                 # TODO make this more efficient
-                self.loop_select_options_reload(False)
+                # the result of a pending search is going to be drawn with the new size
+                if not self.options_waiting or self.options_waiting_next_page:
+                    self.loop_select_options_reload(False)
             elif c == Keys.KEY_START or c == Keys.KEY_CTRL_A:
                 self.search_t.move_cursor_to_start()
                 self.context_shift.reset_context_shifted()
@@ -155,10 +195,10 @@ class LoopSelectFavourites(object):
                 self.search_t.move_cursor_to_end()
             elif c == Keys.KEY_CTRL_U:
                 self.search_t.set_text("")
-                self.loop_select_options_reload(True)
+                self.search_options()
             elif type(c) is str:
                 if self.search_t.add_string(c, self.data_manager.get_forbidden_chars()):
-                    self.loop_select_options_reload(True)
+                    self.search_options()
             else:
                 logging.error("input not handled: %s" % repr(c))
 
@@ -226,14 +266,84 @@ class LoopSelectFavourites(object):
                 self.current_line_index += 1
 
     def loop_select_options_reload(self, initialize_index=False):
+        # the options are reloaded now, any result of the background search would be older
+        if self.options_waiting:
+            self.search_thread.cancel()
+            self.options_waiting = False
+            self.options_waiting_next_page = False
         # reset shift value
         if initialize_index:
             self.context_shift.reset_context_shifted()
-            self.options = self.data_manager.filter(self.search_t.get_text_lower(), self.get_number_options_to_draw())
+            self.load_options(self.get_number_options_to_draw())
         else:
-            self.options = self.data_manager.filter(self.search_t.get_text_lower(), self.index + self.get_number_options_to_draw())
+            self.load_options(self.index + self.get_number_options_to_draw())
         self.update_options_to_draw(initialize_index=initialize_index)
 
+    def search_options(self):
+        """
+        request the options which match the current search text to the background search thread
+        the options are replaced when the result is received (see "receive_options")
+
+        :return:
+        """
+        self.context_shift.reset_context_shifted()
+        self.options_requested = self.get_number_options_to_draw()
+        self.data_manager.update_search_filters(self.search_t.get_text_lower())
+        self.search_thread.search(self.search_t.get_text_lower(), self.options_requested)
+        self.options_waiting = True
+        self.options_waiting_next_page = False
+
+    def receive_options(self):
+        """
+        replace the options with the result of the last background search, if available
+        if the search is the next page of the loaded options, the result is appended and the selected option
+        does not change
+        if the search has failed, the current options are kept
+
+        :return:
+        """
+        options = self.search_thread.get_result(timeout=self.SEARCH_RESULT_MAX_WAIT)
+        if options is False:
+            self.options_waiting = False
+            self.options_waiting_next_page = False
+        elif options is not None:
+            self.options_waiting = False
+            self.all_options_loaded = len(options) < self.options_requested
+            if self.options_waiting_next_page:
+                self.options_waiting_next_page = False
+                self.options += options
+                self.update_options_to_draw()
+            else:
+                self.options = options
+                self.update_options_to_draw(initialize_index=True)
+
+    def load_options(self, n):
+        """
+        retrieve the first n options which match the current search text
+
+        :param n:   number of options to retrieve
+        :return:
+        """
+        self.options = self.data_manager.filter(self.search_t.get_text_lower(), n)
+        self.all_options_loaded = len(self.options) < n
+
+    def load_next_options_page(self):
+        """
+        request the next page of options (after the last loaded one) which match the current search text to the
+        background search thread, only the new options are retrieved from the database
+        the options are appended when the result is received (see "receive_options")
+
+        :return:
+        """
+        n = self.get_number_options_to_draw()
+        if self.all_options_loaded or len(self.options) == 0 or n <= 0:
+            return
+        self.options_requested = n
+        self.search_thread.search(self.search_t.get_text_lower(), n,
+                                  after_id=self.options[-1][DataManager.OPTION.INDEX_ID])
+        self.options_waiting = True
+        self.options_waiting_next_page = True
+
     def mark_index(self):
         """
         method not used yet to support multi selection
@@ -297,6 +407,16 @@ class LoopSelectFavourites(object):
         self.data_manager.update_selected_element_order(selected_cmd)
         return selected_cmd
 
+    def prefetch_current_selected_option(self):
+        """
+        request to load in background the info of the highlighted command (see BashParserPrefetchThread)
+
+        :return:
+        """
+        current_selected_option = self.get_current_selected_option()
+        if current_selected_option is not None:
+            self.bash_parser_prefetch_thread.prefetch(current_selected_option[DataManager.OPTION.INDEX_CMD])
+
     def get_current_selected_option(self):
         for row_index, option in enumerate(self.option_to_draw):
             if row_index == self.current_line_index:
@@ -8,7 +8,7 @@ from fastHistory.pick.textManager import ContextShifter
 from fastHistory.pick.keys import Keys
 from fastHistory.pick.pageSelectTLDR import PageSelectTLDR
 from fastHistory.tldr.tldrParser import TLDRParser, ParsedTLDRExample
-from fastHistory.tldr.tldrParserThread import TLDRParseThread
+from fastHistory.tldr.tldrSearchThread import TLDRSearchThread
 
 
 class LoopSelectTLDR(object):
@@ -17,6 +17,8 @@ class LoopSelectTLDR(object):
     """
 
     SELECTED_COMMAND_ENDING = " #"
+    # number of options before and after the selected one whose examples are parsed in background
+    PREFETCH_NEIGHBOURS = 5
 
     def __init__(self, drawer, search_text):
         self.drawer = drawer
@@ -35,15 +37,27 @@ class LoopSelectTLDR(object):
 
         self.focus = PageSelectTLDR.Focus.AREA_FILES
 
-    def run_loop_tldr(self, cached_in_memory_pages):
+    def run_loop_tldr(self, tldr_parser: TLDRParser):
         """
+        the searches requested while typing are done by a background thread which is stopped when the loop ends,
+        the processes used to score the pages in parallel (if enabled) belong to the parser and they are not
+        terminated with the thread
+
+        :param tldr_parser: parser of the session, it keeps the loaded pages between the loops
         :return:
         """
-        tldr_parser = TLDRParser(cached_in_memory_pages)
-        tldr_parser_thread = None
+        tldr_search_thread = TLDRSearchThread(tldr_parser)
+        tldr_search_thread.start()
+        try:
+            return self._run_loop_tldr(tldr_parser, tldr_search_thread)
+        finally:
+            tldr_search_thread.stop()
+
+    def _run_loop_tldr(self, tldr_parser: TLDRParser, tldr_search_thread: TLDRSearchThread):
         input_data = InputData(False, "", [])
         tldr_options_reload_needed = True
         tldr_options_waiting = True
+        tldr_options_refining = False
         tldr_examples_reload_needed = True
         tldr_ui_reload = True
         msg_to_show = None
@@ -55,18 +69,27 @@ class LoopSelectTLDR(object):
             if tldr_options_reload_needed:
                 tldr_options_reload_needed = False
                 input_data = InputParser.parse_input(self.search_field.get_text_lower(), is_search_mode=True)
-                if tldr_parser_thread:
-                    tldr_parser_thread.stop()
-                tldr_parser_thread = TLDRParseThread(tldr_parser, input_data)
-                tldr_parser_thread.start()
+                tldr_search_thread.search(input_data)
                 tldr_options_waiting = True
 
-            if tldr_options_waiting and not tldr_parser_thread.is_alive():
-                tldr_options_waiting = False
-                self.tldr_options = tldr_parser_thread.get_result_tldr_options()
-                self.update_tldr_options_to_draw()
-                tldr_examples_reload_needed = True
-                tldr_ui_reload = True
+            if tldr_options_waiting:
+                tldr_options = tldr_search_thread.get_result()
+                if tldr_options is not None:
+                    tldr_options_waiting = False
+                    tldr_options_refining = False
+                    self.set_tldr_options(tldr_options)
+                    tldr_examples_reload_needed = True
+                    tldr_ui_reload = True
+                else:
+                    tldr_options = tldr_search_thread.get_partial_result()
+                    if tldr_options is not None:
+                        # show the best options found so far, they are refined until the end of the search
+                        tldr_options_refining = True
+                        selected_page = self.get_selected_tldr_page()
+                        self.set_tldr_options(tldr_options)
+                        if self.get_selected_tldr_page() != selected_page:
+                            tldr_examples_reload_needed = True
+                        tldr_ui_reload = True
 
             if tldr_examples_reload_needed:
                 tldr_examples_reload_needed = False
@@ -78,6 +101,7 @@ class LoopSelectTLDR(object):
                     # reset example index
                     self.tldr_examples_index = self.tldr_examples.get_first_example_index()
                     self.tldr_examples_draw_index = self.tldr_examples_index
+                    tldr_search_thread.prefetch(self.get_tldr_options_to_prefetch())
                 else:
                     self.tldr_examples = ParsedTLDRExample()
                     self.tldr_examples_index = 0
@@ -95,13 +119,14 @@ class LoopSelectTLDR(object):
                     focus_area=self.focus,
                     has_url_more_info=self.tldr_examples.has_url_more_info(),
                     is_waiting=tldr_options_waiting,
+                    is_refining=tldr_options_refining,
                     msg_to_show=msg_to_show)
 
             if msg_to_show:
                 msg_to_show = None
 
             # wait for char
-            c = self.drawer.wait_next_char(multi_threading_mode=tldr_parser_thread.is_alive())
+            c = self.drawer.wait_next_char(multi_threading_mode=tldr_options_waiting)
             logging.debug("pressed key: %s" % repr(c))
 
             tldr_ui_reload = True
@@ -307,6 +332,37 @@ class LoopSelectTLDR(object):
         self.tldr_examples_index = 0
         self.tldr_examples_draw_index = 0
 
+    def set_tldr_options(self, tldr_options: list):
+        """
+        set the options to show, the selected option is reset if it is not available anymore
+
+        :param tldr_options:    options found by the tldr parser
+        :return:
+        """
+        self.tldr_options = tldr_options
+        if self.tldr_options_index >= len(self.tldr_options):
+            self.reset_indexes()
+        self.update_tldr_options_to_draw()
+
+    def get_selected_tldr_page(self):
+        """
+        :return: full path of the selected tldr page or None if no option is shown
+        """
+        if self.tldr_options_draw_index < len(self.tldr_options_draw):
+            return self.tldr_options_draw[self.tldr_options_draw_index][TLDRParser.INDEX_TLDR_MATCH_FULL_PATH]
+        return None
+
+    def get_tldr_options_to_prefetch(self):
+        """
+        :return: options next to the selected one, the nearest first
+        """
+        tldr_options_to_prefetch = []
+        for distance in range(1, self.PREFETCH_NEIGHBOURS + 1):
+            for index in [self.tldr_options_index + distance, self.tldr_options_index - distance]:
+                if 0 <= index < len(self.tldr_options):
+                    tldr_options_to_prefetch.append(self.tldr_options[index])
+        return tldr_options_to_prefetch
+
     def update_tldr_options_to_draw(self):
         number_lines_to_draw = self.get_number_tldr_lines_to_draw()
         # check if the current selected line is too big set the last line as selected line
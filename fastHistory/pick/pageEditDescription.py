@@ -20,7 +20,8 @@ class PageEditDescription(PageInfo):
         """
         PageInfo.__init__(self, drawer, option, search_filters, context_shift, blocks_shift)
 
-    def draw_page_edit(self, description_text, description_cursor_index, input_error_msg=None, data_from_man_page=None):
+    def draw_page_edit(self, description_text, description_cursor_index, input_error_msg=None, data_from_man_page=None,
+                       is_loading=False):
         """
         draw page to edit the description of the current selected option
 
@@ -28,6 +29,7 @@ class PageEditDescription(PageInfo):
         :param description_cursor_index:    position of the cursor
         :param input_error_msg:             string error to show, None if there is no error to show
         :param data_from_man_page:      data retrieved from the man page
+        :param is_loading:              True if the man pages of some commands are still loading
         :return:
         """
         # draw colored title
@@ -49,7 +51,7 @@ class PageEditDescription(PageInfo):
                             filter_tags=self.search_filters.get_tags())
 
         self._draw_edit_description_field(description_text)
-        self.draw_info_man_page(data_from_man_page)
+        self.draw_info_man_page(data_from_man_page, is_loading)
 
         self.draw_input_error_msg(input_error_msg, self.cursor_y - 1)
 
@@ -19,6 +19,7 @@ class PageInfo(PageGeneric):
     MESSAGE_NO_TAG = "To add a tag press "
     MESSAGE_NO_DESC = "To add a description press "
     MESSAGE_NO_MAN_PAGE_AVAILABLE = "No info available"
+    MESSAGE_LOADING_MAN_PAGE = "Loading.."
 
     def __init__(self, drawer, option, search_filters, context_shift, blocks_shift=0):
         """
@@ -65,11 +66,12 @@ class PageInfo(PageGeneric):
     def get_blocks_shift(self):
         return self.blocks_shift
 
-    def draw_page(self, data_from_man_page=None):
+    def draw_page(self, data_from_man_page=None, is_loading=False):
         """
         draw option line (the one of which the user want to have more info)
 
         :param data_from_man_page:      data retrieved from the man page
+        :param is_loading:              True if the man pages of some commands are still loading
 
         :return:
         """
@@ -90,7 +92,7 @@ class PageInfo(PageGeneric):
         self.draw_info_description(desc=self.option[DataManager.OPTION.INDEX_DESC],
                                    filter_desc=self.search_filters.get_description_words())
 
-        self.draw_info_man_page(data_from_man_page)
+        self.draw_info_man_page(data_from_man_page, is_loading)
         # help line in the last line
         self._draw_help_line_info()
         # cursor set position
@@ -153,11 +155,13 @@ class PageInfo(PageGeneric):
                 self.drawer.draw_row(self.CHAR_DESCRIPTION + "]", color=self.drawer.color_hash_tag)
             self.drawer.new_line()
 
-    def draw_info_man_page(self, data_from_man_page):
+    def draw_info_man_page(self, data_from_man_page, is_loading=False):
         """
         draw man info section
 
         :param data_from_man_page:  object with man info
+        :param is_loading:          True if the man pages of some commands are still loading, the commands already
+                                    loaded are shown
         :return:
         """
         self.drawer.new_line()
@@ -189,7 +193,12 @@ class PageInfo(PageGeneric):
                                 self._draw_cmd_meaning([flag[BashParser.INDEX_VALUE]], flag[BashParser.INDEX_MEANING],
                                                        is_flag=True)
                         self.drawer.new_line()
-                if not info_man_shown:
+                if is_loading:
+                    self.drawer.draw_row(self.CHAR_SPACE * self.INDENT)
+                    self.drawer.draw_row("[", color=self.drawer.color_hash_tag)
+                    self.drawer.draw_row(self.MESSAGE_LOADING_MAN_PAGE)
+                    self.drawer.draw_row("]", color=self.drawer.color_hash_tag)
+                elif not info_man_shown:
                     self.drawer.draw_row(self.CHAR_SPACE * self.INDENT)
                     self.drawer.draw_row("[", color=self.drawer.color_hash_tag)
                     self.drawer.draw_row(self.MESSAGE_NO_MAN_PAGE_AVAILABLE)
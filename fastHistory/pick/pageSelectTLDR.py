@@ -21,6 +21,7 @@ class PageSelectTLDR(PageGeneric):
     MSG_WAITING_1_DOT = "Loading.  "
     MSG_WAITING_2_DOTS = "Loading.. "
     MSG_WAITING_3_DOTS = "Loading..."
+    MSG_REFINING = "(refining..)"
     MSG_NO_MATCH = "No match found"
     MSG_NO_EXAMPLE = "No example found"
 
@@ -47,8 +48,11 @@ class PageSelectTLDR(PageGeneric):
                   focus_area: Focus = Focus.AREA_FILES,
                   has_url_more_info: bool = False,
                   is_waiting: bool = False,
+                  is_refining: bool = False,
                   msg_to_show: str = None):
         """
+        :param is_waiting:  True if the search is running
+        :param is_refining: True if the drawn options are the partial results of the running search
         :return:
         """
         self.clean_page()
@@ -117,13 +121,15 @@ class PageSelectTLDR(PageGeneric):
         self.drawer.new_line()
         self.drawer.fill_row(color=self.drawer.color_columns_title)
         self.drawer.draw_row(self.FILE_COLUMN_NAME, x=2, color=self.drawer.color_columns_title)
+        if is_refining:
+            self.drawer.draw_row(self.MSG_REFINING, x_indent=1, color=self.drawer.color_columns_title)
         self.drawer.draw_row(self.EXAMPLE_COLUMN_NAME, x=self.TLDR_PAGES_COLUMN_SIZE + 2,
                              color=self.drawer.color_columns_title)
 
         self.drawer.new_line()
 
         current_y = self.drawer.get_y()
-        if is_waiting:
+        if is_waiting and not is_refining:
             words_to_mark = self.last_words_to_mark
         else:
             words_to_mark = input_data.get_all_words()
@@ -3,10 +3,12 @@
 import curses
 import logging
 
+from fastHistory.parser.manParser import ManParser
 from fastHistory.pick.drawer import Drawer
 from fastHistory.pick.loopSelectFavourites import LoopSelectFavourites
 from fastHistory.pick.loopSelectTLDR import LoopSelectTLDR
 from fastHistory.pick.textManager import TextManager
+from fastHistory.tldr.tldrParser import TLDRParser
 
 
 class Picker(object):
@@ -19,18 +21,23 @@ class Picker(object):
     SEARCH_TYPE_HISTORY = 1  # not implemented
     SEARCH_TYPE_TLDR = 2
 
-    def __init__(self, data_manager, theme, last_column_size, is_tldr_search=False, is_history_search=False, search_text="", multi_select=False):
+    def __init__(self, data_manager, theme, last_column_size, is_tldr_search=False, is_history_search=False, search_text="", multi_select=False,
+                 tldr_cache_folder=None, man_cache_folder=None):
         """
         initialize variables and get filtered list starting options to show
         :param data_manager          the data manager object to retrieve data
         :param search_text:         (optional) if defined the results will be filtered with this text, default emtpy string
         :param multi_select:        (optional) if true its possible to select multiple values by hitting SPACE, defaults to False
+        :param tldr_cache_folder:   (optional) folder where the pre-parsed TLDR pages are stored for the next sessions
+        :param man_cache_folder:    (optional) folder where the parsed man pages are stored for the next sessions
         """
         self.theme = theme
         self.search_text = search_text
         self.multi_select = multi_select
         self.data_manager = data_manager
         self.last_column_size = last_column_size
+        self.tldr_cache_folder = tldr_cache_folder
+        self.man_cache_folder = man_cache_folder
 
         if is_tldr_search:
             self.search_type = self.SEARCH_TYPE_TLDR
@@ -60,28 +67,41 @@ class Picker(object):
                                use_lower=True,
                                max_x=self.drawer.get_max_x(),
                                margin_x=self.SEARCH_FIELD_MARGIN)
-        cached_in_memory_tldr_pages = {}
+        # TLDR parser (with its loaded pages and scoring processes), created once for the whole session
+        tldr_parser = None
+        # parsed man pages, loaded once for the whole session
+        man_pages_cache = None
 
-        while 1:
-            if self.search_type == self.SEARCH_TYPE_FAVOURITE:
-                loop_select = LoopSelectFavourites(drawer=self.drawer,
-                                                   data_manager=self.data_manager,
-                                                   search_t=search_t,
-                                                   last_column_size=self.last_column_size,
-                                                   multi_select=self.multi_select)
-                res = loop_select.run_loop_select()
-            elif self.search_type == self.SEARCH_TYPE_HISTORY:
-                logging.warning("search_type not implemented yet: %s" % self.search_type)
-                return None
-            elif self.search_type == self.SEARCH_TYPE_TLDR:
-                loop_tldr = LoopSelectTLDR(drawer=self.drawer, search_text=search_t)
-                res = loop_tldr.run_loop_tldr(cached_in_memory_tldr_pages)
-            else:
-                logging.error("unknown search_type: %s" % self.search_type)
-                return None
+        try:
+            while 1:
+                if self.search_type == self.SEARCH_TYPE_FAVOURITE:
+                    if man_pages_cache is None and self.man_cache_folder is not None:
+                        man_pages_cache = ManParser.load_man_pages_cache(self.man_cache_folder)
+                    loop_select = LoopSelectFavourites(drawer=self.drawer,
+                                                       data_manager=self.data_manager,
+                                                       search_t=search_t,
+                                                       last_column_size=self.last_column_size,
+                                                       multi_select=self.multi_select,
+                                                       man_cache_folder=self.man_cache_folder,
+                                                       man_pages_cache=man_pages_cache)
+                    res = loop_select.run_loop_select()
+                elif self.search_type == self.SEARCH_TYPE_HISTORY:
+                    logging.warning("search_type not implemented yet: %s" % self.search_type)
+                    return None
+                elif self.search_type == self.SEARCH_TYPE_TLDR:
+                    if tldr_parser is None:
+                        tldr_parser = TLDRParser(cache_folder=self.tldr_cache_folder)
+                    loop_tldr = LoopSelectTLDR(drawer=self.drawer, search_text=search_t)
+                    res = loop_tldr.run_loop_tldr(tldr_parser)
+                else:
+                    logging.error("unknown search_type: %s" % self.search_type)
+                    return None
 
-            if res[0]:
-                return res[1]
-            else:
-                self.search_type = res[1]
+                if res[0]:
+                    return res[1]
+                else:
+                    self.search_type = res[1]
+        finally:
+            if tldr_parser is not None:
+                tldr_parser.stop_scoring_pool()
 
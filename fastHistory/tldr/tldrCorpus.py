@@ -0,0 +1,177 @@
+import logging
+import mmap
+import os
+import struct
+from typing import Optional
+
+
+class TLDRCorpus(object):
+    """
+    All the TLDR pages packed in a single file which is read with mmap
+
+    the file contains the original and the lowercase body of each page, so the pages can be searched without
+    opening each file and without calling "lower" for each line (the memory is shared by all the processes)
+    the metadata of the pages (trust amplifier, line types and title) are calculated when the file is built
+
+    file format (little endian):
+        - header:       magic, version, number of pages, size of the names block
+        - names block:  utf-8 text, TLDR commit id and, for each page, the relative path ("os_folder/fname")
+                        and the metadata separated by tabs, one per line
+        - offset table: for each page, offset and size of the original body and of the lowercase body
+        - bodies:       utf-8 text
+    """
+
+    CORPUS_FILE_NAME = "pages.bin"
+    CORPUS_MAGIC = b"FHTLDR"
+    CORPUS_VERSION = 2
+
+    _HEADER_STRUCT = struct.Struct("<6sHII")
+    _OFFSET_STRUCT = struct.Struct("<IIII")
+
+    def __init__(self, file_obj, mapped_file: mmap.mmap):
+        self.file_obj = file_obj
+        self.mapped_file = mapped_file
+        magic, version, pages_count, names_size = self._HEADER_STRUCT.unpack_from(mapped_file, 0)
+        if magic != self.CORPUS_MAGIC or version != self.CORPUS_VERSION:
+            raise ValueError("format not supported")
+        names_offset = self._HEADER_STRUCT.size
+        names = mapped_file[names_offset:names_offset + names_size].decode("utf-8").split("\n")
+        self.tldr_commit = names[0] if names[0] else None
+        self.pages = []
+        self.pages_info = []
+        for name in names[1:]:
+            page, trust, line_types, title = name.split("\t", 3)
+            self.pages.append(page)
+            self.pages_info.append([int(trust), line_types, title])
+        if len(self.pages) != pages_count:
+            raise ValueError("wrong number of pages")
+        self.page_ids = dict((self.pages[i], i) for i in range(pages_count))
+        self.offset_table_offset = names_offset + names_size
+
+    @staticmethod
+    def build(pages_path: str, file_path: str, pages: list, pages_info: list, tldr_commit: Optional[str] = None) -> None:
+        """
+        pack the pages in a single file
+
+        :param pages_path:  path of the folder with the TLDR pages
+        :param file_path:   output file
+        :param pages:       relative path of the pages to pack ("os_folder/fname")
+        :param pages_info:  [trust amplifier, line types string, title] of each page
+        :param tldr_commit: TLDR commit id of the pages
+        :return:
+        """
+        names = [tldr_commit if tldr_commit else ""]
+        for page, page_info in zip(pages, pages_info):
+            names.append("%s\t%d\t%s\t%s" % (page, page_info[0], page_info[1], page_info[2]))
+        names = "\n".join(names).encode("utf-8")
+        bodies = []
+        for page in pages:
+            with open(os.path.join(pages_path, page), "r") as f:
+                body = f.read()
+            bodies.append(body.encode("utf-8"))
+            bodies.append(body.lower().encode("utf-8"))
+        offset = TLDRCorpus._HEADER_STRUCT.size + len(names) + TLDRCorpus._OFFSET_STRUCT.size * len(pages)
+        offset_table = []
+        for i in range(0, len(bodies), 2):
+            offset_table.append(TLDRCorpus._OFFSET_STRUCT.pack(offset, len(bodies[i]),
+                                                               offset + len(bodies[i]), len(bodies[i + 1])))
+            offset += len(bodies[i]) + len(bodies[i + 1])
+        with open(file_path, "wb") as f:
+            f.write(TLDRCorpus._HEADER_STRUCT.pack(TLDRCorpus.CORPUS_MAGIC, TLDRCorpus.CORPUS_VERSION,
+                                                   len(pages), len(names)))
+            f.write(names)
+            f.writelines(offset_table)
+            f.writelines(bodies)
+
+    @staticmethod
+    def load(file_path: str) -> Optional["TLDRCorpus"]:
+        """
+        map the packed pages in memory
+
+        :param file_path:   packed pages file
+        :return:            corpus or None if the file does not exist or it is not valid
+        """
+        if not os.path.isfile(file_path):
+            logging.info("TLDR corpus not found: %s" % file_path)
+            return None
+        try:
+            file_obj = open(file_path, "rb")
+            try:
+                mapped_file = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+                return TLDRCorpus(file_obj, mapped_file)
+            except Exception:
+                file_obj.close()
+                raise
+        except (ValueError, OSError, struct.error) as e:
+            logging.error("TLDR corpus cannot be opened: %s" % e)
+            return None
+
+    def close(self) -> None:
+        self.mapped_file.close()
+        self.file_obj.close()
+
+    def get_page_id(self, page: str) -> Optional[int]:
+        """
+        :param page:    relative path of the page ("os_folder/fname")
+        :return:        id of the page or None if the page is not in the corpus
+        """
+        return self.page_ids.get(page)
+
+    def get_page_info(self, page_id: int) -> list:
+        """
+        :param page_id: id of the page
+        :return:        [trust amplifier, line types string, title] of the page
+        """
+        return self.pages_info[page_id]
+
+    def get_folder_pages(self, os_folder: str) -> list:
+        """
+        :param os_folder:   os folder (e.g. "common")
+        :return:            relative path of the pages of the folder
+        """
+        prefix = os_folder + "/"
+        return [page for page in self.pages if page.startswith(prefix)]
+
+    def _get_body(self, page_id: int, lower: bool) -> str:
+        offset, size, lower_offset, lower_size = self._OFFSET_STRUCT.unpack_from(
+            self.mapped_file, self.offset_table_offset + page_id * self._OFFSET_STRUCT.size)
+        if lower:
+            return self.mapped_file[lower_offset:lower_offset + lower_size].decode("utf-8")
+        return self.mapped_file[offset:offset + size].decode("utf-8")
+
+    @staticmethod
+    def split_lines(body: str) -> list:
+        """
+        split the content of a page in lines like a file read line by line
+        note: "splitlines" cannot be used because it uses other line boundaries too
+
+        :param body:    content of a page
+        :return:        lines (with the final new line char)
+        """
+        lines = [line + "\n" for line in body.split("\n")]
+        if lines[-1] == "\n":
+            lines.pop()
+        else:
+            lines[-1] = lines[-1][:-1]
+        return lines
+
+    def get_lines(self, page_id: int) -> list:
+        """
+        :param page_id: id of the page
+        :return:        lines of the page (with the final new line char)
+        """
+        return self.split_lines(self._get_body(page_id, lower=False))
+
+    def get_lower_lines(self, page_id: int) -> list:
+        """
+        :param page_id: id of the page
+        :return:        lowercase lines of the page (with the final new line char)
+        """
+        return self.split_lines(self._get_body(page_id, lower=True))
+
+    def get_lower_body(self, page_id: int) -> str:
+        """
+        :param page_id: id of the page
+        :return:        lowercase content of the page
+        """
+        return self._get_body(page_id, lower=True)
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastHistory.tldr.tldrParser import ParsedTLDRExample
+
+
+class TLDRExamplesCache(object):
+    """
+    Bounded LRU cache of the parsed examples of the TLDR pages
+
+    the cache is shared by the UI and by the thread which prefetches the pages next to the selected one
+    note: the cached objects are returned as they are, they must not be modified
+    """
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size:    max number of cached pages
+        """
+        self.max_size = max_size
+        self.pages = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, page_key: str) -> Optional["ParsedTLDRExample"]:
+        """
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :return:            parsed examples of the page or None if the page is not cached
+        """
+        with self.lock:
+            parsed_tldr_example = self.pages.get(page_key)
+            if parsed_tldr_example is not None:
+                self.pages.move_to_end(page_key)
+            return parsed_tldr_example
+
+    def put(self, page_key: str, parsed_tldr_example: "ParsedTLDRExample") -> None:
+        """
+        :param page_key:            relative path of the page ("os_folder/fname")
+        :param parsed_tldr_example: parsed examples of the page
+        :return:
+        """
+        with self.lock:
+            self.pages[page_key] = parsed_tldr_example
+            self.pages.move_to_end(page_key)
+            if len(self.pages) > self.max_size:
+                self.pages.popitem(last=False)
+
+    def __contains__(self, page_key: str) -> bool:
+        with self.lock:
+            return page_key in self.pages
@@ -0,0 +1,164 @@
+import bisect
+import json
+import logging
+import os
+from typing import Optional
+
+
+class TLDRIndex(object):
+    """
+    Inverted index of the TLDR pages: each token (lowercase and whitespace separated) of the pages is mapped to
+    the pages which contain it
+
+    a search word can be found in a line only if it is a substring of one of its tokens (the search words do not
+    contain whitespaces), therefore the candidate pages of a word are the pages of the tokens which contain it
+    the index is built by the update_tldr_pages.sh script and it is shipped next to the pages
+    """
+
+    INDEX_FILE_NAME = "index.json"
+    INDEX_VERSION = 1
+
+    def __init__(self, pages: list, tokens: list, postings: list, tldr_commit: Optional[str] = None):
+        """
+        :param pages:       relative path of the pages ("os_folder/fname"), sorted by os folder and file name
+        :param tokens:      tokens of the pages
+        :param postings:    page ids (space separated string) of each token
+        :param tldr_commit: TLDR commit id of the indexed pages
+        """
+        self.pages = pages
+        self.tokens = tokens
+        self.postings = postings
+        self.tldr_commit = tldr_commit
+        # page ids of the tokens already used by a search (the postings are parsed only when needed)
+        self.parsed_postings = {}
+        # all the tokens in a single string (the tokens do not contain whitespaces) and the offset of each token
+        self.tokens_text = "\n".join(tokens)
+        self.tokens_offsets = []
+        offset = 0
+        for token in tokens:
+            self.tokens_offsets.append(offset)
+            offset += len(token) + 1
+        # range of page ids of each os folder
+        self.folder_ranges = {}
+        for page_id in range(len(pages)):
+            os_folder = pages[page_id].split("/")[0]
+            if os_folder in self.folder_ranges:
+                self.folder_ranges[os_folder][1] = page_id + 1
+            else:
+                self.folder_ranges[os_folder] = [page_id, page_id + 1]
+
+    @staticmethod
+    def list_pages(pages_path: str) -> list:
+        """
+        :param pages_path:  path of the folder with the TLDR pages (one sub folder for each os)
+        :return:            relative path of the pages ("os_folder/fname"), sorted by os folder and file name
+        """
+        pages = []
+        for os_folder in sorted(os.listdir(pages_path)):
+            if not os.path.isdir(os.path.join(pages_path, os_folder)):
+                continue
+            for fname in sorted(os.listdir(os.path.join(pages_path, os_folder))):
+                if fname.endswith(".md"):
+                    pages.append(os_folder + "/" + fname)
+        return pages
+
+    @staticmethod
+    def build(pages_path: str, tldr_commit: Optional[str] = None) -> "TLDRIndex":
+        """
+        read all the pages and build the index
+
+        :param pages_path:  path of the folder with the TLDR pages (one sub folder for each os)
+        :param tldr_commit: TLDR commit id of the pages
+        :return:            index of the pages
+        """
+        pages = TLDRIndex.list_pages(pages_path)
+        token_pages = {}
+        for page_id in range(len(pages)):
+            with open(os.path.join(pages_path, pages[page_id]), "r") as f:
+                for token in f.read().lower().split():
+                    page_ids = token_pages.get(token)
+                    if page_ids is None:
+                        token_pages[token] = [page_id]
+                    elif page_ids[-1] != page_id:
+                        page_ids.append(page_id)
+        tokens = sorted(token_pages.keys())
+        postings = [" ".join(str(page_id) for page_id in token_pages[token]) for token in tokens]
+        return TLDRIndex(pages, tokens, postings, tldr_commit)
+
+    def save(self, file_path: str) -> None:
+        """
+        write the index to a file
+
+        :param file_path:   output file
+        :return:
+        """
+        with open(file_path, "w") as f:
+            json.dump({
+                "version": self.INDEX_VERSION,
+                "tldr_commit": self.tldr_commit,
+                "pages": self.pages,
+                "tokens": self.tokens,
+                "postings": self.postings
+            }, f, separators=(",", ":"))
+
+    @staticmethod
+    def load(file_path: str) -> Optional["TLDRIndex"]:
+        """
+        read the index from a file
+
+        :param file_path:   index file
+        :return:            index or None if the file does not exist or it is not valid
+        """
+        if not os.path.isfile(file_path):
+            logging.info("TLDR index not found: %s" % file_path)
+            return None
+        try:
+            with open(file_path, "r") as f:
+                data = json.load(f)
+            if data["version"] != TLDRIndex.INDEX_VERSION:
+                logging.info("TLDR index version not supported: %s" % data["version"])
+                return None
+            return TLDRIndex(data["pages"], data["tokens"], data["postings"], data["tldr_commit"])
+        except (ValueError, KeyError, OSError) as e:
+            logging.error("TLDR index cannot be loaded: %s" % e)
+            return None
+
+    def get_page(self, page_id: int) -> str:
+        """
+        :param page_id: id of the page
+        :return:        relative path of the page ("os_folder/fname")
+        """
+        return self.pages[page_id]
+
+    def get_folder_page_ids(self, os_folder: str) -> range:
+        """
+        :param os_folder:   os folder (e.g. "common")
+        :return:            ids of the pages of the folder
+        """
+        folder_range = self.folder_ranges.get(os_folder)
+        if folder_range is None:
+            return range(0)
+        return range(folder_range[0], folder_range[1])
+
+    def find_page_ids(self, word: str) -> set:
+        """
+        get the pages with at least a line which contains the word
+
+        :param word:    lowercase word without whitespaces
+        :return:        set of page ids
+        """
+        page_ids = set()
+        tokens_count = len(self.tokens)
+        position = self.tokens_text.find(word)
+        while position != -1:
+            i = bisect.bisect_right(self.tokens_offsets, position) - 1
+            token_page_ids = self.parsed_postings.get(i)
+            if token_page_ids is None:
+                token_page_ids = [int(page_id) for page_id in self.postings[i].split()]
+                self.parsed_postings[i] = token_page_ids
+            page_ids.update(token_page_ids)
+            if i + 1 >= tokens_count:
+                break
+            # continue from the next token
+            position = self.tokens_text.find(word, self.tokens_offsets[i + 1])
+        return page_ids
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+from typing import Optional
+
+
+class TLDRPagesCache(object):
+    """
+    Pre-parsed TLDR pages stored in the data folder, so only the first session has to parse the pages
+
+    for each page the cache contains the trust amplifier of its source, the type of each line
+    (see ParsedTLDRExample.Type) and the lowercase title, the cache is valid only for the TLDR commit of the parsed
+    pages
+    note: the packed corpus already contains these metadata, the cache is needed only without the corpus
+    """
+
+    CACHE_FILE_NAME = "tldr_pages_cache.json"
+    CACHE_VERSION = 2
+
+    INDEX_PAGE_TRUST = 0
+    INDEX_PAGE_LINE_TYPES = 1
+    INDEX_PAGE_TITLE = 2
+
+    def __init__(self, tldr_commit: Optional[str], pages: Optional[dict] = None):
+        """
+        :param tldr_commit: TLDR commit id of the parsed pages
+        :param pages:       (optional) parsed pages, relative path of the page ("os_folder/fname") ->
+                            [trust amplifier, line types string (one digit for each line), title]
+        """
+        self.tldr_commit = tldr_commit
+        self.pages = {} if pages is None else pages
+        self.changed = False
+
+    @staticmethod
+    def load(file_path: str, tldr_commit: Optional[str]) -> Optional["TLDRPagesCache"]:
+        """
+        read the cache from a file
+
+        :param file_path:   cache file
+        :param tldr_commit: TLDR commit id of the current pages
+        :return:            cache or None if the file does not exist, it is not valid or it is outdated
+        """
+        if not os.path.isfile(file_path):
+            return None
+        try:
+            with open(file_path, "r") as f:
+                data = json.load(f)
+            if data["version"] != TLDRPagesCache.CACHE_VERSION or data["tldr_commit"] != tldr_commit:
+                logging.info("TLDR pages cache is outdated: %s" % file_path)
+                return None
+            return TLDRPagesCache(tldr_commit, data["pages"])
+        except (ValueError, KeyError, OSError) as e:
+            logging.error("TLDR pages cache cannot be loaded: %s" % e)
+            return None
+
+    def save(self, file_path: str) -> bool:
+        """
+        write the cache to a file, the file is replaced atomically because it can be read by other sessions
+
+        :param file_path:   cache file
+        :return:            True if the cache has been stored
+        """
+        file_path_tmp = "%s.%d.tmp" % (file_path, os.getpid())
+        try:
+            with open(file_path_tmp, "w") as f:
+                json.dump({
+                    "version": self.CACHE_VERSION,
+                    "tldr_commit": self.tldr_commit,
+                    "pages": self.pages
+                }, f, separators=(",", ":"))
+            os.replace(file_path_tmp, file_path)
+            self.changed = False
+            return True
+        except OSError as e:
+            logging.error("TLDR pages cache cannot be stored: %s" % e)
+            if os.path.exists(file_path_tmp):
+                os.remove(file_path_tmp)
+            return False
+
+    def get_page(self, page_key: str) -> Optional[list]:
+        """
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :return:            [trust amplifier, line types string, title] or None if the page has not been parsed
+                            yet
+        """
+        return self.pages.get(page_key)
+
+    def set_page(self, page_key: str, trust: int, line_types: str, title: str) -> list:
+        """
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :param trust:       trust amplifier of the page source
+        :param line_types:  type of each line (one digit for each line)
+        :param title:       lowercase title of the page (e.g. "tar")
+        :return:            [trust amplifier, line types string, title]
+        """
+        page = [trust, line_types, title]
+        self.pages[page_key] = page
+        self.changed = True
+        return page
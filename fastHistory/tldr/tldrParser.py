@@ -1,3 +1,6 @@
+import functools
+import heapq
+import itertools
 import logging
 import os
 import difflib
@@ -5,9 +8,15 @@ import re
 import time
 from typing import Optional, TYPE_CHECKING
 
+from fastHistory.tldr.tldrCorpus import TLDRCorpus
+from fastHistory.tldr.tldrExamplesCache import TLDRExamplesCache
+from fastHistory.tldr.tldrIndex import TLDRIndex
+from fastHistory.tldr.tldrPagesCache import TLDRPagesCache
+from fastHistory.tldr.tldrScoringPool import TLDRScoringPool
+
 if TYPE_CHECKING:
     from fastHistory.parser.InputData import InputData
-    from fastHistory.tldr.tldrParserThread import TLDRParseThread
+    from fastHistory.tldr.tldrSearchThread import TLDRSearchThread
 
 
 class ParsedTLDRExample(object):
@@ -113,7 +122,9 @@ class TLDRParser(object):
     Offline search of command from TLDR pages (source: https://github.com/tldr-pages/tldr)
     """
 
+    FOLDER_TLDR = "tldr/"
     FOLDER_TLDR_PAGES = "tldr/pages/"
+    FILE_TLDR_COMMIT = "last_tldr_commit.txt"
     PAGE_CMD_TITLE_CHAR = "#"
     PAGE_CMD_DESC_CHAR = ">"
     PAGE_CMD_DESC_WITH_URL = "> More information"
@@ -126,12 +137,52 @@ class TLDRParser(object):
     INDEX_TLDR_MATCH_FULL_PATH = 3
     INDEX_TLDR_MATCH_AVAILABILITY = 4
 
-    def __init__(self, cached_in_memory_pages=None, enabled_os_folders=None):
+    # max number of pages with parsed examples kept in memory (see "get_tldr_cmd_examples")
+    EXAMPLES_CACHE_SIZE = 64
+
+    # the pool of processes is used (if more cores are available) only if the enabled folders contain at least
+    # PARALLEL_SCORING_MIN_CORPUS_PAGES pages, and only for the searches with at least PARALLEL_SCORING_MIN_PAGES
+    # candidate pages (the cost of sending the shards to the workers is higher for less pages)
+    PARALLEL_SCORING_MIN_CORPUS_PAGES = 1000
+    PARALLEL_SCORING_MIN_PAGES = 200
+    PARALLEL_SCORING_MAX_WORKERS = 8
+
+    # partial results published while a search is running (see "score_pages"): number of best matches and min time
+    # (seconds) between two publications
+    PARTIAL_MATCHES_SIZE = 100
+    PARTIAL_MATCHES_INTERVAL = 0.02
+
+    # weight of a matched word for each line type (the weight of the title depends on the word)
+    LINE_TYPE_WEIGHTS = {
+        str(ParsedTLDRExample.Type.CMD_DESC): 3,
+        str(ParsedTLDRExample.Type.CMD_DESC_MORE_INFO): 1,
+        str(ParsedTLDRExample.Type.EXAMPLE_DESC): 2,
+        str(ParsedTLDRExample.Type.EXAMPLE): 1,
+        # ignore line without the correct format
+        str(ParsedTLDRExample.Type.OTHER): 0
+    }
+    LINE_TYPE_TITLE = str(ParsedTLDRExample.Type.TITLE)
+    TITLE_RATIO_CACHE_SIZE = 8192
+
+    def __init__(self, cached_in_memory_pages=None, enabled_os_folders=None, use_index=True, use_corpus=True,
+                 cache_folder=None, scoring_workers=None):
+        """
+        :param cached_in_memory_pages:  (optional) dict to reuse the lowercase lines of the pages read by a previous
+                                        parser (page key -> lines)
+        :param enabled_os_folders:      (optional) os folders to search, in addition to "common"
+        :param use_index:               if True the index is used to find the candidate pages (if available)
+        :param use_corpus:              if True the pages are read from the packed corpus (if available)
+        :param cache_folder:            (optional) folder where the pre-parsed pages are stored for the next sessions
+        :param scoring_workers:         (optional) number of processes to score the pages when they are ready
+                                        (see "start_scoring_pool"), 0 to score them in the current process,
+                                        default: automatic (see "_get_scoring_workers")
+        """
         # TODO read from configuration or make dynamic based on OS ( enabled_os_folders: "linux", "windows", "osx"
         if enabled_os_folders is not None:
             self.enabled_os_folders = ["common"] + enabled_os_folders
         else:
             self.enabled_os_folders = ["common", "linux"]  # "windows", "osx",
+        self.tldr_path = os.path.abspath(os.path.dirname(__file__)) + "/" + self.FOLDER_TLDR
         self.pages_path = os.path.abspath(os.path.dirname(__file__)) + "/" + self.FOLDER_TLDR_PAGES
         if not os.path.isdir(self.pages_path):
             logging.error("TLDR pages path not found: %s" % self.pages_path)
@@ -139,6 +190,21 @@ class TLDRParser(object):
             self.cached_in_memory_pages = {}
         else:
             self.cached_in_memory_pages = cached_in_memory_pages
+        self.use_index = use_index
+        self.use_corpus = use_corpus
+        self.cache_folder = cache_folder
+        self.scoring_workers = scoring_workers
+        # loaded only once and only when needed (see "_get_index", "_get_corpus" and "_get_pages_cache")
+        self.index = None
+        self.index_loaded = False
+        self.corpus = None
+        self.corpus_loaded = False
+        self.pages_cache = None
+        # created here because the examples are parsed by the UI and by the prefetch of the search thread
+        self.examples_cache = TLDRExamplesCache(self.EXAMPLES_CACHE_SIZE)
+        self.scoring_pool = None
+        # words and matched pages of the last completed search, used to narrow the next search (see "_get_refined_pages")
+        self.last_search = None
 
     def _read_file(self, file_full_path: str) -> list:
         context = []
@@ -147,77 +213,485 @@ class TLDRParser(object):
                 context.append(line)
         return context
 
-    def find_match_command(self, input_data: "InputData", thread: "TLDRParseThread" = None) -> Optional[list]:
+    def _read_tldr_commit(self) -> Optional[str]:
+        """
+        :return: commit id of the TLDR pages or None if not available
+        """
+        try:
+            with open(self.tldr_path + self.FILE_TLDR_COMMIT, "r") as f:
+                return f.read().strip()
+        except OSError as e:
+            logging.error("TLDR commit id not found: %s" % e)
+            return None
+
+    def _get_index(self) -> Optional[TLDRIndex]:
+        """
+        load the index of the pages (only once), the index is not used if it does not match the current pages
+
+        :return: index or None if not available
+        """
+        if not self.index_loaded:
+            index = TLDRIndex.load(self.tldr_path + TLDRIndex.INDEX_FILE_NAME)
+            if index is not None and index.tldr_commit != self._read_tldr_commit():
+                logging.info("TLDR index is outdated, the pages are scanned instead")
+                index = None
+            self.index = index
+            self.index_loaded = True
+        return self.index
+
+    def _get_corpus(self) -> Optional[TLDRCorpus]:
+        """
+        map the packed pages in memory (only once), the corpus is not used if it does not match the current pages
+
+        :return: corpus or None if not available
+        """
+        if not self.corpus_loaded:
+            corpus = TLDRCorpus.load(self.tldr_path + TLDRCorpus.CORPUS_FILE_NAME)
+            if corpus is not None and corpus.tldr_commit != self._read_tldr_commit():
+                logging.info("TLDR corpus is outdated, the pages are read from the single files instead")
+                corpus.close()
+                corpus = None
+            self.corpus = corpus
+            self.corpus_loaded = True
+        return self.corpus
+
+    def _get_pages_cache(self) -> TLDRPagesCache:
+        """
+        load the pre-parsed pages (only once) from the cache folder
+        if they are not available or outdated, all the pages are parsed and stored for the next sessions
+
+        :return: pre-parsed pages
+        """
+        if self.pages_cache is None:
+            tldr_commit = self._read_tldr_commit()
+            pages_cache = None
+            if self.cache_folder is not None:
+                pages_cache = TLDRPagesCache.load(self.cache_folder + TLDRPagesCache.CACHE_FILE_NAME, tldr_commit)
+            if pages_cache is None:
+                pages_cache = TLDRPagesCache(tldr_commit)
+                for page_key in TLDRIndex.list_pages(self.pages_path):
+                    pages_cache.set_page(page_key, *self._parse_page(self._read_page_lines(page_key)))
+                if self.cache_folder is not None:
+                    pages_cache.save(self.cache_folder + TLDRPagesCache.CACHE_FILE_NAME)
+            self.pages_cache = pages_cache
+        return self.pages_cache
+
+    def _get_examples_cache(self) -> TLDRExamplesCache:
+        """
+        :return: parsed examples of the last shown pages
+        """
+        return self.examples_cache
+
+    def _get_page_info(self, page_key: str) -> list:
+        """
+        get the metadata of the page from the packed corpus (calculated when the corpus is built) or, if not
+        available, from the pre-parsed pages
+
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :return:            [trust amplifier, line types string, title] of the page
+        """
+        corpus = self._get_corpus() if self.use_corpus else None
+        if corpus is not None:
+            page_id = corpus.get_page_id(page_key)
+            if page_id is not None:
+                return corpus.get_page_info(page_id)
+        pages_cache = self._get_pages_cache()
+        page_info = pages_cache.get_page(page_key)
+        if page_info is None:
+            page_info = pages_cache.set_page(page_key, *self._parse_page(self._read_page_lines(page_key)))
+        return page_info
+
+    def _parse_page(self, lines: list) -> list:
+        """
+        calculate the trust amplifier of the page source, the type of each line and extract the title
+        note: a page has a single title line
+
+        :param lines:   lines of the page
+        :return:        [trust amplifier, line types string (one digit for each line), lowercase title]
+        """
+        trust_source_amplifier = 0
+        line_types = []
+        title = ""
+        for line in lines:
+            first_char = line[0]
+            if first_char == self.PAGE_CMD_TITLE_CHAR:
+                line_type = ParsedTLDRExample.Type.TITLE
+                # e.g. "# tar\n" -> "tar"
+                title = line[2:-1].strip().lower()
+            elif first_char == self.PAGE_CMD_DESC_CHAR:
+                if line.startswith(self.PAGE_CMD_DESC_WITH_URL):
+                    line_type = ParsedTLDRExample.Type.CMD_DESC_MORE_INFO
+                    trust_source_amplifier = self._is_trusted_source(line[len(self.PAGE_CMD_DESC_WITH_URL) + 3:])
+                else:
+                    line_type = ParsedTLDRExample.Type.CMD_DESC
+            elif first_char == self.PAGE_EXAMPLE_DESC_CHAR:
+                line_type = ParsedTLDRExample.Type.EXAMPLE_DESC
+            elif first_char == self.PAGE_EXAMPLE_CHAR:
+                line_type = ParsedTLDRExample.Type.EXAMPLE
+            else:
+                line_type = ParsedTLDRExample.Type.OTHER
+            line_types.append(str(line_type))
+        return [trust_source_amplifier, "".join(line_types), title]
+
+    def _read_page_lines(self, page_key: str) -> list:
+        """
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :return:            lines of the page from the packed corpus or, if not available, from the page file
+        """
+        corpus = self._get_corpus() if self.use_corpus else None
+        if corpus is not None:
+            page_id = corpus.get_page_id(page_key)
+            if page_id is not None:
+                return corpus.get_lines(page_id)
+        return self._read_file(self.pages_path + page_key)
+
+    def _get_page_lower_lines(self, page_key: str) -> list:
+        """
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :return:            lowercase lines of the page from the packed corpus or, if not available, from the page
+                            file (cached in memory)
+        """
+        corpus = self._get_corpus() if self.use_corpus else None
+        if corpus is not None:
+            page_id = corpus.get_page_id(page_key)
+            if page_id is not None:
+                return corpus.get_lower_lines(page_id)
+        lower_lines = self.cached_in_memory_pages.get(page_key)
+        if lower_lines is None:
+            lower_lines = [line.lower() for line in self._read_file(self.pages_path + page_key)]
+            self.cached_in_memory_pages[page_key] = lower_lines
+        return lower_lines
+
+    def find_match_command(self, input_data: "InputData", thread: "TLDRSearchThread" = None) -> Optional[list]:
         # NO empty, already trimmed
         words = input_data.get_all_words()
         words = [word.lower() for word in words]
-        result = []
-        words_dict = {}
+        # this remove any empty word and any duplicate
+        words = list(dict((word, 0) for word in words if len(word) > 0).keys())
         try:
-            for os_folder in self.enabled_os_folders:
-                for root, dirs, fnames in os.walk(self.pages_path + os_folder):
-                    for fname in fnames:
-                        # this remove any empty word
-                        words_dict = dict((word, 0) for word in words if len(word) > 0)
-                        total_weight = 0
-                        trust_source_amplifier = 0
-                        file_full_path = os.path.join(root, fname)
-                        page = self.cached_in_memory_pages.get(os_folder + "/" + fname)
-                        if page is None:
-                            self.cached_in_memory_pages[os_folder + "/" + fname] = self._read_file(file_full_path)
-                        # if dict is not empty read the file
-                        if words_dict:
-                            if thread and thread.has_been_stopped():
-                                logging.debug("find_match_command: thread stopped, stop the research")
-                                return []
-                            # TODO try to use mmapls
-                            # map_file = mmap.mmap(f.fileno(), 0, prot=mmap.ACCESS_READ)
-                            lines = self.cached_in_memory_pages[os_folder + "/" + fname]
-                            for line in lines:
-                                number_of_matches_in_a_line = 0
-                                # TODO replace with pre-trust-calculation method
-                                if line.startswith(self.PAGE_CMD_DESC_WITH_URL):
-                                    trust_source_amplifier = self._is_trusted_source(
-                                        line[len(self.PAGE_CMD_DESC_WITH_URL) + 3:])
-                                for word in words_dict.keys():
-                                    if word in line.lower():
-                                        number_of_matches_in_a_line += 1
-                                        first_char = line[0]
-                                        if first_char == self.PAGE_CMD_TITLE_CHAR:
-                                            # check if title matches (e.g. "# tar\n")
-                                            command = line[2:-1].strip().lower()
-                                            ratio_match = difflib.SequenceMatcher(None, word, command).ratio()
-                                            weight = 20 * ratio_match
-                                        elif first_char == self.PAGE_CMD_DESC_CHAR:
-                                            if line.startswith(self.PAGE_CMD_DESC_WITH_URL):
-                                                weight = 1
-                                            else:
-                                                weight = 3
-                                        elif first_char == self.PAGE_EXAMPLE_DESC_CHAR:
-                                            weight = 2
-                                        elif first_char == self.PAGE_EXAMPLE_CHAR:
-                                            weight = 1
-                                        else:
-                                            # ignore line without the correct format
-                                            weight = 0
-                                        words_dict[word] += 1
-                                        total_weight += (weight * number_of_matches_in_a_line)
-                        if all(count > 0 for count in words_dict.values()):
-                            if fname.endswith(".md"):
-                                cmd_name = fname[:-3]
-                            else:
-                                logging.error("find_match_command: fname does not ends with md: %s" % fname)
-                                cmd_name = fname
-                            if trust_source_amplifier != 0:
-                                total_weight = total_weight + (total_weight * trust_source_amplifier / 100)
-                            # NOTE: the system availability of the command (5' value) is calculated later only if needed
-                            result.append([total_weight, os_folder, cmd_name, file_full_path, None])
-            if words_dict:
-                result.sort(key=TLDRParser._find_match_command_sort_key, reverse=True)
-            return result
+            index = self._get_index() if self.use_index else None
+            page_keys = self._get_refined_pages(words)
+            if page_keys is not None:
+                logging.debug("find_match_command: %d pages matched by the previous search" % len(page_keys))
+            # the index can be used only with words without whitespaces (see TLDRIndex)
+            elif index is not None and all(len(word.split()) == 1 for word in words):
+                page_keys = self._get_candidate_pages(index, words, thread)
+            else:
+                page_keys = self._get_enabled_pages()
+            if page_keys is None:
+                logging.debug("find_match_command: thread stopped, stop the research")
+                return []
+            if not words:
+                if index is None and (not self.use_corpus or self._get_corpus() is None):
+                    # load the pages in memory for the next searches
+                    for page_key in page_keys:
+                        if thread and thread.has_been_stopped():
+                            logging.debug("find_match_command: thread stopped, stop the research")
+                            return []
+                        self._get_page_lower_lines(page_key)
+                return [self._create_match(0, page_key) for page_key in page_keys]
+            matches = self._score_pages_sorted(words, page_keys, thread)
+            if matches is None:
+                logging.debug("find_match_command: thread stopped, stop the research")
+                return []
+            self.last_search = [words, set(match[1] for match in matches)]
+            return [self._create_match(match[0], match[1]) for match in matches]
         except Exception as e:
             logging.error("find_match_command: %s" % e)
-            return result
+            return []
+
+    def _get_refined_pages(self, words: list) -> Optional[list]:
+        """
+        if the search refines the last completed search (e.g. "tar" -> "tar x"), only the pages matched by the last
+        search can match: each previous word is contained in a new word, so it is contained in the same line
+
+        :param words:   lowercase words (no empty and no duplicate)
+        :return:        relative path of the pages matched by the last search ("os_folder/fname") in the order of
+                        the enabled folders or None if the search does not refine the last one
+        """
+        last_search = self.last_search
+        if last_search is None or not words:
+            return None
+        last_words, last_page_keys = last_search
+        for last_word in last_words:
+            if not any(last_word in word for word in words):
+                return None
+        return [page_key for page_key in self._get_enabled_pages() if page_key in last_page_keys]
+
+    def _get_candidate_pages(self, index: TLDRIndex, words: list, thread: "TLDRSearchThread" = None):
+        """
+        get the pages of the enabled folders which contain all the words
+
+        :param index:   index of the pages
+        :param words:   lowercase words (no empty and no duplicate)
+        :param thread:  (optional) search thread, the search is stopped if the thread has been stopped
+        :return:        relative path of the candidate pages ("os_folder/fname") or None if the thread has been
+                        stopped
+        """
+        candidate_page_ids = None
+        for word in words:
+            if thread and thread.has_been_stopped():
+                return None
+            if candidate_page_ids is None:
+                candidate_page_ids = index.find_page_ids(word)
+            else:
+                candidate_page_ids &= index.find_page_ids(word)
+            if not candidate_page_ids:
+                return []
+        page_keys = []
+        for os_folder in self.enabled_os_folders:
+            for page_id in index.get_folder_page_ids(os_folder):
+                if candidate_page_ids is None or page_id in candidate_page_ids:
+                    page_keys.append(index.get_page(page_id))
+        return page_keys
+
+    def _get_enabled_pages(self) -> list:
+        """
+        :return: relative path of all the pages of the enabled folders ("os_folder/fname")
+        """
+        corpus = self._get_corpus() if self.use_corpus else None
+        page_keys = []
+        for os_folder in self.enabled_os_folders:
+            if corpus is not None:
+                page_keys += corpus.get_folder_pages(os_folder)
+            else:
+                for root, dirs, fnames in os.walk(self.pages_path + os_folder):
+                    page_keys += [os_folder + "/" + fname for fname in fnames]
+        return page_keys
+
+    def _get_scoring_workers(self) -> int:
+        """
+        :return:    number of processes to score the pages (0 to score them in the current process)
+        """
+        if self.scoring_workers is None:
+            cpu_count = os.cpu_count()
+            if cpu_count is None or cpu_count < 2 or \
+                    len(self._get_enabled_pages()) < self.PARALLEL_SCORING_MIN_CORPUS_PAGES:
+                self.scoring_workers = 0
+            else:
+                self.scoring_workers = min(cpu_count, self.PARALLEL_SCORING_MAX_WORKERS)
+        return self.scoring_workers
+
+    def start_scoring_pool(self) -> Optional[TLDRScoringPool]:
+        """
+        create the pool of processes used to score the pages (if needed), the processes are started without waiting
+        for them: the pages are scored in the current process until they are ready
+        the pool is reused by the next searches (and by the next search threads of the session) until
+        "stop_scoring_pool" is called
+
+        :return:    pool of processes or None if the pages are scored in the current process
+        """
+        workers = self._get_scoring_workers()
+        if workers == 0:
+            return None
+        scoring_pool = self.scoring_pool
+        if scoring_pool is None or scoring_pool.workers != workers:
+            if scoring_pool is not None:
+                scoring_pool.shutdown()
+            if not self.use_corpus or self._get_corpus() is None:
+                # the pre-parsed pages are stored before the workers need them
+                self._get_pages_cache()
+            scoring_pool = TLDRScoringPool(workers, {
+                "use_corpus": self.use_corpus,
+                "cache_folder": self.cache_folder
+            })
+            self.scoring_pool = scoring_pool
+        return scoring_pool
+
+    def stop_scoring_pool(self) -> None:
+        """
+        terminate the processes used to score the pages (if started)
+
+        :return:
+        """
+        scoring_pool = self.scoring_pool
+        self.scoring_pool = None
+        if scoring_pool is not None:
+            scoring_pool.shutdown()
+
+    def _score_pages_sorted(self, words: list, page_keys: list, thread: "TLDRSearchThread" = None) -> Optional[list]:
+        """
+        score the pages in the current process or in parallel
+
+        :param words:       lowercase words (no empty and no duplicate)
+        :param page_keys:   relative path of the pages to score ("os_folder/fname")
+        :param thread:      (optional) search thread, the search is stopped if the thread has been stopped
+        :return:            [weight, page key] of the matched pages sorted by weight or None if the thread has been
+                            stopped
+        """
+        if thread is not None:
+            publish_partial_matches = functools.partial(self._publish_partial_matches, thread)
+        else:
+            publish_partial_matches = None
+        scoring_pool = self.scoring_pool
+        if scoring_pool is not None and scoring_pool.workers == self._get_scoring_workers() and \
+                scoring_pool.is_ready() and len(page_keys) >= self.PARALLEL_SCORING_MIN_PAGES:
+            return scoring_pool.score_pages(words, page_keys, thread, publish_partial_matches)
+        matches = self.score_pages(words, page_keys, thread, publish_partial_matches)
+        if matches is None:
+            return None
+        matches.sort(key=TLDRScoringPool.sort_key, reverse=True)
+        return matches
+
+    def _publish_partial_matches(self, thread: "TLDRSearchThread", sorted_matches) -> None:
+        """
+        :param thread:          search thread
+        :param sorted_matches:  [weight, page key] of the best matches found so far sorted by weight (iterable)
+        :return:
+        """
+        thread.set_partial_result_tldr_options([self._create_match(match[0], match[1]) for match in
+                                                itertools.islice(sorted_matches, self.PARTIAL_MATCHES_SIZE)])
+
+    def _get_scoring_order(self, words: list, page_keys: list, thread: "TLDRSearchThread" = None) -> Optional[list]:
+        """
+        the pages with a word in the title are likely the best matches, so they are scored first
+
+        :param words:       lowercase words (no empty and no duplicate)
+        :param page_keys:   relative path of the pages to score ("os_folder/fname")
+        :param thread:      (optional) search thread, the search is stopped if the thread has been stopped
+        :return:            [positions of the pages in the scoring order, number of pages with a word in the title]
+                            or None if the thread has been stopped
+        """
+        title_positions = []
+        other_positions = []
+        for position in range(len(page_keys)):
+            if thread and thread.has_been_stopped():
+                return None
+            title = self._get_page_info(page_keys[position])[TLDRPagesCache.INDEX_PAGE_TITLE]
+            if any(word in title for word in words):
+                title_positions.append(position)
+            else:
+                other_positions.append(position)
+        return [title_positions + other_positions, len(title_positions)]
+
+    def score_pages(self, words: list, page_keys: list, thread: "TLDRSearchThread" = None,
+                    publish_partial_matches=None) -> Optional[list]:
+        """
+        score the given pages
+
+        if "publish_partial_matches" is given, the pages with a word in the title are scored first and the best
+        matches found so far are kept in a bounded heap and published periodically, so they can be shown before the
+        end of the search
+
+        :param words:                   lowercase words (no empty and no duplicate)
+        :param page_keys:               relative path of the pages to score ("os_folder/fname")
+        :param thread:                  (optional) search thread, the search is stopped if the thread has been stopped
+        :param publish_partial_matches: (optional) function called with the best matches found so far
+                                        ([weight, page key] sorted by weight)
+        :return:                        [weight, page key] of the matched pages (not sorted, in the order of the
+                                        given pages) or None if the thread has been stopped
+        """
+        corpus = self._get_corpus() if self.use_corpus else None
+        if publish_partial_matches is None:
+            scoring_order = range(len(page_keys))
+            title_pages_count = 0
+        else:
+            scoring_order = self._get_scoring_order(words, page_keys, thread)
+            if scoring_order is None:
+                return None
+            scoring_order, title_pages_count = scoring_order
+        # min heap of [weight, -position, page key]: with the same weight, the first page in the given order is better
+        best_matches = []
+        best_matches_changed = False
+        last_publish_time = time.time()
+        matches = [None] * len(page_keys)
+        for i in range(len(scoring_order)):
+            if thread and thread.has_been_stopped():
+                return None
+            position = scoring_order[i]
+            page_key = page_keys[position]
+            total_weight = self._score_page(corpus, page_key, words)
+            if total_weight is not None:
+                matches[position] = [total_weight, page_key]
+                if publish_partial_matches is not None:
+                    best_match = [total_weight, -position, page_key]
+                    if len(best_matches) < self.PARTIAL_MATCHES_SIZE:
+                        heapq.heappush(best_matches, best_match)
+                        best_matches_changed = True
+                    elif best_match > best_matches[0]:
+                        heapq.heapreplace(best_matches, best_match)
+                        best_matches_changed = True
+            if best_matches_changed and (i + 1 == title_pages_count or
+                                         time.time() - last_publish_time >= self.PARTIAL_MATCHES_INTERVAL):
+                publish_partial_matches([match[0], match[2]] for match in sorted(best_matches, reverse=True))
+                best_matches_changed = False
+                last_publish_time = time.time()
+        return [match for match in matches if match is not None]
+
+    def _score_page(self, corpus: Optional[TLDRCorpus], page_key: str, words: list) -> Optional[float]:
+        """
+        :param corpus:      (optional) packed pages
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :param words:       lowercase words (no empty and no duplicate)
+        :return:            weight of the page or None if at least one word is not in the page
+        """
+        page_id = corpus.get_page_id(page_key) if corpus is not None else None
+        if page_id is not None:
+            # skip the page without splitting it in lines if a word is not in the page
+            lower_body = corpus.get_lower_body(page_id)
+            if not all(word in lower_body for word in words):
+                return None
+            lower_lines = TLDRCorpus.split_lines(lower_body)
+        else:
+            lower_lines = self._get_page_lower_lines(page_key)
+        return self._get_page_weight(lower_lines, self._get_page_info(page_key), words)
+
+    def _create_match(self, total_weight: float, page_key: str) -> list:
+        os_folder, fname = page_key.split("/", 1)
+        if fname.endswith(".md"):
+            cmd_name = fname[:-3]
+        else:
+            logging.error("find_match_command: fname does not ends with md: %s" % fname)
+            cmd_name = fname
+        # NOTE: the system availability of the command (5' value) is calculated later only if needed
+        return [total_weight, os_folder, cmd_name, self.pages_path + page_key, None]
+
+    def _get_page_weight(self, lower_lines: list, page_info: list, words: list) -> Optional[float]:
+        """
+        calculate the weight of a page for the given words
+
+        :param lower_lines: lowercase lines of the page
+        :param page_info:   [trust amplifier, line types string, title] of the page
+        :param words:       lowercase words (no empty and no duplicate)
+        :return:            weight of the page or None if at least one word is not in the page
+        """
+        words_dict = dict((word, 0) for word in words)
+        total_weight = 0
+        for lower_line, line_type in zip(lower_lines, page_info[TLDRPagesCache.INDEX_PAGE_LINE_TYPES]):
+            number_of_matches_in_a_line = 0
+            for word in words_dict.keys():
+                if word in lower_line:
+                    number_of_matches_in_a_line += 1
+                    if line_type == self.LINE_TYPE_TITLE:
+                        # check if title matches
+                        ratio_match = self._get_title_ratio(word, page_info[TLDRPagesCache.INDEX_PAGE_TITLE])
+                        weight = 20 * ratio_match
+                    else:
+                        weight = self.LINE_TYPE_WEIGHTS[line_type]
+                    words_dict[word] += 1
+                    total_weight += (weight * number_of_matches_in_a_line)
+        if not all(count > 0 for count in words_dict.values()):
+            return None
+        trust_source_amplifier = page_info[TLDRPagesCache.INDEX_PAGE_TRUST]
+        if trust_source_amplifier != 0:
+            total_weight = total_weight + (total_weight * trust_source_amplifier / 100)
+        return total_weight
+
+    @staticmethod
+    @functools.lru_cache(maxsize=TITLE_RATIO_CACHE_SIZE)
+    def _get_title_ratio(word: str, title: str) -> float:
+        """
+        similarity between a search word and a page title
+        the value is the same of difflib.SequenceMatcher(None, word, title).ratio() but usually without using it
+
+        :param word:    lowercase search word
+        :param title:   lowercase page title
+        :return:        similarity in [0, 1]
+        """
+        if word in title:
+            # the longest (and only) matching block is the word itself: ratio = 2 * matches / total length
+            return 2.0 * len(word) / (len(word) + len(title))
+        return difflib.SequenceMatcher(None, word, title).ratio()
 
     @staticmethod
     def _is_trusted_source(url) -> int:
@@ -246,10 +720,6 @@ class TLDRParser(object):
 
         return 0
 
-    @staticmethod
-    def _find_match_command_sort_key(arr):
-        return arr[0]
-
     @staticmethod
     def _get_url_from_more_info_row(row):
         if "<" in row:
@@ -263,32 +733,49 @@ class TLDRParser(object):
             return row
 
     def get_tldr_cmd_examples(self, tldr_page_match: list) -> ParsedTLDRExample:
+        """
+        get the parsed examples of a matched page, the last parsed pages are kept in memory
+
+        :param tldr_page_match: matched page (see "find_match_command")
+        :return:                parsed examples (they must not be modified)
+        """
+        page_key = tldr_page_match[self.INDEX_TLDR_MATCH_CMD_FOLDER] + "/" + \
+            tldr_page_match[self.INDEX_TLDR_MATCH_CMD] + ".md"
+        examples_cache = self._get_examples_cache()
+        parsed_tldr_example = examples_cache.get(page_key)
+        if parsed_tldr_example is None:
+            parsed_tldr_example = self._parse_tldr_cmd_examples(page_key)
+            examples_cache.put(page_key, parsed_tldr_example)
+        return parsed_tldr_example
+
+    def _parse_tldr_cmd_examples(self, page_key: str) -> ParsedTLDRExample:
+        """
+        :param page_key:    relative path of the page ("os_folder/fname")
+        :return:            parsed examples of the page, the page is read from the packed corpus if available
+        """
         parsed_tldr_example = ParsedTLDRExample()
-        path_tldr_page = tldr_page_match[self.INDEX_TLDR_MATCH_FULL_PATH]
-        parsed_tldr_example.set_relative_tldr_page(tldr_page_match[self.INDEX_TLDR_MATCH_CMD_FOLDER] + "/" +
-                                                   tldr_page_match[self.INDEX_TLDR_MATCH_CMD] + ".md")
-        with open(path_tldr_page) as f:
-            for line in f:
-                line = line.strip()
-                if len(line) == 0:
+        parsed_tldr_example.set_relative_tldr_page(page_key)
+        for line in self._read_page_lines(page_key):
+            line = line.strip()
+            if len(line) == 0:
+                parsed_tldr_example.append_generic_row(line)
+            else:
+                first_char = line[0]
+                if first_char == self.PAGE_CMD_TITLE_CHAR:
+                    parsed_tldr_example.set_command(line)
+                elif first_char == self.PAGE_EXAMPLE_CHAR:
+                    last_char = line[-1]
+                    if last_char == self.PAGE_EXAMPLE_CHAR and len(line) > 2:
+                        clean_cmd = line[1:-1]
+                        parsed_tldr_example.append_example_row(clean_cmd)
+                    else:
+                        parsed_tldr_example.append_example_row(line)
+                        logging.error("bad format: %s -> %s" % (page_key, line))
+                elif line.startswith(self.PAGE_CMD_DESC_WITH_URL):
+                    parsed_tldr_example.set_url_more_info(TLDRParser._get_url_from_more_info_row(line))
                     parsed_tldr_example.append_generic_row(line)
                 else:
-                    first_char = line[0]
-                    if first_char == self.PAGE_CMD_TITLE_CHAR:
-                        parsed_tldr_example.set_command(line)
-                    elif first_char == self.PAGE_EXAMPLE_CHAR:
-                        last_char = line[-1]
-                        if last_char == self.PAGE_EXAMPLE_CHAR and len(line) > 2:
-                            clean_cmd = line[1:-1]
-                            parsed_tldr_example.append_example_row(clean_cmd)
-                        else:
-                            parsed_tldr_example.append_example_row(line)
-                            logging.error("bad format: %s -> %s" % (path_tldr_page, line))
-                    elif line.startswith(self.PAGE_CMD_DESC_WITH_URL):
-                        parsed_tldr_example.set_url_more_info(TLDRParser._get_url_from_more_info_row(line))
-                        parsed_tldr_example.append_generic_row(line)
-                    else:
-                        parsed_tldr_example.append_generic_row(line)
+                    parsed_tldr_example.append_generic_row(line)
         return parsed_tldr_example
 
     @staticmethod
@@ -360,5 +847,36 @@ class TLDRParser(object):
         except Exception as e:
             return "Error: %s" % e
 
+    def build_index(self) -> str:
+        """
+        this is used only by the update_tldr_pages.sh script (after "format_tldr_pages")
+
+        build the index of the pages and store it next to them
+        :return:
+        """
+        try:
+            index = TLDRIndex.build(self.pages_path, self._read_tldr_commit())
+            index.save(self.tldr_path + TLDRIndex.INDEX_FILE_NAME)
+            return "%d pages have been correctly indexed" % len(index.pages)
+        except Exception as e:
+            return "Error: %s" % e
+
+    def build_corpus(self) -> str:
+        """
+        this is used only by the update_tldr_pages.sh script (after "format_tldr_pages")
+
+        pack all the pages and their metadata (trust amplifier, line types and title) in a single file and store
+        it next to them
+        :return:
+        """
+        try:
+            pages = TLDRIndex.list_pages(self.pages_path)
+            pages_info = [self._parse_page(self._read_file(self.pages_path + page)) for page in pages]
+            TLDRCorpus.build(self.pages_path, self.tldr_path + TLDRCorpus.CORPUS_FILE_NAME, pages, pages_info,
+                             self._read_tldr_commit())
+            return "%d pages have been correctly packed" % len(pages)
+        except Exception as e:
+            return "Error: %s" % e
+
 
 
@@ -0,0 +1,115 @@
+import heapq
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, wait
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastHistory.tldr.tldrSearchThread import TLDRSearchThread
+
+# parser used by the worker process (see "_init_worker")
+_worker_parser = None
+
+
+def _init_worker(parser_settings: dict) -> None:
+    global _worker_parser
+    from fastHistory.tldr.tldrParser import TLDRParser
+    _worker_parser = TLDRParser(use_index=False, **parser_settings)
+
+
+def _warm_up() -> None:
+    # the worker parser is created by the initializer, nothing else to do
+    pass
+
+
+def _score_shard(words: list, page_keys: list) -> list:
+    matches = _worker_parser.score_pages(words, page_keys)
+    matches.sort(key=TLDRScoringPool.sort_key, reverse=True)
+    return matches
+
+
+class TLDRScoringPool(object):
+    """
+    Persistent pool of processes to score the TLDR pages on multiple cores
+
+    the pages are split in contiguous shards, each worker returns the sorted matches of its shards and the
+    sorted lists are merged: the result is the same of the sorted matches of a single process
+    note: the processes are spawned (not forked) because the pool is used by a thread of the UI
+    the processes are started as soon as the pool is created, the pool should be used only when they are ready
+    (see "is_ready"): until then the pages can be scored in the current process
+    """
+
+    # number of shards for each worker, more shards allow to stop a search earlier
+    SHARDS_PER_WORKER = 4
+    # max time (seconds) to wait for a shard before checking if the search has been stopped
+    STOP_CHECK_INTERVAL = 0.01
+
+    def __init__(self, workers: int, parser_settings: dict):
+        """
+        :param workers:         number of processes
+        :param parser_settings: settings of the parser of each worker (see TLDRParser)
+        """
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker,
+                                            initargs=(parser_settings,))
+        # a task for each worker, they are completed when the workers have been started and initialized
+        self.warm_up_futures = [self.executor.submit(_warm_up) for _ in range(workers)]
+
+    @staticmethod
+    def sort_key(match: list):
+        return match[0]
+
+    def score_pages(self, words: list, page_keys: list, thread: "TLDRSearchThread" = None,
+                    publish_partial_matches=None) -> Optional[list]:
+        """
+        score the pages in parallel
+
+        :param words:                   lowercase words (no empty and no duplicate)
+        :param page_keys:               relative path of the pages to score ("os_folder/fname")
+        :param thread:                  (optional) search thread, the search is stopped if the thread has been stopped
+        :param publish_partial_matches: (optional) function called with the best matches of the completed shards
+                                        ([weight, page key] sorted by weight) after each shard
+        :return:                        [weight, page key] of the matched pages sorted by weight or None if the
+                                        thread has been stopped
+        """
+        shards_count = self.workers * self.SHARDS_PER_WORKER
+        shard_size = max(1, -(-len(page_keys) // shards_count))
+        futures = [self.executor.submit(_score_shard, words, page_keys[i:i + shard_size])
+                   for i in range(0, len(page_keys), shard_size)]
+        shards_matches = []
+        for future in futures:
+            while True:
+                if thread and thread.has_been_stopped():
+                    for pending_future in futures:
+                        pending_future.cancel()
+                    return None
+                try:
+                    shards_matches.append(future.result(timeout=self.STOP_CHECK_INTERVAL))
+                    break
+                except TimeoutError:
+                    continue
+            if publish_partial_matches is not None and len(shards_matches) < len(futures):
+                # the consumer takes only the first matches, the shards are not merged completely
+                publish_partial_matches(heapq.merge(*shards_matches, key=self.sort_key, reverse=True))
+        return list(heapq.merge(*shards_matches, key=self.sort_key, reverse=True))
+
+    def is_ready(self, timeout=0) -> bool:
+        """
+        :param timeout: max time (seconds) to wait for the workers
+        :return:        True if the workers are ready to score the pages, False if they are still starting or
+                        they cannot be started
+        """
+        not_done = wait(self.warm_up_futures, timeout=timeout).not_done
+        if len(not_done) > 0:
+            return False
+        return all(future.exception() is None for future in self.warm_up_futures)
+
+    def shutdown(self) -> None:
+        """
+        terminate the processes, waiting for them so no process is left running (the pool is shut down only once,
+        when the UI is closed)
+
+        :return:
+        """
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,176 @@
+import logging
+import time
+from threading import Thread, Condition
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastHistory.parser.InputData import InputData
+    from fastHistory.tldr.tldrParser import TLDRParser
+
+
+class TLDRSearchThread(Thread):
+    """
+    Thread used to search the TLDR pages in background for the whole session
+
+    only the last requested search is executed: the requests received while a search is running replace each
+    other and the running search is stopped at the next check of the parser (see "has_been_stopped"), so a
+    stale search never competes with the current one
+    when no search is requested, the thread parses the examples of the pages next to the selected one (see
+    "prefetch"), so they are already in memory when they are selected
+    the processes of the parallel scoring (if enabled) are started with the thread, so they get ready while the
+    first search is typed, they are not terminated when the thread is stopped: the pool belongs to the parser and
+    it is reused by the next threads (see TLDRParser.start_scoring_pool and TLDRParser.stop_scoring_pool)
+    note: the parser checks "has_been_stopped" and publishes the best matches found so far with
+    "set_partial_result_tldr_options" while the search is running
+    """
+
+    def __init__(self, tldr_parser: "TLDRParser"):
+        Thread.__init__(self, daemon=True)
+        self.tldr_parser = tldr_parser
+        self.condition = Condition()
+        self.last_request_id = 0
+        self.request = None
+        self.prefetch_request = None
+        self.running_request_id = None
+        self.result = None
+        self.partial_result = None
+        self.search_time = None
+        self.stopped = False
+
+    def run(self):
+        self.tldr_parser.start_scoring_pool()
+        while True:
+            with self.condition:
+                while self.request is None and self.prefetch_request is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    break
+                request = self.request
+                if request is None:
+                    tldr_page_matches = self.prefetch_request
+                    self.prefetch_request = None
+                else:
+                    self.request = None
+                    self.running_request_id = request[0]
+
+            if request is None:
+                self._prefetch_tldr_cmd_examples(tldr_page_matches)
+                continue
+
+            start_time = time.time()
+            options = self.tldr_parser.find_match_command(request[1], self)
+            search_time = time.time() - start_time
+
+            with self.condition:
+                self.running_request_id = None
+                if request[0] == self.last_request_id:
+                    logging.debug("tldr search '%s': %d results in %.3f seconds" %
+                                  (request[1].get_main_str(), len(options), search_time))
+                    self.result = options
+                    self.partial_result = None
+                    self.search_time = search_time
+                    self.condition.notify_all()
+                else:
+                    logging.debug("tldr search '%s': stopped after %.3f seconds" %
+                                  (request[1].get_main_str(), search_time))
+
+    def search(self, input_data: "InputData"):
+        """
+        request a new search, the previous requests are discarded and the running search is stopped
+
+        :param input_data:  parsed search text
+        :return:
+        """
+        with self.condition:
+            self.last_request_id += 1
+            self.request = [self.last_request_id, input_data]
+            self.result = None
+            self.partial_result = None
+            self.prefetch_request = None
+            self.condition.notify_all()
+
+    def prefetch(self, tldr_page_matches: list):
+        """
+        request to parse the examples of the given pages when no search is running, the previous prefetch requests
+        are discarded
+
+        :param tldr_page_matches:   matched pages (see TLDRParser.find_match_command), the most likely to be
+                                    selected first
+        :return:
+        """
+        with self.condition:
+            self.prefetch_request = tldr_page_matches
+            self.condition.notify_all()
+
+    def _prefetch_tldr_cmd_examples(self, tldr_page_matches: list):
+        for tldr_page_match in tldr_page_matches:
+            # a search or a new prefetch request has priority
+            if self.stopped or self.request is not None or self.prefetch_request is not None:
+                return
+            try:
+                self.tldr_parser.get_tldr_cmd_examples(tldr_page_match)
+            except OSError as e:
+                logging.error("tldr page cannot be prefetched: %s" % e)
+
+    def get_result(self, timeout=0):
+        """
+        get the result of the last requested search
+
+        :param timeout:     max time (seconds) to wait for the result
+        :return:            matched TLDR pages (see TLDRParser.find_match_command) or None if the result is not
+                            available yet
+        """
+        with self.condition:
+            if self.result is None and timeout > 0:
+                self.condition.wait_for(lambda: self.result is not None, timeout)
+            result = self.result
+            self.result = None
+            return result
+
+    def get_partial_result(self):
+        """
+        get the best matches found so far by the running search
+
+        :return:    matched TLDR pages sorted by weight or None if no new partial result is available
+        """
+        with self.condition:
+            partial_result = self.partial_result
+            self.partial_result = None
+            return partial_result
+
+    def get_search_time(self):
+        """
+        :return:    execution time (seconds) of the last received search or None if no search has been completed
+        """
+        return self.search_time
+
+    def has_been_stopped(self) -> bool:
+        """
+        called by the parser while the search is running
+
+        :return:    True if the running search has been replaced by a new request or the thread has been stopped
+        """
+        return self.stopped or self.running_request_id != self.last_request_id
+
+    def set_partial_result_tldr_options(self, partial_result_tldr_options: list):
+        """
+        called by the parser while the search is running
+
+        :param partial_result_tldr_options: best matches found so far
+        :return:
+        """
+        with self.condition:
+            if self.running_request_id == self.last_request_id:
+                self.partial_result = partial_result_tldr_options
+
+    def stop(self):
+        """
+        stop the thread, any requested search is discarded
+
+        :return:
+        """
+        with self.condition:
+            self.stopped = True
+            self.request = None
+            self.condition.notify_all()
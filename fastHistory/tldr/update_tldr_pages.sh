@@ -21,7 +21,7 @@ echo "Last commit id: " $last_commit_id
 echo $current_date > tldr/last_update_date.txt
 echo $last_commit_id > tldr/last_tldr_commit.txt
 echo "Call python script"
-python3 -c "from tldrParser import TLDRParser; t=TLDRParser(); print(t.format_tldr_pages())"
+(cd ../.. && python3 -c "from fastHistory.tldr.tldrParser import TLDRParser; t=TLDRParser(); print(t.format_tldr_pages()); print(t.build_index()); print(t.build_corpus())")
 echo "Clean"
 rm -f -r tdlr_tmp
 echo "Done"
\ No newline at end of file
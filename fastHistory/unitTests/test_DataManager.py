@@ -41,6 +41,27 @@ class TestDataManager(unittest.TestCase):
         self.assertTrue(data_manager.delete_element("cmd2"))
         self.assertEqual(len(data_manager.get_data_from_db()), 0)
 
+    def test_filter_next_pages(self):
+        """
+        the pages retrieved after the last option of the previous page must match the result of a single search
+        """
+        data_manager = DataManager(self.output_test_path, self.TEST_DB_FILENAME)
+        for i in range(25):
+            self.assertTrue(data_manager.add_new_element("ls %d" % i, "desc%d" % (i % 2), ["tag%d" % (i % 3)]))
+            if i % 4 == 0:
+                self.assertTrue(data_manager.update_selected_element_order("ls %d" % (i // 2)))
+        for search, sort_by_frecency in [["ls", False], ["ls #tag1", False], ["@desc0", False], ["ls 1", False],
+                                         ["ls", True], ["ls #tag1", True]]:
+            data_manager.sort_by_frecency = sort_by_frecency
+            all_options = data_manager.filter(search, 100)
+            pages = data_manager.filter(search, 4)
+            while True:
+                next_page = data_manager.filter(search, 4, after_id=pages[-1][DataManager.OPTION.INDEX_ID])
+                if len(next_page) == 0:
+                    break
+                pages += next_page
+            self.assertEqual(pages, all_options, msg="different result with search: %s" % search)
+
     def test_update_element_order(self):
         data_manager = DataManager(self.output_test_path, self.TEST_DB_FILENAME)
         self.assertTrue(data_manager.add_new_element("cmd1", "desc1", ["tag1"]))
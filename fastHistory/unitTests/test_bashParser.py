@@ -1,10 +1,14 @@
 import logging
 import os
+import time
 
 import bashlex
 
 from unittest import TestCase
 from fastHistory.parser import bashParser
+from fastHistory.parser.bashParserPrefetchThread import BashParserPrefetchThread
+from fastHistory.parser.manPagesCache import ManPagesCache
+from fastHistory.parser.manParser import ManParser
 from fastHistory.unitTests.loggerTest import LoggerTest
 
 
@@ -69,3 +73,69 @@ class TestBashParser(TestCase):
             data = self.parser.load_data_for_info_from_man_page(res[0])
             self.assertNotEqual(data, None)
             self.assertEqual(data[0], res[1])
+
+    def test_parse_load_data_concurrently(self):
+        """
+        the man pages are loaded concurrently and each command is published as soon as its man page is loaded
+        """
+        cmd_text = "find . -name '*.py' | xargs grep -l foo | sort -u | uniq -c; ls -l"
+        partial_results = []
+        start_time = time.time()
+        data = bashParser.BashParser.load_data_for_info_from_man_page(cmd_text,
+                                                                      publish_partial_result=partial_results.append)
+        execution_time = time.time() - start_time
+        self.assertTrue(data[0])
+        cmds = [item[bashParser.BashParser.INDEX_CMD][bashParser.BashParser.INDEX_VALUE] for item in data[1]]
+        self.assertEqual(cmds, ["find", "xargs", "sort", "uniq", "ls"])
+        # one partial result for each command, the commands keep the order of the bash string
+        self.assertEqual(len(partial_results), len(cmds))
+        for i in range(len(partial_results)):
+            self.assertTrue(partial_results[i][0])
+            self.assertEqual(len(partial_results[i][1]), i + 1)
+            partial_cmds = [item[bashParser.BashParser.INDEX_CMD][bashParser.BashParser.INDEX_VALUE]
+                            for item in partial_results[i][1]]
+            self.assertEqual(partial_cmds, [cmd for cmd in cmds if cmd in partial_cmds])
+        self.assertEqual(partial_results[-1], data)
+
+        # same result of the sequential loading
+        max_workers = bashParser.BashParser.MAN_PAGES_MAX_WORKERS
+        bashParser.BashParser.MAN_PAGES_MAX_WORKERS = 1
+        try:
+            start_time = time.time()
+            data_sequential = bashParser.BashParser.load_data_for_info_from_man_page(cmd_text)
+            execution_time_sequential = time.time() - start_time
+        finally:
+            bashParser.BashParser.MAN_PAGES_MAX_WORKERS = max_workers
+        self.assertEqual(data_sequential, data)
+        logging.info("execution time: %s seconds (sequential: %s seconds)" % (execution_time, execution_time_sequential))
+
+    def test_parse_load_data_with_session_cache(self):
+        """
+        the parsers of a session share the same parsed man pages, each one stores them without losing the pages
+        parsed by the others
+        """
+        cache_folder = self.logger_test.get_test_folder()
+        cache_file = cache_folder + ManPagesCache.CACHE_FILE_NAME
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        man_pages_cache = ManParser.load_man_pages_cache(cache_folder)
+        prefetch_thread = BashParserPrefetchThread(cache_folder=cache_folder, man_pages_cache=man_pages_cache)
+        prefetch_thread.start()
+        try:
+            prefetch_thread.prefetch("ls -la")
+            bash_parser_thread = bashParser.BashParserThread("tar -xzf file.tar.gz", cache_folder=cache_folder,
+                                                             man_pages_cache=man_pages_cache)
+            bash_parser_thread.start()
+            bash_parser_thread.join()
+            start_time = time.time()
+            while prefetch_thread.get_result("ls -la") is None:
+                self.assertLess(time.time() - start_time, 10, msg="command not prefetched")
+                time.sleep(0.01)
+        finally:
+            prefetch_thread.stop()
+        stored_cache = ManPagesCache.load(cache_file)
+        for cmd in ["ls", "tar"]:
+            if ManParser().load_man_page(cmd):
+                self.assertIn(cmd, stored_cache.pages)
+            else:
+                logging.warning("warning! man page not found in your system: %s" % cmd)
@@ -0,0 +1,80 @@
+import logging
+import time
+import unittest
+
+from fastHistory.parser.bashParser import BashParser
+from fastHistory.parser.bashParserPrefetchThread import BashParserPrefetchThread
+from fastHistory.unitTests.loggerTest import LoggerTest
+
+
+class TestBashParserPrefetchThread(unittest.TestCase):
+
+    MAX_WAIT = 10
+
+    @classmethod
+    def setUpClass(cls):
+        cls.logger_test = LoggerTest()
+
+    def setUp(self):
+        self.logger_test.log_test_function_name(self.id())
+
+    def wait_result(self, prefetch_thread, cmd_text):
+        start_time = time.time()
+        result = prefetch_thread.get_result(cmd_text)
+        while result is None:
+            self.assertLess(time.time() - start_time, self.MAX_WAIT, msg="command not prefetched: %s" % cmd_text)
+            time.sleep(0.01)
+            result = prefetch_thread.get_result(cmd_text)
+        logging.info("prefetched in %s seconds: %s" % (time.time() - start_time, cmd_text))
+        return result
+
+    def test_same_result_of_parser(self):
+        prefetch_thread = BashParserPrefetchThread()
+        prefetch_thread.start()
+        try:
+            for cmd_text in ["ls -la", "find . | xargs grep -l foo | sort -u", "echo 'not closed"]:
+                prefetch_thread.prefetch(cmd_text)
+                self.assertEqual(self.wait_result(prefetch_thread, cmd_text),
+                                 BashParser.load_data_for_info_from_man_page(cmd_text), msg=cmd_text)
+            # the cached result is returned
+            self.assertEqual(prefetch_thread.get_result("ls -la"), BashParser.load_data_for_info_from_man_page("ls -la"))
+        finally:
+            prefetch_thread.stop()
+        prefetch_thread.join(self.MAX_WAIT)
+        self.assertFalse(prefetch_thread.is_alive())
+
+    def test_only_last_request(self):
+        """
+        the commands highlighted for less than the prefetch delay are not loaded
+        """
+        prefetch_thread = BashParserPrefetchThread()
+        prefetch_thread.start()
+        try:
+            cmd_texts = ["ls -a", "ls -l", "grep -r foo", "tar -xzf file.tar.gz", "sort -u"]
+            for cmd_text in cmd_texts:
+                prefetch_thread.prefetch(cmd_text)
+            self.wait_result(prefetch_thread, cmd_texts[-1])
+            self.assertEqual(list(prefetch_thread.results.keys()), cmd_texts[-1:])
+            # the request of a loaded command is ignored
+            prefetch_thread.prefetch(cmd_texts[-1])
+            self.assertIsNone(prefetch_thread.request)
+        finally:
+            prefetch_thread.stop()
+        prefetch_thread.join(self.MAX_WAIT)
+        self.assertFalse(prefetch_thread.is_alive())
+
+    def test_cache_size(self):
+        prefetch_thread = BashParserPrefetchThread()
+        for i in range(BashParserPrefetchThread.CACHE_SIZE):
+            prefetch_thread._put_result("cmd %d" % i, [True, []])
+        # the oldest result is removed
+        self.assertEqual(prefetch_thread.get_result("cmd 0"), [True, []])
+        prefetch_thread._put_result("cmd new", [True, []])
+        self.assertEqual(len(prefetch_thread.results), BashParserPrefetchThread.CACHE_SIZE)
+        self.assertIsNotNone(prefetch_thread.get_result("cmd 0"))
+        self.assertIsNone(prefetch_thread.get_result("cmd 1"))
+        self.assertIsNotNone(prefetch_thread.get_result("cmd new"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,8 @@ import unittest
 import logging
 import os
 import inspect
+import math
+import multiprocessing
 from fastHistory.database.databaseSQLite import DatabaseSQLite
 import sqlite3
 from datetime import datetime
@@ -10,6 +12,27 @@ from datetime import datetime
 from fastHistory.unitTests.loggerTest import LoggerTest
 
 
+def _concurrent_db_worker(path_data_folder, name_db_file, worker_id, number_of_commands, results):
+    """
+    simulate a terminal which opens the database for each command: even workers store new commands,
+    odd workers search and select the last used command
+
+    note: this function must be defined at module level to be used by a different process
+    """
+    failures = 0
+    for i in range(number_of_commands):
+        db = DatabaseSQLite(path_data_folder, name_db_file, None)
+        if worker_id % 2 == 0:
+            if not db.add_element("cmd_%d_%d" % (worker_id, i), "worker %d" % worker_id, ["stress"]):
+                failures += 1
+        else:
+            rows = db.get_last_n_filtered_elements(generic_filters=["cmd_"], n=10)
+            if len(rows) > 0 and not db.update_position_selected_element(rows[0][0]):
+                failures += 1
+        db.close()
+    results.put(failures)
+
+
 class TestDatabaseSQLite(unittest.TestCase):
 
     TEST_DB_FILENAME = "test_databaseSQLite.db"
@@ -42,6 +65,94 @@ class TestDatabaseSQLite(unittest.TestCase):
 
         db.close()
 
+    def test_search_index_same_result_as_like_search(self):
+        """
+        the search done with the full-text search index must return exactly the same rows as the LIKE search
+
+        :return:
+        """
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        if not db.search_index_enabled:
+            logging.warning("search index not supported by this SQLite version, test skipped")
+            db.close()
+            return
+        self.assertTrue(db.add_element("tar -xvzf file.tar.gz", "extract archive", ["untar", "archive"]))
+        self.assertTrue(db.add_element("ls -la", "list all files", ["list", "file"]))
+        self.assertTrue(db.add_element("git commit -m 'Fix'", "commit changes", ["git"]))
+        self.assertTrue(db.add_element("git log --oneline", "", ["git", "history"]))
+        self.assertTrue(db.add_element("Netstat -tulpn", "open ports", []))
+        self.assertTrue(db.add_element("find . -name \"*.tar\"", "search tar files", ["find"]))
+        for i in range(50):
+            self.assertTrue(db.add_element("echo %d" % i, "number %d" % i, ["tag%d" % (i % 7)]))
+
+        filters = [
+            # generic, description, tags
+            [["tar"], None, None],
+            [["ar", "file"], None, None],
+            [["file", "tar"], None, None],
+            [["netstat"], None, None],
+            [["archive"], None, ["untar"]],
+            [["git"], ["commit"], None],
+            [[""], [""], None],
+            [None, None, [""]],
+            [None, None, ["tag"]],
+            [None, None, ["tag1", "tag"]],
+            [["echo", "1"], ["number"], ["tag"]],
+            [["ls", "la"], None, None],
+            [["\"*.tar\""], None, None],
+            [["untarfile"], None, None],
+            [["git", "log", "one", "line"], None, None],
+            [["git", "log", "one", "line", "hist"], None, None],
+            # the LIKE wildcards are not matched literally
+            [["t_r"], None, None],
+            [["git%line"], None, None],
+            [None, ["commit_changes"], None],
+        ]
+        for f in filters:
+            db.search_index_enabled = True
+            res_index = db.get_last_n_filtered_elements(generic_filters=f[0], description_filters=f[1], tags_filters=f[2], n=100)
+            db.search_index_enabled = False
+            res_like = db.get_last_n_filtered_elements(generic_filters=f[0], description_filters=f[1], tags_filters=f[2], n=100)
+            self.assertEqual(res_index, res_like, msg="different result with filters: %s" % str(f))
+        res = db.get_last_n_filtered_elements(generic_filters=["-x_zf"], n=100)
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0][0], "tar -xvzf file.tar.gz")
+
+        db.close()
+
+    def test_search_index_in_sync(self):
+        """
+        the search index must follow any change of the stored commands
+
+        :return:
+        """
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        self.assertTrue(db.add_element("docker ps", "containers", ["docker"]))
+        self.assertTrue(db.update_command_field("docker ps", "docker ps -a"))
+        self.assertTrue(db.update_description_field("docker ps -a", "all containers"))
+        self.assertTrue(db.update_tags_field("docker ps -a", ["container"]))
+        self.assertTrue(db.update_position_selected_element("docker ps -a"))
+        self.assertEqual(len(db.get_last_n_filtered_elements(generic_filters=["docker ps -a"])), 1)
+        self.assertEqual(len(db.get_last_n_filtered_elements(description_filters=["all containers"])), 1)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["container"])), 1)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["docker"])), 0)
+        self.assertTrue(db.remove_element("docker ps -a"))
+        self.assertEqual(len(db.get_last_n_filtered_elements(generic_filters=["docker"])), 0)
+        db.close()
+
+        # a database without search index (e.g. from an older version) is indexed when opened
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME)
+        conn.execute("DROP TABLE history_fts")
+        for trigger in ["history_fts_insert", "history_fts_delete", "history_fts_update"]:
+            conn.execute("DROP TRIGGER %s" % trigger)
+        conn.execute("INSERT INTO history (command, description, tags, counter, date, synced) "
+                     "VALUES ('old command', 'old description', '', 0, 0, 0)")
+        conn.commit()
+        conn.close()
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None)
+        self.assertEqual(len(db.get_last_n_filtered_elements(generic_filters=["command"], description_filters=["old"])), 1)
+        db.close()
+
     def test_command_update(self):
         """
         test command edit feature with merging conflicts
@@ -212,6 +323,209 @@ class TestDatabaseSQLite(unittest.TestCase):
 
         db.close()
 
+    def test_search_by_tag_prefix(self):
+        """
+        a tag filter matches the tags which start with it (case insensitive), not any substring of the tags string
+        """
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        self.assertTrue(db.add_element("srm file", "", ["security", "Delete"]))
+        self.assertTrue(db.add_element("ls", "", ["list"]))
+
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["sec"])), 1)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["security"])), 1)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["delete", "sec"])), 1)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["curity"])), 0)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["securityǁdelete"])), 0)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["list", "sec"])), 0)
+        plan = db.cursor.execute("EXPLAIN QUERY PLAN SELECT command_id FROM history_tags "
+                                 "WHERE tag >= 'sec' AND tag < 'sec' || char(1114111)").fetchall()
+        self.assertIn("history_tags_tag", str(plan))
+        db.close()
+
+    def test_tags_table_in_sync(self):
+        """
+        the "history_tags" table must always contain the tags stored in the "history" table
+        """
+        def get_tags_from_history(database):
+            tags = set()
+            for row in database.cursor.execute("SELECT rowid, tags FROM history").fetchall():
+                for tag in database._tags_string_to_array(row[1]):
+                    tags.add((row[0], tag.lower()))
+            return tags
+
+        for upsert_supported in [True, False]:
+            db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+            db._UPSERT_SUPPORTED = upsert_supported and db._UPSERT_SUPPORTED
+            self.assertTrue(db.add_element("t1", "", ["a", "B"]))
+            self.assertTrue(db.add_element("t2", "", ["c"]))
+            self.assertTrue(db.add_element("t1", "", ["b", "d"]))
+            self.assertTrue(db.update_tags_field("t2", ["e"]))
+            self.assertTrue(db.add_element("t3", "", ["f"]))
+            self.assertTrue(db.update_command_field("t2", "t3"))
+            self.assertTrue(db.add_element("t4", "", None))
+            self.assertTrue(db.remove_element("t1"))
+            self.assertEqual(set(db.cursor.execute("SELECT command_id, tag FROM history_tags").fetchall()),
+                             get_tags_from_history(db))
+            self.assertEqual(db.get_last_n_filtered_elements(tags_filters=["f"])[0][2], ["e", "f"])
+            db.close()
+
+        # the table is filled when an old database is upgraded
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME)
+        conn.execute("DROP TABLE history_tags")
+        conn.execute("PRAGMA user_version = 2")
+        conn.commit()
+        conn.close()
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["e"])), 1)
+        self.assertEqual(set(db.cursor.execute("SELECT command_id, tag FROM history_tags").fetchall()),
+                         get_tags_from_history(db))
+        db.close()
+
+    def test_search_words_in_any_order(self):
+        """
+        every word must be found in the command, description or tags, in any order and without limit of words
+        """
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        self.assertTrue(db.add_element("docker run -it --rm ubuntu bash", "start temporary container", ["docker"]))
+        self.assertTrue(db.add_element("docker ps", "list containers", ["docker"]))
+
+        res = db.get_last_n_filtered_elements(generic_filters=["bash", "temporary", "rm", "ubuntu", "docker", "it"])
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0][0], "docker run -it --rm ubuntu bash")
+
+        res = db.get_last_n_filtered_elements(generic_filters=["bash", "temporary", "rm", "ubuntu", "docker", "ps"])
+        self.assertEqual(len(res), 0)
+
+        res = db.get_last_n_filtered_elements(generic_filters=["containers", "docker"],
+                                              description_filters=["containers", "list"])
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0][0], "docker ps")
+
+        db.close()
+
+    def test_add_element_merge_with_and_without_upsert(self):
+        """
+        the merge done with a single "upsert" query must give the same result as the old select + insert/update
+        """
+        results = []
+        for upsert_supported in [True, False]:
+            db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+            if upsert_supported and not db._UPSERT_SUPPORTED:
+                logging.warning("upsert not supported by this SQLite version")
+            db._UPSERT_SUPPORTED = upsert_supported and db._UPSERT_SUPPORTED
+            self.assertTrue(db.add_element("ls -la", "test1", ["security"], date=100))
+            self.assertTrue(db.add_element("srm", "", None, date=100))
+            self.assertTrue(db.add_element("ls -la", "test2", None, date=50))
+            self.assertTrue(db.add_element("ls -la", "test2", ["sec", "security"], date=200))
+            self.assertTrue(db.add_element("srm", "delete", [""], counter=3, date=150, imported=True))
+            self.assertTrue(db.add_element("  ls -la ", "", ["other"], date=120))
+            results.append(db.get_all_data())
+            db.close()
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0][-1], ("ls -la", "test1. test2. test2", "ǁsecurityǁsecǁother", 0, 200, 0))
+        self.assertEqual(results[0][0], ("srm", "delete", "", 0, 150, 0))
+
+    def test_upgrade_database_with_duplicated_commands(self):
+        """
+        databases created by older versions may contain duplicated commands
+        the upgrade merges them into the last used one and adds the unique index
+        """
+        if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME):
+            os.remove(self.output_test_path + self.TEST_DB_FILENAME)
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME)
+        conn.execute("CREATE TABLE history (command TEXT, description TEXT, tags TEXT, counter INTEGER, date INTEGER, synced TINYINT)")
+        conn.execute("INSERT INTO history VALUES ('ls', 'old', 'ǁfile', 1, 20, 0)")
+        conn.execute("INSERT INTO history VALUES ('ps', '', '', 1, 0, 0)")
+        conn.execute("INSERT INTO history VALUES ('ls', '', 'ǁlistǁfile', 3, 10, 0)")
+        conn.execute("INSERT INTO history VALUES ('ls', 'new', '', 2, 15, 0)")
+        conn.commit()
+        conn.close()
+
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None)
+        self.assertEqual(len(db.get_all_data()), 2)
+        self.assertEqual(db.get_column_field("ls", "description"), "old. new")
+        self.assertEqual(db.get_column_field("ls", "tags"), "ǁfileǁlist")
+        self.assertEqual(db.get_column_field("ls", "counter"), 6)
+        self.assertEqual(db.get_column_field("ls", "date"), 20)
+        self.assertEqual(len(db.get_last_n_filtered_elements(tags_filters=["list"])), 1)
+        self.assertTrue(db.add_element("ls", "list", None))
+        self.assertEqual(db.get_column_field("ls", "description"), "old. new. list")
+        self.assertEqual(db.get_all_data()[-1][DatabaseSQLite.COLUMN_INDEX_COMMAND], "ls")
+        self.assertRaises(sqlite3.IntegrityError, db.cursor.execute,
+                          "INSERT INTO history (command, description, tags, counter, date, synced) "
+                          "VALUES ('ps', '', '', 0, 0, 0)")
+        db.close()
+
+    def test_upgrade_database_error(self):
+        """
+        if the database cannot be upgraded, the changes are rolled back and the database is not opened
+        """
+        if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME):
+            os.remove(self.output_test_path + self.TEST_DB_FILENAME)
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME)
+        # the "date" column is needed by the last upgrade
+        conn.execute("CREATE TABLE history (command TEXT, description TEXT, tags TEXT, counter INTEGER, synced TINYINT, last_used INTEGER)")
+        conn.execute("INSERT INTO history VALUES ('ls', '', '', 1, 0, 1)")
+        conn.execute("PRAGMA user_version = 3")
+        conn.commit()
+        conn.close()
+
+        with self.assertRaises(sqlite3.DatabaseError) as context:
+            DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None)
+        self.assertIn("cannot be upgraded", str(context.exception))
+        self.assertIn("date", str(context.exception))
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME)
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 3)
+        columns = [column[1] for column in conn.execute("PRAGMA table_info('history')").fetchall()]
+        self.assertNotIn("frecency", columns)
+        conn.close()
+
+    def test_connection_settings(self):
+        """
+        the default pragmas are applied to each connection and they can be overwritten
+        """
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        self.assertEqual(db.cursor.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(db.cursor.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        db.close()
+
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None,
+                            connection_settings={"journal_mode": "DELETE", "busy_timeout": 100,
+                                                 "cache_size": "1; DROP TABLE history"})
+        self.assertEqual(db.cursor.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+        self.assertEqual(db.cursor.execute("PRAGMA busy_timeout").fetchone()[0], 100)
+        self.assertTrue(db.add_element("ls", "", None))
+        db.close()
+
+    def test_concurrent_processes(self):
+        """
+        multiple processes (terminals) read and write the database at the same time
+        no write must fail because of a locked database
+        """
+        number_of_workers = 6
+        number_of_commands = 30
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        db.close()
+
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_concurrent_db_worker,
+                                           args=(self.output_test_path, self.TEST_DB_FILENAME, worker_id,
+                                                 number_of_commands, results))
+                   for worker_id in range(number_of_workers)]
+        start_time = time.time()
+        for worker in workers:
+            worker.start()
+        failures = [results.get(timeout=60) for _ in workers]
+        for worker in workers:
+            worker.join()
+        logging.info("concurrent test executed in: %s seconds" % str(round(time.time() - start_time, 2)))
+
+        self.assertEqual(failures, [0] * number_of_workers)
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None)
+        self.assertEqual(len(db.get_all_data()), (number_of_workers // 2) * number_of_commands)
+        db.close()
+
     def test_fill_db_with_wrong_entries(self):
         """
         store same command multiple times with different description and tags
@@ -475,6 +789,92 @@ class TestDatabaseSQLite(unittest.TestCase):
         res = db.get_column_field("test4-existing-item", "rowid")
         self.assertEqual(int(res), item_local_rowid)
 
+    def test_import_database_type_2(self):
+        """
+        import a database created by the current version (with the "last_used" column)
+        the imported commands must keep the same order of use
+
+        :return:
+        """
+        if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME_OLD):
+            os.remove(self.output_test_path + self.TEST_DB_FILENAME_OLD)
+        db_old = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME_OLD, None)
+        for cmd in ["cmd1", "cmd2", "cmd3"]:
+            self.assertTrue(db_old.add_element(cmd, "", None))
+        self.assertTrue(db_old.update_position_selected_element("cmd1"))
+        db_old.close()
+
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        self.assertTrue(db.add_element("local", "", None))
+        self.assertEqual(db.import_external_database(self.output_test_path + self.TEST_DB_FILENAME_OLD), 3)
+        res = db.get_last_n_filtered_elements()
+        self.assertEqual([row[0] for row in res], ["cmd1", "cmd3", "cmd2", "local"])
+        self.assertEqual(db.get_column_field("cmd1", "counter"), 1)
+        db.close()
+
+    def test_import_large_database(self):
+        """
+        import a database with 30000 rows (type 1) with a single transaction
+
+        :return:
+        """
+        if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME_OLD):
+            os.remove(self.output_test_path + self.TEST_DB_FILENAME_OLD)
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME_OLD)
+        conn.execute("CREATE TABLE history (command TEXT, description TEXT, tags TEXT, counter INTEGER, date INTEGER, synced TINYINT)")
+        rows = [("cmd %d" % i, "desc %d" % i, "ǁtag%d" % (i % 10), i % 5, 1551202801 + i, 0) for i in range(30000)]
+        # the same command found twice in the imported database is merged
+        rows.append(("cmd 1", "desc new", "ǁtag-new", 9, 1551202800, 0))
+        conn.executemany("INSERT INTO history VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+        results = []
+        for upsert_supported in [True, False]:
+            db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, [], delete_all_data_from_db=True)
+            db._UPSERT_SUPPORTED = upsert_supported and db._UPSERT_SUPPORTED
+            self.assertTrue(db.add_element("cmd 2", "local", ["local"], 7, date=1551202920))
+            progress = []
+            tick = time.time()
+            result_import = db.import_external_database(self.output_test_path + self.TEST_DB_FILENAME_OLD,
+                                                        progress_callback=progress.append)
+            execution_time = time.time() - tick
+            logging.info("import time (upsert: %s): %s seconds" % (upsert_supported, execution_time))
+            self.assertEqual(result_import, 30001)
+            self.assertEqual(progress, [5000, 10000, 15000, 20000, 25000, 30000, 30001])
+            self.assertLess(execution_time, 10)
+            self.assertEqual(len(db.get_all_data()), 30000)
+            self.assertEqual(db.get_column_field("cmd 1", "description"), "desc 1. desc new")
+            self.assertEqual(db.get_column_field("cmd 1", "tags"), "ǁtag1ǁtag-new")
+            self.assertEqual(db.get_column_field("cmd 1", "counter"), 1)
+            self.assertEqual(db.get_column_field("cmd 2", "description"), "local. desc 2")
+            self.assertEqual(db.get_column_field("cmd 2", "counter"), 7)
+            self.assertEqual(db.get_column_field("cmd 2", "date"), 1551202920)
+            results.append(db.get_all_data())
+            db.close()
+        self.assertEqual(results[0], results[1])
+
+    def test_import_database_with_invalid_rows(self):
+        """
+        if a row cannot be imported nothing is imported
+
+        :return:
+        """
+        if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME_OLD):
+            os.remove(self.output_test_path + self.TEST_DB_FILENAME_OLD)
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME_OLD)
+        conn.execute("CREATE TABLE history (command TEXT, description TEXT, tags TEXT, counter INTEGER, date INTEGER, synced TINYINT)")
+        conn.execute("INSERT INTO history VALUES ('valid', 'desc', '', 0, 0, 0)")
+        conn.execute("INSERT INTO history VALUES ('invalid', 'desc with @', '', 0, 0, 0)")
+        conn.commit()
+        conn.close()
+
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, [], delete_all_data_from_db=True)
+        self.assertTrue(db.add_element("local", "", None))
+        self.assertEqual(db.import_external_database(self.output_test_path + self.TEST_DB_FILENAME_OLD), -1)
+        self.assertEqual(len(db.get_all_data()), 1)
+        db.close()
+
     def test_import_not_existing_database(self):
         # clean test directory
         if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME_OLD):
@@ -522,6 +922,102 @@ class TestDatabaseSQLite(unittest.TestCase):
         self.assertEqual(len(res), 3)
         self.assertEqual(res[-1][DatabaseSQLite.COLUMN_INDEX_COMMAND], "ls 1")
         self.assertEqual(res[2][DatabaseSQLite.COLUMN_INDEX_COUNTER], 1)
+        # the row is updated in place
+        self.assertEqual(db.get_column_field("ls 1", "rowid"), 1)
+        self.assertEqual(db.get_last_n_filtered_elements(generic_filters=["ls"])[0][0], "ls 1")
+        db.close()
+
+    def test_sort_by_frecency(self):
+        """
+        with the frecency order the commands used often and recently are shown first
+        """
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        now = db._get_time_now()
+        old_date = now - 10 * db._FRECENCY_HALF_LIFE
+        self.assertTrue(db.add_element("old", "", None, counter=100, date=old_date, imported=True))
+        self.assertTrue(db.add_element("daily", "", None))
+        for i in range(5):
+            self.assertTrue(db.update_position_selected_element("daily"))
+        self.assertTrue(db.add_element("rare", "", None))
+
+        res = db.get_last_n_filtered_elements()
+        self.assertEqual([row[0] for row in res], ["rare", "daily", "old"])
+        res = db.get_last_n_filtered_elements(sort_by_frecency=True)
+        self.assertEqual([row[0] for row in res], ["daily", "rare", "old"])
+
+        # the stored value is log2 of the sum of the uses: log2(6 * 2 ^ (now / half_life))
+        self.assertAlmostEqual(db.get_column_field("daily", "frecency"),
+                               math.log2(6) + now / db._FRECENCY_HALF_LIFE, delta=0.01)
+        # a use 10 half-lives old is worth 2 ^ -10 uses of today
+        self.assertAlmostEqual(db._add_frecency_use(db._get_frecency(0, old_date), now),
+                               math.log2(1 + 2 ** -10) + now / db._FRECENCY_HALF_LIFE)
+
+        # next pages
+        pages = db.get_last_n_filtered_elements(n=1, sort_by_frecency=True)
+        while True:
+            next_page = db.get_last_n_filtered_elements(n=1, after_id=pages[-1][3], sort_by_frecency=True)
+            if len(next_page) == 0:
+                break
+            pages += next_page
+        self.assertEqual(pages, res)
+        db.close()
+
+    def test_sort_by_frecency_time(self):
+        """
+        the first page sorted by frecency must be retrieved with an index (no sort of the entire table)
+        expected time with 100k commands: < 0.01 seconds
+        """
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None, delete_all_data_from_db=True)
+        now = db._get_time_now()
+        rows = []
+        for i in range(100000):
+            date = now - (i * 7919 % 100000) * 60
+            counter = i % 13
+            rows.append(("cmd %d" % i, "", "ǁtag%d" % (i % 50), counter, date, 0, i + 1, db._get_frecency(counter, date)))
+        db.cursor.executemany("INSERT INTO history "
+                              "(command, description, tags, counter, date, synced, last_used, frecency) "
+                              "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        db.save_changes()
+
+        execution_times = []
+        for i in range(5):
+            start_time = time.time()
+            res = db.get_last_n_filtered_elements(n=50, sort_by_frecency=True)
+            res += db.get_last_n_filtered_elements(n=50, after_id=res[-1][3], sort_by_frecency=True)
+            execution_times.append(time.time() - start_time)
+        execution_time = sorted(execution_times)[len(execution_times) // 2]
+        logging.info("execution_time: %s seconds" % execution_time)
+
+        self.assertEqual(len(res), 100)
+        self.assertEqual(res, sorted(res, key=lambda row: row[3], reverse=True))
+        self.assertTrue(execution_time < 0.01, msg="execution takes too long: %s sec" % execution_time)
+        db.close()
+
+    def test_upgrade_database_to_last_used_order(self):
+        """
+        databases created by older versions define the order of use with the rowid
+        the upgrade must keep the same order with the new "last_used" column
+        """
+        if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME):
+            os.remove(self.output_test_path + self.TEST_DB_FILENAME)
+        conn = sqlite3.connect(self.output_test_path + self.TEST_DB_FILENAME)
+        conn.execute("CREATE TABLE history (command TEXT, description TEXT, tags TEXT, counter INTEGER, date INTEGER, synced TINYINT)")
+        for i in range(5):
+            conn.execute("INSERT INTO history VALUES (?, '', '', 0, 0, 0)", ("ls %d" % i,))
+        conn.commit()
+        conn.close()
+
+        db = DatabaseSQLite(self.output_test_path, self.TEST_DB_FILENAME, None)
+        res = db.get_last_n_filtered_elements(generic_filters=["ls"])
+        self.assertEqual([row[0] for row in res], ["ls 4", "ls 3", "ls 2", "ls 1", "ls 0"])
+        self.assertTrue(db.update_position_selected_element("ls 2"))
+        self.assertTrue(db.add_element("ls 0", "again", None))
+        res = db.get_last_n_filtered_elements(generic_filters=["ls"])
+        self.assertEqual([row[0] for row in res], ["ls 0", "ls 2", "ls 4", "ls 3", "ls 1"])
+        # the search index is still in sync
+        self.assertEqual(len(db.get_last_n_filtered_elements(generic_filters=["again"])), 1)
+        plan = db.cursor.execute("EXPLAIN QUERY PLAN SELECT command FROM history ORDER BY last_used DESC").fetchall()
+        self.assertIn("history_last_used", str(plan))
         db.close()
 
     def test_remove_element(self):
@@ -0,0 +1,165 @@
+import gzip
+import logging
+import os
+import shutil
+import time
+from unittest import TestCase
+
+from fastHistory.parser.manPageIndex import ManPageIndex
+from fastHistory.parser.manPageReader import ManPageReader, ManPageRenderer
+from fastHistory.parser.manParser import ManParser
+from fastHistory.unitTests.loggerTest import LoggerTest
+
+
+class TestManPageReader(TestCase):
+    """
+    test class for the reader of the man page sources
+    """
+
+    MAN_PAGE_SOURCE = "\n".join([
+        ".\\\" comment",
+        ".TH TEST 1",
+        ".de XX",
+        ".SH IGNORED",
+        "..",
+        ".ie n \\{\\",
+        ".  if t \\{\\",
+        "ignored",
+        ".  \\}",
+        ".\\}",
+        ".el .ds Aq '",
+        ".SH NAME",
+        "test \\- test the \\fBreader\\fR",
+        ".SH OPTIONS",
+        ".TP",
+        ".B \\-a",
+        "short tag",
+        ".TP",
+        "\\fB\\-b\\fR, \\fB\\-\\-bold\\fR=\\fIVALUE\\fR",
+        "long tag, the text is long enough to be wrapped in the next row because it is longer than the line",
+        ".IP \"\\fB\\-q\\fR\" 4",
+        ".PD 0",
+        ".IP \"\\fB\\-\\-quiet\\fR\" 4",
+        ".PD",
+        "no output, don\\*(Aqt show \\(lqanything\\(rq",
+        ".SS Subtitle",
+        ".TP",
+        ".BR \\-c \" FILE\"",
+        ".RS",
+        "first",
+        ".br",
+        "second",
+        ".RE",
+        ".SH \"SEE ALSO\"",
+        ".BR ls (1)",
+        ""
+    ])
+
+    MAN_PAGE_RENDERED = "\n".join([
+        "NAME",
+        "       test - test the reader",
+        "",
+        "OPTIONS",
+        "       -a     short tag",
+        "",
+        "       -b, --bold=VALUE",
+        "              long tag, the text is long enough to be wrapped in the next row",
+        "              because it is longer than the line",
+        "",
+        "       -q",
+        "       --quiet",
+        "           no output, don't show \"anything\"",
+        "",
+        "   Subtitle",
+        "       -c FILE",
+        "              first",
+        "              second",
+        "",
+        "SEE ALSO",
+        "       ls(1)",
+        "",
+        ""
+    ])
+
+    @classmethod
+    def setUpClass(cls):
+        cls.logger_test = LoggerTest()
+
+    def setUp(self):
+        self.logger_test.log_test_function_name(self.id())
+
+    def get_man_path(self):
+        """
+        create a man path folder with the test pages:
+            - "test": the test page (gzip)
+            - "test-link": page which includes the test page
+            - "mdoc": page which uses the mdoc macros (not supported)
+
+        :return:    man path folder
+        """
+        man_path = self.logger_test.get_test_folder() + "man/"
+        if os.path.exists(man_path):
+            shutil.rmtree(man_path)
+        os.makedirs(man_path + "man1")
+        with gzip.open(man_path + "man1/test.1.gz", "wt") as f:
+            f.write(self.MAN_PAGE_SOURCE)
+        with open(man_path + "man1/test-link.1", "w") as f:
+            f.write(".so man1/test.1\n")
+        with open(man_path + "man1/mdoc.1", "w") as f:
+            f.write(".Dd January 1, 2020\n.Dt MDOC 1\n.Sh NAME\n.Nm mdoc\n.Nd test\n")
+        return man_path
+
+    def test_render(self):
+        self.assertEqual(ManPageRenderer().render(self.MAN_PAGE_SOURCE), self.MAN_PAGE_RENDERED)
+
+        # the rendered page can be parsed as the output of the man command
+        parser = ManParser()
+        parser.man_page = self.MAN_PAGE_RENDERED
+        self.assertEqual(parser.get_cmd_meaning(), [(True, "test the reader")])
+        index = ManPageIndex(self.MAN_PAGE_RENDERED)
+        self.assertEqual(index.get_flag_meaning("-a"), [(True, "-a     short tag")])
+        self.assertEqual(index.get_flag_meaning("--bold"),
+                         [(True, "-b, --bold=VALUE"),
+                          (False, "long tag, the text is long enough to be wrapped in the next row"),
+                          (False, "because it is longer than the line")])
+        self.assertEqual(index.get_flag_meaning("--quiet"),
+                         [(True, "-q"), (True, "--quiet"), (False, "no output, don't show \"anything\"")])
+
+    def test_read_man_page(self):
+        man_path = self.get_man_path()
+        reader = ManPageReader(man_path=man_path, path="")
+        self.assertEqual(reader.man_path_folders, [os.path.realpath(man_path)])
+
+        source_path = reader.find_man_page_source("test")
+        self.assertEqual(source_path, os.path.realpath(man_path) + "/man1/test.1.gz")
+        self.assertEqual(reader.read_man_page(source_path), self.MAN_PAGE_RENDERED)
+        # the included page is read
+        self.assertEqual(reader.read_man_page(reader.find_man_page_source("test-link")), self.MAN_PAGE_RENDERED)
+        # the page must be rendered by the man command
+        self.assertIsNotNone(reader.find_man_page_source("mdoc"))
+        self.assertIsNone(reader.read_man_page(reader.find_man_page_source("mdoc")))
+        self.assertIsNone(reader.find_man_page_source("not-found"))
+
+        # an empty item is replaced with the default folders
+        reader = ManPageReader(man_path=man_path + ":", path="")
+        self.assertEqual(reader.man_path_folders[0], os.path.realpath(man_path))
+        self.assertGreaterEqual(len(reader.man_path_folders), 1)
+
+    def test_read_man_page_time(self):
+        """
+        read the system man pages without executing the man command
+        """
+        reader = ManPageReader()
+        for cmd in ["ls", "tar", "grep", "bash"]:
+            source_path = reader.find_man_page_source(cmd)
+            if source_path is None:
+                logging.warning("warning! man page not found in your system: %s" % cmd)
+                continue
+            start_time = time.time()
+            man_page = reader.read_man_page(source_path)
+            execution_time = time.time() - start_time
+            logging.info("%s: %s seconds" % (cmd, execution_time))
+            self.assertIsNotNone(man_page)
+            parser = ManParser()
+            parser.man_page = man_page
+            self.assertTrue(parser.get_cmd_meaning())
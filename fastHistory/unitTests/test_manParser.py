@@ -1,10 +1,14 @@
 import inspect
 import logging
+import re
 import sys
+import time
 from unittest import TestCase
 
 import os
 
+from fastHistory.parser.manPageIndex import ManPageIndex
+from fastHistory.parser.manPagesCache import ManPagesCache
 from fastHistory.parser.manParser import ManParser
 from fastHistory.unitTests.loggerTest import LoggerTest
 
@@ -51,6 +55,185 @@ class TestManParser(TestCase):
             else:
                 self.assertIsNone(meaning)
 
+        # a command without man page is not searched again
+        self.assertIn("non-existing-cmd", ManParser._man_pages_not_found)
+        start_time = time.time()
+        self.assertFalse(parser.load_man_page("non-existing-cmd"))
+        self.assertLess(time.time() - start_time, 0.01)
+
+    def test_man_pages_cache(self):
+        """
+        the parsed man pages must be stored and invalidated when the man page source changes
+        :return:
+        """
+        cache_file = self.logger_test.get_test_folder() + ManPagesCache.CACHE_FILE_NAME
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        self.assertIsNone(ManPagesCache.load(cache_file))
+
+        man_pages_cache = ManPagesCache()
+        meaning = [(True, "list directory contents")]
+        page = man_pages_cache.set_page("ls", "/usr/share/man/man1/ls.1.gz", 1.5, meaning)
+        man_pages_cache.set_flag_meaning(page, "-a", [(True, "-a, --all"), (False, "do not ignore entries")])
+        man_pages_cache.set_flag_meaning(page, "-Z", None)
+        self.assertTrue(man_pages_cache.save(cache_file))
+        self.assertFalse(man_pages_cache.changed)
+
+        man_pages_cache = ManPagesCache.load(cache_file)
+        self.assertIsNotNone(man_pages_cache)
+        page = man_pages_cache.get_page("ls", "/usr/share/man/man1/ls.1.gz", 1.5)
+        self.assertIsNotNone(page)
+        self.assertEqual(ManParser._get_meaning_rows(page[ManPagesCache.INDEX_PAGE_MEANING]), meaning)
+        self.assertEqual(ManParser._get_meaning_rows(page[ManPagesCache.INDEX_PAGE_FLAGS]["-a"]),
+                         [(True, "-a, --all"), (False, "do not ignore entries")])
+        self.assertIsNone(page[ManPagesCache.INDEX_PAGE_FLAGS]["-Z"])
+        # the man page has been updated or moved
+        self.assertIsNone(man_pages_cache.get_page("ls", "/usr/share/man/man1/ls.1.gz", 2.5))
+        self.assertIsNone(man_pages_cache.get_page("ls", "/usr/local/share/man/man1/ls.1.gz", 1.5))
+        self.assertIsNone(man_pages_cache.get_page("tar", "/usr/share/man/man1/ls.1.gz", 1.5))
+
+        # the oldest commands are removed
+        for i in range(ManPagesCache.CACHE_MAX_PAGES):
+            man_pages_cache.set_page("cmd%d" % i, "/cmd%d.1.gz" % i, 1.0, None)
+        self.assertEqual(len(man_pages_cache.pages), ManPagesCache.CACHE_MAX_PAGES)
+        self.assertIsNone(man_pages_cache.get_page("ls", "/usr/share/man/man1/ls.1.gz", 1.5))
+        self.assertIsNotNone(man_pages_cache.get_page("cmd0", "/cmd0.1.gz", 1.0))
+
+    def test_load_man_page_from_cache(self):
+        """
+        the second time a command is loaded with the cache, the man page is not rendered
+        :return:
+        """
+        cache_folder = self.logger_test.get_test_folder()
+        if os.path.exists(cache_folder + ManPagesCache.CACHE_FILE_NAME):
+            os.remove(cache_folder + ManPagesCache.CACHE_FILE_NAME)
+        parser = ManParser(cache_folder)
+        self.assertTrue(parser.load_man_page("tar"))
+        meaning = parser.get_cmd_meaning()
+        flag_meaning = parser.get_flag_meaning("-v")
+        self.assertIsNotNone(meaning)
+        self.assertTrue(parser.store_cache())
+
+        parser = ManParser(cache_folder)
+        self.assertTrue(parser.load_man_page("tar"))
+        self.assertIsNone(parser.man_page)
+        self.assertEqual(parser.get_cmd_meaning(), meaning)
+        self.assertEqual(parser.get_flag_meaning("-v"), flag_meaning)
+        self.assertIsNone(parser.man_page)
+        # a new flag requires the man page
+        parser_no_cache = ManParser()
+        self.assertTrue(parser_no_cache.load_man_page("tar"))
+        self.assertEqual(parser.get_flag_meaning("-f"), parser_no_cache.get_flag_meaning("-f"))
+        self.assertIsNotNone(parser.man_page)
+
+    @staticmethod
+    def get_flag_meaning_with_regex(man_page, flag):
+        """
+        search the flag with the regex used before ManPageIndex
+        """
+        result = re.search(ManParser._regexp_flag % flag, man_page, re.MULTILINE)
+        if result is None:
+            return None
+        final_result = []
+        first = True
+        for row in result.group(2).split("\n"):
+            row = row.strip()
+            if len(row) > 0:
+                if first:
+                    if flag in row:
+                        first = False
+                    final_result.append((True, row))
+                else:
+                    final_result.append((False, row))
+        return final_result
+
+    @staticmethod
+    def get_generated_man_page(options_count, with_empty_lines=True):
+        """
+        :param options_count:       number of flags
+        :param with_empty_lines:    if False the descriptions are not separated by an empty line
+        :return:                    man page with the given number of flags
+        """
+        rows = ["NAME", "       generated - generated man page", "", "OPTIONS"]
+        for i in range(options_count):
+            rows.append("       -o%d, --option%d=VALUE" % (i, i))
+            rows.append("              description of the option %d (-o%d), first line" % (i, i))
+            rows.append("              second line")
+            if with_empty_lines:
+                rows.append("")
+        if with_empty_lines:
+            rows.append("   Subcategory")
+            rows.append("       -q")
+            rows.append("       --quiet   no output; see -v")
+            rows.append("")
+        rows.append("SEE ALSO")
+        return "\n".join(rows) + "\n"
+
+    def test_flag_index(self):
+        """
+        the index must find the same flags of the regex
+        :return:
+        """
+        test_flags = ["-o0", "--option0", "-o1", "--option1", "-o19", "--option19", "-o", "--option", "-o20",
+                      "-q", "--quiet", "-v", "-", "--"]
+        man_pages = [self.get_generated_man_page(20), self.get_generated_man_page(2, with_empty_lines=False)]
+        for cmd in ["tar", "ls", "wget", "netstat", "nmap"]:
+            parser = ManParser()
+            if parser.load_man_page(cmd):
+                man_pages.append(parser.get_man_page())
+            else:
+                logging.warning("warning! program not found in your system: %s" % cmd)
+        for man_page in man_pages:
+            index = ManPageIndex(man_page)
+            flags = test_flags + list(index.flags.keys())
+            for flag in flags:
+                # the regex does not escape the flag (e.g. "-?")
+                if re.escape(flag) != flag.replace("-", "\\-"):
+                    continue
+                self.assertEqual(index.get_flag_meaning(flag), self.get_flag_meaning_with_regex(man_page, flag),
+                                 msg=flag)
+        self.assertEqual(ManPageIndex(man_pages[0]).get_flag_meaning("--option3"),
+                         [(True, "-o3, --option3=VALUE"), (False, "description of the option 3 (-o3), first line"),
+                          (False, "second line")])
+        self.assertEqual(ManPageIndex(man_pages[0]).get_flag_meaning("--quiet"),
+                         [(True, "-q"), (True, "--quiet   no output; see -v")])
+
+    def test_flag_index_time(self):
+        """
+        benchmark of the regex and of the index: the regex is executed for each flag and it can backtrack badly when
+        a description is not followed by an empty line, the index is built once for all the flags
+        :return:
+        """
+        options_count = 2000
+        man_pages = [["generated (%d options)" % options_count, self.get_generated_man_page(options_count),
+                      ["--option%d" % i for i in range(0, options_count, 40)], True],
+                     ["generated without empty lines (2 options)",
+                      self.get_generated_man_page(2, with_empty_lines=False), ["-o0", "--option0", "-o1", "--option1"],
+                      True]]
+        for cmd in ["bash", "gcc"]:
+            parser = ManParser()
+            if parser.load_man_page(cmd):
+                man_page = parser.get_man_page()
+                # the real man pages can be too small to compare the execution times
+                man_pages.append([cmd, man_page, list(ManPageIndex(man_page).flags.keys())[::10], False])
+            else:
+                logging.warning("warning! program not found in your system: %s" % cmd)
+        for name, man_page, flags, check_time in man_pages:
+            flags = flags + ["--not-found"]
+            start_time = time.time()
+            for flag in flags:
+                self.get_flag_meaning_with_regex(man_page, flag)
+            execution_time_regex = time.time() - start_time
+            start_time = time.time()
+            index = ManPageIndex(man_page)
+            for flag in flags:
+                index.get_flag_meaning(flag)
+            execution_time_index = time.time() - start_time
+            logging.info("%s, %d flags: regex %s seconds, index %s seconds" %
+                         (name, len(flags), execution_time_regex, execution_time_index))
+            if check_time:
+                self.assertLess(execution_time_index, execution_time_regex, msg=name)
+
     def test_get_cmd_meaning(self):
         parser = ManParser()
 
@@ -0,0 +1,96 @@
+import os
+import unittest
+
+from fastHistory import DataManager
+from fastHistory.database.searchThread import SearchThread
+from fastHistory.unitTests.loggerTest import LoggerTest
+
+
+class TestSearchThread(unittest.TestCase):
+
+    TEST_DB_FILENAME = "test_databaseSQLiteSearchThread.db"
+    MAX_WAIT = 10
+
+    @classmethod
+    def setUpClass(cls):
+        cls.logger_test = LoggerTest()
+        cls.output_test_path = cls.logger_test.get_test_folder()
+
+    def setUp(self):
+        self.logger_test.log_test_function_name(self.id())
+        if os.path.exists(self.output_test_path + self.TEST_DB_FILENAME):
+            os.remove(self.output_test_path + self.TEST_DB_FILENAME)
+        self.data_manager = DataManager(self.output_test_path, self.TEST_DB_FILENAME)
+        for i in range(30):
+            self.assertTrue(self.data_manager.add_new_element("ls %d" % i, "desc%d" % (i % 2), ["tag%d" % (i % 3)]))
+
+    def tearDown(self):
+        self.data_manager.close()
+
+    def test_same_result_of_data_manager(self):
+        search_thread = SearchThread(self.data_manager)
+        search_thread.start()
+        try:
+            for search in ["ls", "ls 1", "#tag1", "@desc0", "no-match"]:
+                search_thread.search(search, 10)
+                self.assertEqual(search_thread.get_result(timeout=self.MAX_WAIT), self.data_manager.filter(search, 10))
+            after_id = self.data_manager.filter("ls", 10)[-1][DataManager.OPTION.INDEX_ID]
+            search_thread.search("ls", 10, after_id=after_id)
+            self.assertEqual(search_thread.get_result(timeout=self.MAX_WAIT),
+                             self.data_manager.filter("ls", 10, after_id=after_id))
+        finally:
+            search_thread.stop()
+        search_thread.join(self.MAX_WAIT)
+        self.assertFalse(search_thread.is_alive())
+
+    def test_only_last_request(self):
+        """
+        only the result of the last requested search is returned, the older ones are discarded
+        """
+        search_thread = SearchThread(self.data_manager)
+        search_thread.start()
+        try:
+            for search in ["l", "ls", "ls ", "ls 2"]:
+                search_thread.search(search, 100)
+            result = search_thread.get_result(timeout=self.MAX_WAIT)
+            self.assertEqual(result, self.data_manager.filter("ls 2", 100))
+            # the result is returned only once
+            self.assertIsNone(search_thread.get_result())
+
+            search_thread.search("ls", 100)
+            search_thread.cancel()
+            self.assertIsNone(search_thread.get_result(timeout=0.2))
+        finally:
+            search_thread.stop()
+        search_thread.join(self.MAX_WAIT)
+        self.assertFalse(search_thread.is_alive())
+
+    def test_search_error(self):
+        """
+        a failed search returns False instead of an empty result
+        """
+        search_thread = SearchThread(self.data_manager)
+        search_thread.start()
+        try:
+            search_thread.search("ls", 10)
+            self.assertEqual(len(search_thread.get_result(timeout=self.MAX_WAIT)), 10)
+            self.data_manager.database.cursor.execute("ALTER TABLE history RENAME TO history_renamed")
+            self.data_manager.database.save_changes()
+            search_thread.search("ls", 10)
+            self.assertIs(search_thread.get_result(timeout=self.MAX_WAIT), False)
+        finally:
+            search_thread.stop()
+        search_thread.join(self.MAX_WAIT)
+        self.assertFalse(search_thread.is_alive())
+
+    def test_update_search_filters(self):
+        self.data_manager.update_search_filters("ls #tag1 @desc1")
+        self.assertEqual(self.data_manager.get_search_filters().get_description_str(), "desc1")
+        self.assertEqual(self.data_manager.get_search_filters().get_tags(strict=True), ["tag1"])
+        self.data_manager.update_search_filters("")
+        self.assertEqual(self.data_manager.get_search_filters().get_description_str(), None)
+        self.assertEqual(self.data_manager.get_search_filters().get_tags(strict=True), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,14 @@
+import difflib
 import logging
+import os
 import time
 from unittest import TestCase
 
 from fastHistory.parser.InputData import InputData
 from fastHistory.parser.inputParser import InputParser
+from fastHistory.tldr.tldrIndex import TLDRIndex
 from fastHistory.tldr.tldrParser import TLDRParser, ParsedTLDRExample
-from fastHistory.tldr.tldrParserThread import TLDRParseThread
+from fastHistory.tldr.tldrPagesCache import TLDRPagesCache
 from fastHistory.unitTests.loggerTest import LoggerTest
 
 
@@ -128,41 +131,209 @@ class TestTLDRParser(TestCase):
             logging.info("execution_time: %s seconds" % execution_time)
             self.assertTrue(execution_time < 0.5, msg="execution takes too long: %s sec" % execution_time)
 
-    def test_TLDR_search_with_simulated_manual_input(self):
+    def test_TLDR_index_search(self):
         """
-        note:
-            without "thread.has_been_stopped()" check ->  >= 3 seconds
-            with "thread.has_been_stopped()" check at fnames level -> 0.9 seconds
-            with "thread.has_been_stopped()" check at line level -> 0.85 seconds
+        the search with the index must find the same commands (with the same weight) of the search which scans
+        all the pages
+        note: the commands with the same weight may have a different order
         :return:
         """
+        searcher_scan = TLDRParser(use_index=False)
+        searcher_index = TLDRParser()
+        self.assertIsNotNone(searcher_index._get_index(), msg="TLDR index not found or outdated, run 'build_index'")
 
-        test_strings = [
-            "open port listen",
-            "a fi le file ile"
-        ]
-
+        test_strings = ["", "randomstringwithnomatch", "tar", "list file permission", "extract file gz",
+                        "a fi le file ile", "git diff", "open port listen", "e"]
         for test in test_strings:
+            input_data = InputData(False, test, test.split(" "))
+            results_scan = searcher_scan.find_match_command(input_data)
+            results_index = searcher_index.find_match_command(input_data)
+            self.assertEqual(sorted([[-item[0], item[1], item[2]] for item in results_scan]),
+                             sorted([[-item[0], item[1], item[2]] for item in results_index]),
+                             msg="different results: %s" % test)
+            self.assertEqual([item[0] for item in results_scan], [item[0] for item in results_index],
+                             msg="different order: %s" % test)
+
+    def test_TLDR_index_search_time(self):
+        """
+        benchmark of the two search engines (scan of all the pages and index) on the bundled pages
+        :return:
+        """
+        test_strings = ["tar", "open port listen", "extract file gz", "randomstringwithnomatch",
+                        "list file permission", "scan network", "git diff", "download file"]
+        execution_times = {}
+        for use_index in [False, True]:
+            searcher = TLDRParser(use_index=use_index)
+            # load and parse the pages
+            searcher.find_match_command(InputData(False, "tar", ["tar"]))
             start_time = time.time()
+            for test in test_strings:
+                searcher.find_match_command(InputData(False, test, test.split(" ")))
+            execution_times[use_index] = time.time() - start_time
+            logging.info("execution_time (use_index: %s): %s seconds" % (use_index, execution_times[use_index]))
+        self.assertLess(execution_times[True], execution_times[False], msg="the index does not speed up the search")
 
-            fake_manual_input = ""
-            tldr_parser_thread = None
-            tldr_parser = TLDRParser()
-            for c in test:
-                fake_manual_input += c
-                input_data = InputParser.parse_input(test, is_search_mode=True)
-                if tldr_parser_thread:
-                    tldr_parser_thread.stop()
-                tldr_parser_thread = TLDRParseThread(tldr_parser, input_data)
-                tldr_parser_thread.start()
-                time.sleep(0.05)
-
-            while tldr_parser_thread.is_alive():
-                time.sleep(0.01)
+    def test_TLDR_corpus(self):
+        """
+        the packed corpus must contain the same pages of the single files
+        :return:
+        """
+        searcher = TLDRParser()
+        corpus = searcher._get_corpus()
+        self.assertIsNotNone(corpus, msg="TLDR corpus not found or outdated, run 'build_corpus'")
+        self.assertEqual(TLDRIndex.list_pages(searcher.pages_path), corpus.pages)
+        for page in corpus.pages:
+            lines = searcher._read_file(searcher.pages_path + page)
+            self.assertEqual(lines, corpus.get_lines(corpus.get_page_id(page)))
+            self.assertEqual([line.lower() for line in lines], corpus.get_lower_lines(corpus.get_page_id(page)))
+            self.assertEqual(searcher._parse_page(lines), corpus.get_page_info(corpus.get_page_id(page)))
 
-            execution_time = (time.time() - start_time)
-            logging.info("execution_time: %s -> %s seconds" % (test, execution_time))
-            self.assertTrue(execution_time < 3.0, msg="execution takes too long: %s sec" % execution_time)
+        searcher_files = TLDRParser(use_index=False, use_corpus=False)
+        searcher_corpus = TLDRParser(use_index=False)
+        for test in ["", "tar", "list file permission", "a fi le file ile"]:
+            input_data = InputData(False, test, test.split(" "))
+            self.assertEqual(sorted([[-item[0], item[1], item[2]] for item in searcher_files.find_match_command(input_data)]),
+                             sorted([[-item[0], item[1], item[2]] for item in searcher_corpus.find_match_command(input_data)]),
+                             msg="different results: %s" % test)
+
+    def test_TLDR_corpus_first_search_time(self):
+        """
+        the first search of a session reads all the pages from the single files or maps the packed corpus
+        :return:
+        """
+        execution_times = {}
+        for use_corpus in [False, True]:
+            searcher = TLDRParser(use_index=False, use_corpus=use_corpus)
+            start_time = time.time()
+            searcher.find_match_command(InputData(False, "open port listen", ["open", "port", "listen"]))
+            execution_times[use_corpus] = time.time() - start_time
+            logging.info("execution_time (use_corpus: %s): %s seconds" % (use_corpus, execution_times[use_corpus]))
+        self.assertLess(execution_times[True], execution_times[False], msg="the corpus does not speed up the search")
+
+    def test_TLDR_pages_cache(self):
+        """
+        the pre-parsed pages are stored by the first session and loaded by the next ones
+        note: the cache is used only without the packed corpus
+        :return:
+        """
+        cache_folder = self.logger_test.get_test_folder()
+        cache_path = cache_folder + TLDRPagesCache.CACHE_FILE_NAME
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        input_data = InputData(False, "open port listen", ["open", "port", "listen"])
+
+        execution_times = []
+        results = []
+        for session in range(2):
+            searcher = TLDRParser(cache_folder=cache_folder, use_corpus=False)
+            start_time = time.time()
+            results.append(searcher.find_match_command(input_data))
+            execution_times.append(time.time() - start_time)
+            logging.info("execution_time (session %d): %s seconds" % (session, execution_times[-1]))
+            self.assertTrue(os.path.isfile(cache_path))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], TLDRParser().find_match_command(input_data))
+        self.assertLess(execution_times[1], execution_times[0], msg="the cache does not speed up the first search")
+
+        # the cache is not valid for different pages
+        searcher = TLDRParser(cache_folder=cache_folder)
+        tldr_commit = searcher._read_tldr_commit()
+        self.assertIsNotNone(TLDRPagesCache.load(cache_path, tldr_commit))
+        self.assertIsNone(TLDRPagesCache.load(cache_path, "new commit"))
+
+    def test_TLDR_parallel_scoring_time(self):
+        """
+        scaling benchmark of the parallel scoring (all the pages are scored, the index is not used)
+        note: the speedup depends on the available cores
+        :return:
+        """
+        test_strings = ["e", "a fi le file ile", "list file permission", "open port listen"]
+        logging.info("available cores: %s" % os.cpu_count())
+        expected_results = None
+        for workers in [0, 1, 2, 4, 8]:
+            searcher = TLDRParser(use_index=False, scoring_workers=workers)
+            scoring_pool = searcher.start_scoring_pool()
+            if scoring_pool is not None:
+                self.assertTrue(scoring_pool.is_ready(timeout=30))
+            results = []
+            start_time = time.time()
+            for test in test_strings:
+                results.append(searcher.find_match_command(InputData(False, test, test.split(" "))))
+            execution_time = time.time() - start_time
+            logging.info("execution_time (workers: %s): %s seconds" % (workers, execution_time))
+            if expected_results is None:
+                expected_results = results
+            else:
+                self.assertEqual(expected_results, results)
+            searcher.stop_scoring_pool()
+
+    def test_TLDR_title_ratio(self):
+        """
+        the similarity between a word and a title must be the same of the difflib ratio
+        :return:
+        """
+        searcher = TLDRParser()
+        titles = [page[TLDRPagesCache.INDEX_PAGE_TITLE] for page in searcher._get_pages_cache().pages.values()]
+        self.assertEqual(len(titles), len(TLDRIndex.list_pages(searcher.pages_path)))
+        words = ["tar", "git", "-", "a", "ls", "list", "git-diff", "network", "x", "rm", "apt-get", "d", "#", "# t"]
+        for title in titles:
+            self.assertTrue(len(title) > 0)
+            for word in words:
+                self.assertEqual(difflib.SequenceMatcher(None, word, title).ratio(),
+                                 TLDRParser._get_title_ratio(word, title), msg="%s - %s" % (word, title))
+
+    def test_TLDR_incremental_search(self):
+        """
+        when a search refines the previous one only the previous matches are scored, the results must be the same of
+        a new search
+        :return:
+        """
+        searcher = TLDRParser()
+        # [search, True if the search refines the previous one]
+        test_strings = [["t", False], ["ta", True], ["tar", True], ["tar ", True], ["tar x", True],
+                        ["tar xv", True], ["ta", False], ["git", False], ["git diff", True], ["git dif", False],
+                        ["gz", False]]
+        for test, refined in test_strings:
+            input_data = InputData(False, test, test.split(" "))
+            words = [word.lower() for word in input_data.get_all_words() if len(word) > 0]
+            self.assertEqual(searcher._get_refined_pages(words) is not None, refined, msg=test)
+            start_time = time.time()
+            results_incremental = searcher.find_match_command(input_data)
+            logging.info("execution_time ('%s'): %s seconds" % (test, time.time() - start_time))
+            results_new = TLDRParser().find_match_command(input_data)
+            self.assertEqual(sorted([[-item[0], item[1], item[2]] for item in results_new]),
+                             sorted([[-item[0], item[1], item[2]] for item in results_incremental]),
+                             msg="different results: %s" % test)
+            self.assertEqual([item[0] for item in results_new], [item[0] for item in results_incremental],
+                             msg="different order: %s" % test)
+
+    def test_TLDR_examples_cache(self):
+        """
+        the examples of the last shown pages are kept in memory, they must be the same of the examples parsed from
+        the page files
+        :return:
+        """
+        searcher = TLDRParser()
+        searcher_files = TLDRParser(use_corpus=False)
+        matches = searcher.find_match_command(InputData(False, "tar", ["tar"]))
+        self.assertTrue(len(matches) > TLDRParser.EXAMPLES_CACHE_SIZE)
+        for match in matches:
+            parsed_tldr_example = searcher.get_tldr_cmd_examples(match)
+            parsed_tldr_example_file = searcher_files.get_tldr_cmd_examples(match)
+            self.assertEqual(parsed_tldr_example.get_command(), parsed_tldr_example_file.get_command())
+            self.assertEqual(parsed_tldr_example.get_rows(), parsed_tldr_example_file.get_rows())
+            self.assertEqual(parsed_tldr_example.get_url_more_info(), parsed_tldr_example_file.get_url_more_info())
+            self.assertEqual(parsed_tldr_example.get_tldr_github_page(),
+                             parsed_tldr_example_file.get_tldr_github_page())
+            # the second request is served from memory
+            self.assertIs(searcher.get_tldr_cmd_examples(match), parsed_tldr_example)
+        # only the last pages are kept
+        examples_cache = searcher._get_examples_cache()
+        self.assertEqual(len(examples_cache.pages), TLDRParser.EXAMPLES_CACHE_SIZE)
+        self.assertNotIn(matches[0][TLDRParser.INDEX_TLDR_MATCH_CMD_FOLDER] + "/" +
+                         matches[0][TLDRParser.INDEX_TLDR_MATCH_CMD] + ".md", examples_cache)
+        self.assertIn(matches[-1][TLDRParser.INDEX_TLDR_MATCH_CMD_FOLDER] + "/" +
+                      matches[-1][TLDRParser.INDEX_TLDR_MATCH_CMD] + ".md", examples_cache)
 
     def test_TLDR_parser(self):
         searcher = TLDRParser()
@@ -0,0 +1,227 @@
+import logging
+import time
+import unittest
+
+from fastHistory.parser.InputData import InputData
+from fastHistory.parser.inputParser import InputParser
+from fastHistory.tldr.tldrParser import TLDRParser
+from fastHistory.tldr.tldrSearchThread import TLDRSearchThread
+from fastHistory.unitTests.loggerTest import LoggerTest
+
+
+class TestTLDRSearchThread(unittest.TestCase):
+
+    MAX_WAIT = 10
+
+    @classmethod
+    def setUpClass(cls):
+        cls.logger_test = LoggerTest()
+
+    def setUp(self):
+        self.logger_test.log_test_function_name(self.id())
+
+    @staticmethod
+    def get_input_data(search):
+        return InputData(False, search, search.split(" "))
+
+    def test_same_result_of_parser(self):
+        search_thread = TLDRSearchThread(TLDRParser())
+        search_thread.start()
+        try:
+            for search in ["tar", "tar x", "list file permission", "", "randomstringwithnomatch", "e"]:
+                search_thread.search(self.get_input_data(search))
+                self.assertEqual(search_thread.get_result(timeout=self.MAX_WAIT),
+                                 TLDRParser().find_match_command(self.get_input_data(search)), msg=search)
+                logging.info("execution_time ('%s'): %s seconds" % (search, search_thread.get_search_time()))
+                self.assertIsNotNone(search_thread.get_search_time())
+        finally:
+            search_thread.stop()
+        search_thread.join(self.MAX_WAIT)
+        self.assertFalse(search_thread.is_alive())
+
+    def test_only_last_request(self):
+        """
+        only the result of the last requested search is returned, the older ones are stopped or discarded
+        """
+        search_thread = TLDRSearchThread(TLDRParser(use_index=False))
+        search_thread.start()
+        try:
+            search = ""
+            for c in "a fi le file ile":
+                search += c
+                search_thread.search(self.get_input_data(search))
+            result = search_thread.get_result(timeout=self.MAX_WAIT)
+            self.assertEqual(result, TLDRParser(use_index=False).find_match_command(self.get_input_data(search)))
+            # the result is returned only once
+            self.assertIsNone(search_thread.get_result())
+            self.assertIsNone(search_thread.get_partial_result())
+        finally:
+            search_thread.stop()
+        search_thread.join(self.MAX_WAIT)
+        self.assertFalse(search_thread.is_alive())
+
+    def test_prefetch(self):
+        """
+        the examples of the requested pages are parsed in background when no search is running
+        """
+        tldr_parser = TLDRParser()
+        matches = tldr_parser.find_match_command(self.get_input_data("tar"))[:10]
+        page_keys = [match[TLDRParser.INDEX_TLDR_MATCH_CMD_FOLDER] + "/" + match[TLDRParser.INDEX_TLDR_MATCH_CMD] +
+                     ".md" for match in matches]
+        examples_cache = tldr_parser._get_examples_cache()
+        search_thread = TLDRSearchThread(tldr_parser)
+        search_thread.start()
+        try:
+            search_thread.prefetch(matches)
+            start_time = time.time()
+            while not all(page_key in examples_cache for page_key in page_keys):
+                self.assertLess(time.time() - start_time, self.MAX_WAIT, msg="pages not prefetched")
+                time.sleep(0.01)
+            for match in matches:
+                self.assertIs(tldr_parser.get_tldr_cmd_examples(match),
+                              examples_cache.get(match[TLDRParser.INDEX_TLDR_MATCH_CMD_FOLDER] + "/" +
+                                                 match[TLDRParser.INDEX_TLDR_MATCH_CMD] + ".md"))
+            # a search discards the prefetch request
+            search_thread.prefetch(matches)
+            search_thread.search(self.get_input_data("git"))
+            self.assertIsNone(search_thread.prefetch_request)
+            self.assertIsNotNone(search_thread.get_result(timeout=self.MAX_WAIT))
+        finally:
+            search_thread.stop()
+        search_thread.join(self.MAX_WAIT)
+        self.assertFalse(search_thread.is_alive())
+
+    def test_partial_results(self):
+        """
+        while a search is running the best matches found so far are published, each partial result must be sorted
+        and its matches must be in the final result with the same weight
+        """
+        for use_index in [False, True]:
+            search_thread = TLDRSearchThread(TLDRParser(use_index=use_index))
+            partial_results = []
+            set_partial_result = search_thread.set_partial_result_tldr_options
+
+            def record_partial_result(partial_result):
+                partial_results.append(partial_result)
+                set_partial_result(partial_result)
+
+            search_thread.set_partial_result_tldr_options = record_partial_result
+            search_thread.start()
+            try:
+                for search in ["tar", "list file permission", "git diff", "e"]:
+                    partial_results.clear()
+                    search_thread.search(self.get_input_data(search))
+                    results = search_thread.get_result(timeout=self.MAX_WAIT)
+                    logging.info("partial results (use_index: %s, '%s'): %d, execution_time: %s seconds" %
+                                 (use_index, search, len(partial_results), search_thread.get_search_time()))
+                    self.assertEqual(results, TLDRParser(use_index=use_index).find_match_command(
+                        self.get_input_data(search)))
+                    final_weights = dict((item[TLDRParser.INDEX_TLDR_MATCH_FULL_PATH],
+                                          item[TLDRParser.INDEX_TLDR_MATCH_TOTAL_WEIGHT]) for item in results)
+                    if search == "tar":
+                        # the pages with "tar" in the title are published before the other pages are scored
+                        self.assertTrue(len(partial_results) > 0, msg="no partial result: %s" % search)
+                    for partial_result in partial_results:
+                        self.assertTrue(0 < len(partial_result) <= TLDRParser.PARTIAL_MATCHES_SIZE)
+                        weights = [item[TLDRParser.INDEX_TLDR_MATCH_TOTAL_WEIGHT] for item in partial_result]
+                        self.assertEqual(sorted(weights, reverse=True), weights)
+                        for item in partial_result:
+                            self.assertEqual(final_weights[item[TLDRParser.INDEX_TLDR_MATCH_FULL_PATH]],
+                                             item[TLDRParser.INDEX_TLDR_MATCH_TOTAL_WEIGHT])
+            finally:
+                search_thread.stop()
+            search_thread.join(self.MAX_WAIT)
+            self.assertFalse(search_thread.is_alive())
+
+    def test_parallel_scoring(self):
+        """
+        the pages scored by a pool of processes must have the same order of the pages scored by a single process
+        the pool is started with the thread, it is used only when its processes are ready and it is reused by the
+        next threads of the same parser until "stop_scoring_pool" is called
+        """
+        tldr_parser = TLDRParser(scoring_workers=0)
+        tldr_parser_parallel = TLDRParser(scoring_workers=2)
+        scoring_pool = tldr_parser_parallel.start_scoring_pool()
+        search_thread = TLDRSearchThread(tldr_parser_parallel)
+        search_thread.start()
+        try:
+            # the first searches are likely scored in the current process, the processes are still starting
+            for wait_pool in [False, True]:
+                if wait_pool:
+                    self.assertTrue(scoring_pool.is_ready(timeout=self.MAX_WAIT * 3))
+                for search in ["tar", "a fi le file ile", "e", "randomstringwithnomatch"]:
+                    search_thread.search(self.get_input_data(search))
+                    self.assertEqual(search_thread.get_result(timeout=self.MAX_WAIT),
+                                     tldr_parser.find_match_command(self.get_input_data(search)),
+                                     msg="different results: %s" % search)
+            # the pool started before the thread is reused
+            self.assertIs(tldr_parser_parallel.scoring_pool, scoring_pool)
+            # the search of a stopped thread is stopped by the pool too
+            stopped_thread = TLDRSearchThread(tldr_parser_parallel)
+            stopped_thread.stop()
+            self.assertEqual([], tldr_parser_parallel.find_match_command(self.get_input_data("e"), stopped_thread))
+        finally:
+            search_thread.stop()
+        search_thread.join(self.MAX_WAIT)
+        self.assertFalse(search_thread.is_alive())
+        # the pool is kept for the next thread (e.g. when the TLDR tab is opened again)
+        self.assertIs(tldr_parser_parallel.scoring_pool, scoring_pool)
+        next_thread = TLDRSearchThread(tldr_parser_parallel)
+        next_thread.start()
+        try:
+            next_thread.search(self.get_input_data("tar"))
+            self.assertEqual(next_thread.get_result(timeout=self.MAX_WAIT),
+                             tldr_parser.find_match_command(self.get_input_data("tar")))
+            self.assertIs(tldr_parser_parallel.scoring_pool, scoring_pool)
+        finally:
+            next_thread.stop()
+        tldr_parser_parallel.stop_scoring_pool()
+        self.assertIsNone(tldr_parser_parallel.scoring_pool)
+        self.assertIsNone(tldr_parser.start_scoring_pool())
+
+    def test_search_with_simulated_manual_input(self):
+        """
+        a search is requested for each typed char, the stale searches must not delay the last one
+        """
+        for search in ["open port listen", "a fi le file ile"]:
+            search_thread = TLDRSearchThread(TLDRParser())
+            search_thread.start()
+            try:
+                start_time = time.time()
+                fake_manual_input = ""
+                for c in search:
+                    fake_manual_input += c
+                    search_thread.search(InputParser.parse_input(fake_manual_input, is_search_mode=True))
+                    time.sleep(0.05)
+                self.assertIsNotNone(search_thread.get_result(timeout=self.MAX_WAIT))
+                execution_time = time.time() - start_time
+                logging.info("execution_time: %s -> %s seconds" % (search, execution_time))
+                self.assertTrue(execution_time < 3.0, msg="execution takes too long: %s sec" % execution_time)
+            finally:
+                search_thread.stop()
+            search_thread.join(self.MAX_WAIT)
+            self.assertFalse(search_thread.is_alive())
+
+    def test_stopped_search(self):
+        """
+        the running search must be stopped as soon as a new search is requested
+        """
+        search_thread = TLDRSearchThread(TLDRParser())
+        # the search is not running
+        self.assertTrue(search_thread.has_been_stopped())
+        search_thread.running_request_id = search_thread.last_request_id
+        self.assertFalse(search_thread.has_been_stopped())
+        # partial results of the running search are available
+        search_thread.set_partial_result_tldr_options([[1, "common", "tar", "", None]])
+        self.assertEqual(search_thread.get_partial_result(), [[1, "common", "tar", "", None]])
+        self.assertIsNone(search_thread.get_partial_result())
+        # a new search replaces the running one, its partial results are discarded
+        search_thread.search(self.get_input_data("tar"))
+        self.assertTrue(search_thread.has_been_stopped())
+        search_thread.set_partial_result_tldr_options([[1, "common", "tar", "", None]])
+        self.assertIsNone(search_thread.get_partial_result())
+        self.assertEqual(search_thread.tldr_parser.find_match_command(self.get_input_data("tar"), search_thread), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -51,6 +51,8 @@ try:
 				'tldr/tldr/last_update_date.txt',
 				'tldr/tldr/last_tldr_commit.txt',
 				'tldr/tldr/LICENSE.md',
+				'tldr/tldr/index.json',
+				'tldr/tldr/pages.bin',
 				'tldr/tldr/pages/*/*.md',
 			],
 		},